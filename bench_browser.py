@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import time
+from dataclasses import dataclass, field
+
+from replay_fixtures import FIXTURES_DIR, ReplayServer, Scenario, find_scenarios, point_sites_at
+
+# 브라우저 경로를 타도록 사이트별 엔진 설정을 바꾼다. (봇 모듈 import 전에 적용)
+BROWSER_SITES = {
+    "dungeon": {"DUNGEON_ENGINE": "browser"},
+    "earth_star": {},
+    "page_today": {"PAGE_TODAY_BACKEND": "browser"},
+}
+PROFILES = ["full", "lean"]
+
+
+@dataclass
+class Measurement:
+    seconds: float
+    bytes: int
+    responses: int
+    blocked: int
+    slots: list[list[str]]
+    error: str | None = None
+
+
+@dataclass
+class ProfileReport:
+    profile: str
+    runs: list[Measurement] = field(default_factory=list)
+
+    def median(self, attr: str) -> float:
+        return statistics.median(getattr(run, attr) for run in self.runs)
+
+
+def network_totals(driver: object) -> tuple[int, int, int]:
+    """성능 로그를 비우면서 (받은 바이트, 완료된 응답 수, 차단된 요청 수)를 센다."""
+    total_bytes = responses = blocked = 0
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        params = message.get("params") or {}
+        if message.get("method") == "Network.loadingFinished":
+            total_bytes += int(params.get("encodedDataLength") or 0)
+            responses += 1
+        elif message.get("method") == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked += 1
+    return total_bytes, responses, blocked
+
+
+def measure(scenario: Scenario, profile: str, iterations: int, verbose: bool) -> ProfileReport:
+    from browser_pool import BrowserSession
+    from http_pool import KeepAliveClient
+    from run_bots import SITES, SharedContext
+
+    report = ProfileReport(profile=profile)
+    for _ in range(iterations):
+        # 매번 새 Chrome (빈 디스크 캐시) 으로 띄워 첫 방문 기준으로 잰다.
+        session = BrowserSession(window_size="1280,2200", profile=profile, performance_log=True)
+        client = KeepAliveClient()
+        ctx = SharedContext(now_kst=scenario.now, holiday_set=scenario.holiday_set, session=session, client=client)
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        error = None
+        slots: list[list[str]] = []
+        started = time.perf_counter()
+        try:
+            with output:
+                scan = SITES[scenario.site](ctx)
+            slots = sorted([slot.theme, slot.date, slot.time] for slot in scan.slots)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        seconds = time.perf_counter() - started
+        try:
+            total_bytes, responses, blocked = network_totals(session.driver) if session.launch_count else (0, 0, 0)
+        finally:
+            session.quit()
+            client.close()
+        report.runs.append(Measurement(seconds, total_bytes, responses, blocked, slots, error))
+    return report
+
+
+def print_comparison(scenario: Scenario, reports: list[ProfileReport]) -> bool:
+    """표를 출력하고 프로필 간 슬롯 결과가 (그리고 기대 결과가 있으면 그것과) 같은지 돌려준다."""
+    print(f"\n===== {scenario.name} ({scenario.site}) =====")
+    print(f"{'profile':<6} {'time-to-slots':>14} {'bytes':>12} {'responses':>10} {'blocked':>8}")
+    for report in reports:
+        print(
+            f"{report.profile:<6} {report.median('seconds'):13.3f}s {report.median('bytes'):12,.0f} "
+            f"{report.median('responses'):10.0f} {report.median('blocked'):8.0f}"
+        )
+    if len(reports) == 2 and reports[0].median("bytes"):
+        full, lean = reports
+        saved = 1 - lean.median("bytes") / full.median("bytes")
+        speedup = full.median("seconds") / lean.median("seconds") if lean.median("seconds") else 0.0
+        print(f"📉 lean: 전송량 {saved:.0%} 감소, 시간 x{speedup:.2f}")
+
+    ok = True
+    baseline = scenario.expected if scenario.expected is not None else reports[0].runs[-1].slots
+    for report in reports:
+        for run in report.runs:
+            if run.error:
+                print(f"❌ [{report.profile}] 실행 실패: {run.error}")
+                ok = False
+            elif run.slots != sorted(baseline):
+                print(f"❌ [{report.profile}] 슬롯 불일치: 기준 {sorted(baseline)} / 결과 {run.slots}")
+                ok = False
+                break
+    if ok:
+        print(f"✅ 슬롯 일치 ({len(baseline)}건)")
+    return ok
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="녹화한 페이지로 기본/lean 브라우저 로딩의 전송량과 소요 시간을 비교한다.")
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO", help="시나리오 이름 또는 경로 (기본: 브라우저 사이트 전부)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="시나리오 디렉터리 루트")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--profile", action="append", choices=PROFILES, help="비교할 프로필 (기본: full, lean)")
+    parser.add_argument("--verbose", action="store_true", help="봇 로그를 그대로 출력")
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in find_scenarios(args.scenarios, args.fixtures) if s.site in BROWSER_SITES]
+    if not scenarios:
+        raise SystemExit(f"브라우저 사이트 시나리오가 없습니다: {args.fixtures}")
+
+    server = ReplayServer().start()
+    point_sites_at(server.base_url)
+    for site in {s.site for s in scenarios}:
+        os.environ.update(BROWSER_SITES[site])
+    ok = True
+    try:
+        for scenario in scenarios:
+            server.use(scenario)
+            profiles = args.profile or PROFILES
+            reports = [measure(scenario, profile, args.iterations, args.verbose) for profile in profiles]
+            ok = print_comparison(scenario, reports) and ok
+    finally:
+        server.stop()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
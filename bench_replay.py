@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import re
+import shutil
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from urllib import parse
+
+from replay_fixtures import FIXTURES_DIR, Exchange, ReplayServer, Scenario, find_scenarios, point_sites_at
+
+PHASES = ["launch", "navigation", "ready_wait", "http", "extract"]
+PHASE_LABELS = {
+    "launch": "브라우저 기동",
+    "navigation": "페이지 이동",
+    "ready_wait": "준비 대기",
+    "http": "HTTP",
+    "extract": "추출/판정",
+}
+_DUMP_DATE = re.compile(r"(\d{4}-\d{2}-\d{2})\.html$")
+
+
+@dataclass
+class Iteration:
+    seconds: float
+    phases: dict[str, float]
+    slots: list[list[str]]
+    error: str | None = None
+
+
+@dataclass
+class ScenarioReport:
+    scenario: Scenario
+    iterations: list[Iteration] = field(default_factory=list)
+    misses: list[str] = field(default_factory=list)
+    hits: int = 0
+
+    @property
+    def matched(self) -> bool | None:
+        if self.scenario.expected is None:
+            return None
+        expected = sorted(self.scenario.expected)
+        return all(it.error is None and it.slots == expected for it in self.iterations)
+
+
+def _scan_slots(scan: object) -> list[list[str]]:
+    return sorted([slot.theme, slot.date, slot.time] for slot in scan.slots)
+
+
+def run_scenario(
+    scenario: Scenario, server: ReplayServer, iterations: int, warm: bool, verbose: bool = False
+) -> ScenarioReport:
+    # 봇 모듈은 point_sites_at() 뒤에 불러와야 로컬 서버 주소를 쓴다.
+    import readiness
+    import whos_there
+    from browser_pool import USER_AGENT, BrowserSession
+    from http_pool import KeepAliveClient
+    from run_bots import SITES, SharedContext
+
+    server.use(scenario)
+    report = ScenarioReport(scenario=scenario)
+    session = BrowserSession(window_size="1280,2200")
+    client = KeepAliveClient(headers={"User-Agent": USER_AGENT})
+    try:
+        for _ in range(iterations):
+            if not warm:
+                session.quit()
+                client.close()
+                session = BrowserSession(window_size="1280,2200")
+                client = KeepAliveClient(headers={"User-Agent": USER_AGENT})
+            http_clients = [client, whos_there._API_CLIENT]
+            before_launch = session.launch_seconds + session.resolve_seconds
+            before_nav = session.navigation_seconds
+            before_http = sum(c.elapsed_seconds for c in http_clients)
+            before_waits = len(readiness.records())
+            ctx = SharedContext(
+                now_kst=scenario.now, holiday_set=scenario.holiday_set, session=session, client=client
+            )
+
+            started = time.perf_counter()
+            error = None
+            slots: list[list[str]] = []
+            # 봇 로그 출력은 기본으로 숨긴다. (print 자체 비용은 그대로 포함된다)
+            output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+            try:
+                with output:
+                    slots = _scan_slots(SITES[scenario.site](ctx))
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            total = time.perf_counter() - started
+
+            phases = {
+                "launch": session.launch_seconds + session.resolve_seconds - before_launch,
+                "navigation": session.navigation_seconds - before_nav,
+                "ready_wait": sum(r.seconds for r in readiness.records()[before_waits:]),
+                # 동시 요청은 겹쳐 더해지므로 벽시계 시간을 넘지 않게 자른다.
+                "http": min(total, sum(c.elapsed_seconds for c in http_clients) - before_http),
+            }
+            phases["extract"] = max(0.0, total - sum(phases.values()))
+            report.iterations.append(Iteration(seconds=total, phases=phases, slots=slots, error=error))
+    finally:
+        session.quit()
+        client.close()
+    report.hits = server.hits
+    report.misses = sorted(set(server.misses))
+    return report
+
+
+def print_report(reports: list[ScenarioReport]) -> None:
+    for report in reports:
+        times = [it.seconds for it in report.iterations]
+        print(f"\n===== {report.scenario.name} ({report.scenario.site}) x{len(times)} =====")
+        print(
+            f"⏱️ 전체 min {min(times):.3f}s / median {statistics.median(times):.3f}s / "
+            f"mean {statistics.fmean(times):.3f}s / max {max(times):.3f}s"
+        )
+        for phase in PHASES:
+            values = [it.phases[phase] for it in report.iterations]
+            print(f"   {PHASE_LABELS[phase]:<8} mean {statistics.fmean(values):.3f}s  max {max(values):.3f}s")
+        print(f"🌐 재생 응답 {report.hits}건 / 녹화 없음 {len(report.misses)}종")
+        for miss in report.misses[:10]:
+            print(f"   404 {miss}")
+        errors = [it.error for it in report.iterations if it.error]
+        if errors:
+            print(f"❌ 실행 실패 {len(errors)}회: {errors[0]}")
+        if report.matched is None:
+            print(f"ℹ️ 기대 결과 없음 (감지 {len(report.iterations[-1].slots)}건, --update-expected 로 기록)")
+        elif report.matched:
+            print(f"✅ 슬롯 일치 ({len(report.scenario.expected or [])}건)")
+        else:
+            print(f"❌ 슬롯 불일치: 기대 {report.scenario.expected} / 결과 {report.iterations[-1].slots}")
+
+
+def write_json(path: str, reports: list[ScenarioReport]) -> None:
+    data = [
+        {
+            "scenario": r.scenario.name,
+            "site": r.scenario.site,
+            "seconds": [it.seconds for it in r.iterations],
+            "phases": {phase: [it.phases[phase] for it in r.iterations] for phase in PHASES},
+            "hits": r.hits,
+            "misses": r.misses,
+            "matched": r.matched,
+        }
+        for r in reports
+    ]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(data, fp, ensure_ascii=False, indent=2)
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    scenarios = find_scenarios(args.scenarios, args.fixtures)
+    if not scenarios:
+        raise SystemExit(f"재생할 시나리오가 없습니다: {args.fixtures}")
+
+    server = ReplayServer(latency=args.latency_ms / 1000).start()
+    state_dir = tempfile.mkdtemp(prefix="bench_replay_")
+    point_sites_at(server.base_url)
+    # 실제 실행의 캐시/상태 파일을 건드리지 않는다.
+    os.environ["WHOS_THERE_ENDDAY_CACHE"] = os.path.join(state_dir, "whos_there_endday.json")
+    try:
+        reports = [run_scenario(s, server, args.iterations, args.warm, args.verbose) for s in scenarios]
+    finally:
+        server.stop()
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    if args.update_expected:
+        for report in reports:
+            last = report.iterations[-1]
+            if last.error is None:
+                report.scenario.expected = last.slots
+                report.scenario.save()
+                print(f"📝 기대 결과 기록: {report.scenario.name} ({len(last.slots)}건)")
+    print_report(reports)
+    if args.json:
+        write_json(args.json, reports)
+    if any(report.matched is False for report in reports):
+        raise SystemExit(1)
+
+
+def cmd_import_dump(args: argparse.Namespace) -> None:
+    """DEBUG 모드가 남긴 debug_*.html 을 시나리오로 만든다. (dungeon / earth_star)"""
+    import dungeon
+    import earth_star
+
+    build_url = {"dungeon": dungeon.build_url, "earth_star": earth_star.build_url}[args.site]
+    paths = sorted({path for pattern in args.files for path in glob.glob(pattern)})
+    directory = os.path.join(args.fixtures, args.name)
+    scenario = Scenario(name=args.name, site=args.site, now_kst="", directory=directory)
+    dates: list[date] = []
+    for path in paths:
+        match = _DUMP_DATE.search(path)
+        if not match:
+            print(f"⚠️ 날짜를 알 수 없는 파일 건너뜀: {path}")
+            continue
+        target_date = match.group(1)
+        parts = parse.urlsplit(build_url(target_date))
+        body_file = os.path.basename(path)
+        os.makedirs(directory, exist_ok=True)
+        shutil.copyfile(path, os.path.join(directory, body_file))
+        scenario.exchanges.append(
+            Exchange(
+                method="GET",
+                path=parts.path,
+                params=dict(parse.parse_qsl(parts.query)),
+                status=200,
+                content_type="text/html; charset=utf-8",
+                body_file=body_file,
+            )
+        )
+        dates.append(date.fromisoformat(target_date))
+    if not dates:
+        raise SystemExit("가져온 파일이 없습니다")
+
+    if args.now:
+        now = datetime.fromisoformat(args.now)
+    else:
+        now = datetime.combine(min(dates), datetime.min.time()).replace(hour=12)
+    scenario.now_kst = now.isoformat(timespec="seconds")
+    try:
+        from kr_calendar import build_holiday_set
+
+        scenario.holidays = sorted(d.isoformat() for d in build_holiday_set(dates) if min(dates) <= d <= max(dates))
+    except RuntimeError as exc:
+        print(f"⚠️ 공휴일 없이 기록합니다: {exc}")
+    scenario.save()
+    print(f"📦 {directory}: {len(scenario.exchanges)}개 페이지, 기준시각 {scenario.now_kst}")
+    print("   검사 기간 중 녹화가 없는 날짜는 404 로 응답합니다. 첫 재생 때 --update-expected 로 기대 결과를 남기세요.")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="녹화한 페이지/API 응답을 로컬 서버로 재생해 봇 성능을 잰다.")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="시나리오 디렉터리 루트")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="시나리오 재생 벤치마크")
+    run.add_argument("scenarios", nargs="*", metavar="SCENARIO", help="시나리오 이름 또는 경로 (기본: 전부)")
+    run.add_argument("--iterations", type=int, default=5)
+    run.add_argument("--warm", action="store_true", help="반복 사이에 브라우저/HTTP 연결을 유지")
+    run.add_argument("--latency-ms", type=float, default=0.0, help="응답마다 넣을 인위적 지연")
+    run.add_argument("--update-expected", action="store_true", help="마지막 결과를 기대 결과로 기록")
+    run.add_argument("--json", default=None, help="결과를 JSON 으로 저장할 경로")
+    run.add_argument("--verbose", action="store_true", help="봇 로그를 그대로 출력")
+    run.set_defaults(func=cmd_run)
+
+    dump = sub.add_parser("import-dump", help="DEBUG 덤프(debug_*.html)로 시나리오 만들기")
+    dump.add_argument("site", choices=["dungeon", "earth_star"])
+    dump.add_argument("files", nargs="+", help="덤프 파일 (glob 가능)")
+    dump.add_argument("--name", required=True, help="만들 시나리오 이름")
+    dump.add_argument("--now", default=None, help="기준 시각 KST (기본: 가장 이른 날짜 12:00)")
+    dump.set_defaults(func=cmd_import_dump)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
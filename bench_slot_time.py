@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import argparse
+import glob
+import re
+import time
+from typing import Callable
+
+from html_dom import parse_html
+from slot_time import colon_times, extract_time, extract_times, first_time, has_time, tokenize, tokenize_many
+
+# 녹화한 페이지가 없을 때 쓰는 예시 텍스트 (던전/어스스타 슬롯 노드와 비슷한 모양)
+SAMPLE_TEXTS = [
+    "10:30 예약가능",
+    "12:00 예약마감",
+    "향 13:40 14:50 16:00 17:10 18:20 19:30 20:40 21:50",
+    "18시 30분 잔여 1",
+    "19시 예약하기",
+    "2130 가능",
+    "매진",
+    "테마 소개 2025-10-18 오픈",
+    "예약 불가 22:40",
+    "",
+    "휴무",
+    "오전 9:10 / 오후 11:20",
+]
+
+
+def legacy_extract_time(text: str) -> str | None:
+    # earth_star 의 예전 구현: 패턴 네 개를 순서대로 re.search
+    match = re.search(r"\b([01]?\d|2[0-3]):([0-5]\d)\b", text)
+    if match:
+        return f"{int(match.group(1)):02d}:{match.group(2)}"
+    match = re.search(r"\b([01]?\d|2[0-3])\s*시\s*([0-5]?\d)\s*분?\b", text)
+    if match:
+        return f"{int(match.group(1)):02d}:{int(match.group(2)):02d}"
+    match = re.search(r"\b([01]?\d|2[0-3])\s*시\b", text)
+    if match:
+        return f"{int(match.group(1)):02d}:00"
+    match = re.search(r"\b([01]\d|2[0-3])([0-5]\d)\b", text)
+    if match:
+        return f"{match.group(1)}:{match.group(2)}"
+    return None
+
+
+def legacy_extract_times(text: str) -> list[str]:
+    # dungeon 의 예전 구현
+    matches = re.findall(r"\b([01]?\d|2[0-3]):([0-5]\d)\b", text)
+    result = []
+    seen = set()
+    for hh, mm in matches:
+        value = f"{int(hh):02d}:{mm}"
+        if value in seen:
+            continue
+        seen.add(value)
+        result.append(value)
+    return result
+
+
+def legacy_has_time(text: str) -> bool:
+    return re.search(r"\b([01]?\d|2[0-3]):([0-5]\d)\b", text) is not None
+
+
+def load_texts(paths: list[str]) -> list[str]:
+    """녹화한 HTML 에서 요소별 텍스트를 뽑는다. (DEBUG 덤프 debug_*.html 등)"""
+    texts: list[str] = []
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, encoding="utf-8", errors="replace") as fp:
+                root = parse_html(fp.read())
+            texts.extend(node.inner_text() for node in root.iter())
+    return texts
+
+
+def _timed(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="시간 토크나이저와 예전 정규식 함수들을 같은 텍스트로 비교한다.")
+    parser.add_argument("pages", nargs="*", help="녹화한 HTML 파일 (glob 가능). 없으면 예시 텍스트 사용")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scale", type=int, default=200, help="예시 텍스트를 몇 번 반복할지")
+    args = parser.parse_args(argv)
+
+    texts = load_texts(args.pages) if args.pages else SAMPLE_TEXTS * args.scale
+    if not texts:
+        parser.error("읽은 텍스트가 없습니다")
+
+    # 결과가 예전 함수와 같은지 먼저 확인한다.
+    mismatches = [
+        text
+        for text in texts
+        if legacy_extract_time(text) != extract_time(text)
+        or legacy_extract_times(text) != extract_times(text)
+        or legacy_has_time(text) != has_time(text)
+    ]
+
+    def legacy() -> None:
+        for text in texts:
+            legacy_extract_time(text)
+            legacy_extract_times(text)
+            legacy_has_time(text)
+
+    def per_text() -> None:
+        for text in texts:
+            tokens = tokenize(text)
+            first_time(tokens)
+            colon_times(tokens)
+
+    def batch() -> None:
+        for tokens in tokenize_many(texts):
+            first_time(tokens)
+            colon_times(tokens)
+
+    print(f"텍스트 {len(texts)}개 / {sum(len(t) for t in texts)}자, 반복 {args.repeat}회 중 최솟값")
+    baseline = _timed(legacy, args.repeat)
+    for label, fn in [("legacy", legacy), ("tokenize", per_text), ("tokenize_many", batch)]:
+        seconds = baseline if label == "legacy" else _timed(fn, args.repeat)
+        print(f"  {label:<14} {seconds * 1000:8.2f} ms  (x{baseline / seconds:.2f})")
+    if mismatches:
+        print(f"❌ 예전 함수와 결과가 다른 텍스트 {len(mismatches)}개: {mismatches[:5]}")
+        raise SystemExit(1)
+    print("✅ 결과 일치")
+
+
+if __name__ == "__main__":
+    main()
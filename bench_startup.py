@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+
+# 봇 진입점과 공용 모듈. 각각 새 인터프리터에서 따로 import 해서 잰다.
+DEFAULT_MODULES = [
+    "run_bots",
+    "watch",
+    "whos_there",
+    "dungeon",
+    "earth_star",
+    "page_today",
+    "notifier",
+    "slot_store",
+    "kr_calendar",
+]
+# 모듈 하나의 import 누적 시간 상한(ms)
+DEFAULT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", "250"))
+# 시작 시점에 불러오면 안 되는 무거운 패키지 (브라우저/공휴일 계산을 실제로 할 때만 불러온다)
+FORBIDDEN_AT_STARTUP = ["selenium", "webdriver_manager", "holidays"]
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportCost:
+    module: str
+    cumulative_ms: float
+    self_ms: float
+    budget_ms: float
+    heaviest: list[tuple[str, float]] = field(default_factory=list)
+    forbidden: list[str] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.forbidden and self.cumulative_ms <= self.budget_ms
+
+
+def measure(module: str, budget_ms: float, cwd: str) -> ImportCost:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    entries: list[tuple[str, int, float, float]] = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, len(indent), int(self_us) / 1000, int(cumulative_us) / 1000))
+
+    cost = ImportCost(module=module, cumulative_ms=0.0, self_ms=0.0, budget_ms=budget_ms)
+    if proc.returncode != 0:
+        cost.error = (proc.stderr.strip().splitlines() or ["import 실패"])[-1]
+        return cost
+    top = next((e for e in reversed(entries) if e[0] == module), None)
+    if top is not None:
+        cost.self_ms, cost.cumulative_ms = top[2], top[3]
+    # 대상 모듈 바로 아래 단계에서 누적 시간이 큰 것
+    if top is not None:
+        children = [e for e in entries if e[1] == top[1] + 2 and e[0] != module]
+        cost.heaviest = [(name, ms) for name, _, _, ms in sorted(children, key=lambda e: -e[3])[:5]]
+    loaded = {name.split(".", 1)[0] for name, *_ in entries}
+    cost.forbidden = [name for name in FORBIDDEN_AT_STARTUP if name in loaded]
+    return cost
+
+
+def best_of(module: str, budget_ms: float, cwd: str, repeat: int) -> ImportCost:
+    """디스크 캐시/pyc 생성 영향을 줄이기 위해 여러 번 재서 가장 빠른 값을 쓴다."""
+    runs = [measure(module, budget_ms, cwd) for _ in range(max(1, repeat))]
+    return min(runs, key=lambda c: (c.error is not None, c.cumulative_ms))
+
+
+def parse_budgets(values: list[str], default_ms: float, modules: list[str]) -> dict[str, float]:
+    budgets = {name: default_ms for name in modules}
+    for value in values:
+        name, _, ms = value.partition("=")
+        if not name or not ms:
+            raise ValueError(f"잘못된 예산 지정: {value} (예: run_bots=200)")
+        budgets[name] = float(ms)
+    return budgets
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="python -X importtime 으로 봇 모듈의 import 비용을 재고 예산을 확인한다.")
+    parser.add_argument("modules", nargs="*", metavar="MODULE", help=f"잴 모듈 (기본: {' '.join(DEFAULT_MODULES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="모듈마다 반복 횟수 (가장 빠른 값 사용)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="모듈별 기본 예산(ms)")
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="MODULE=MS",
+        help="모듈별 예산 덮어쓰기 (여러 번 지정 가능)",
+    )
+    parser.add_argument("--output", default=None, help="결과를 JSON 으로 저장할 경로")
+    args = parser.parse_args(argv)
+
+    modules = list(dict.fromkeys(args.modules or DEFAULT_MODULES))
+    try:
+        budgets = parse_budgets(args.budget, args.budget_ms, modules)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    results = [best_of(name, budgets.get(name, args.budget_ms), cwd, args.repeat) for name in modules]
+
+    print(f"{'module':<12} {'cumul(ms)':>10} {'self(ms)':>9} {'budget':>8}  상태")
+    for cost in results:
+        if cost.error:
+            status = f"❌ import 실패: {cost.error}"
+        elif cost.forbidden:
+            status = f"❌ 시작 시 불러옴: {', '.join(cost.forbidden)}"
+        elif cost.cumulative_ms > cost.budget_ms:
+            status = "❌ 예산 초과"
+        else:
+            status = "✅"
+        print(f"{cost.module:<12} {cost.cumulative_ms:10.1f} {cost.self_ms:9.1f} {cost.budget_ms:8.0f}  {status}")
+        if cost.heaviest:
+            print("    " + ", ".join(f"{name} {ms:.1f}" for name, ms in cost.heaviest))
+
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump([{**asdict(c), "ok": c.ok} for c in results], fp, ensure_ascii=False, indent=2)
+
+    if not all(cost.ok for cost in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
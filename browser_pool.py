@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from urllib import parse
+
+import capture
+import timings
+from driver_cache import resolve_driver_path
+from readiness import report as readiness_report
+
+# selenium 은 무거워서 브라우저를 실제로 띄울 때 불러온다.
+if TYPE_CHECKING:
+    from selenium import webdriver
+    from selenium.common.exceptions import WebDriverException
+    from selenium.webdriver.chrome.options import Options
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/121.0.0.0 Safari/537.36"
+)
+MAX_RESTARTS = 2
+
+# lean: 이미지/폰트/미디어와 분석·광고 요청을 막고 eager 로드(DOMContentLoaded)로 돌려받는다.
+# full: 예전처럼 모든 리소스를 받고 load 이벤트까지 기다린다.
+BROWSER_PROFILE = os.environ.get("BROWSER_PROFILE", "lean")
+# 1 이면 사이트 호스트와 허용 목록 외의 호스트를 DNS 단계에서 막는다.
+# Chrome 기동 인자라 세션 전체(모든 사이트 허용 목록의 합집합)에 적용된다.
+BLOCK_THIRD_PARTY = os.environ.get("BROWSER_BLOCK_THIRD_PARTY", "0") == "1"
+
+# 슬롯 판정에 쓰지 않는 리소스. 스타일시트는 innerText 와 박스 좌표(던전 테마 열 선택)에 영향을 줘서 남긴다.
+RESOURCE_BLOCK_PATTERNS = (
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.m4a",
+)
+TRACKER_BLOCK_PATTERNS = (
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*googleadservices.com*", "*adservice.google.*", "*facebook.net*", "*connect.facebook.com*",
+    "*wcs.naver.net*", "*wcs.naver.com*", "*hotjar.com*", "*clarity.ms*", "*analytics.tiktok.com*",
+    "*t1.daumcdn.net/kas*", "*channel.io*",
+)
+# 사이트 스크립트가 흔히 기대는 CDN. BLOCK_THIRD_PARTY 일 때 기본으로 허용한다.
+COMMON_CDN_HOSTS = ("code.jquery.com", "ajax.googleapis.com", "cdnjs.cloudflare.com", "cdn.jsdelivr.net", "unpkg.com")
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    """사이트 하나가 페이지를 열 때의 리소스 차단 설정."""
+
+    # 사이트 자체 호스트 외에 꼭 받아야 하는 호스트 (BLOCK_THIRD_PARTY 일 때만 의미 있음)
+    allow_hosts: tuple[str, ...] = COMMON_CDN_HOSTS
+    block_stylesheets: bool = False
+    extra_block: tuple[str, ...] = ()
+
+    def blocked_urls(self) -> list[str]:
+        patterns = [*RESOURCE_BLOCK_PATTERNS, *TRACKER_BLOCK_PATTERNS, *self.extra_block]
+        if self.block_stylesheets:
+            patterns.append("*.css")
+        return patterns
+
+
+DEFAULT_LOAD_PROFILE = LoadProfile()
+# 사이트 -> (사이트 호스트, 설정). 세션을 띄울 때 호스트 허용 목록을 만든다.
+_SITE_PROFILES: dict[str, tuple[str, LoadProfile]] = {}
+
+
+def register_profile(site: str, url: str, profile: LoadProfile = DEFAULT_LOAD_PROFILE) -> LoadProfile:
+    """사이트 모듈이 import 될 때 부른다. url 의 호스트는 항상 허용된다."""
+    _SITE_PROFILES[site] = (parse.urlsplit(url).hostname or "", profile)
+    return profile
+
+
+def allowed_hosts() -> list[str]:
+    hosts = {"localhost", "127.0.0.1"}
+    for host, profile in _SITE_PROFILES.values():
+        hosts.add(host)
+        hosts.update(profile.allow_hosts)
+    return sorted(h for h in hosts if h)
+
+
+def build_chrome_options(
+    window_size: str | None = None,
+    performance_log: bool = False,
+    lean: bool = False,
+) -> Options:
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    # 여러 탭을 동시에 읽을 때 뒤에 있는 탭의 타이머/렌더링이 늦춰지지 않게 한다.
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-renderer-backgrounding")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    if window_size:
+        options.add_argument(f"--window-size={window_size}")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    if performance_log:
+        # 녹화 모드: 브라우저가 받은 문서/XHR 응답을 성능 로그로 읽는다. (capture.py)
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if lean:
+        # 모든 사이트가 driver.get 뒤에 조건 대기(readiness)를 하므로 load 이벤트까지 기다릴 필요가 없다.
+        options.page_load_strategy = "eager"
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        if BLOCK_THIRD_PARTY:
+            rules = ", ".join(["MAP * ~NOTFOUND", *(f"EXCLUDE {host}" for host in allowed_hosts())])
+            options.add_argument(f"--host-resolver-rules={rules}")
+    return options
+
+
+class BrowserSession:
+    """실행 전체에서 Chrome 하나를 재사용하고, 페이지마다 상태만 초기화한다."""
+
+    def __init__(
+        self,
+        window_size: str | None = None,
+        max_restarts: int = MAX_RESTARTS,
+        profile: str = BROWSER_PROFILE,
+        performance_log: bool = False,
+    ) -> None:
+        self.window_size = window_size
+        self.max_restarts = max_restarts
+        self.lean = profile == "lean"
+        self.performance_log = performance_log
+        self._driver: webdriver.Chrome | None = None
+        self._driver_path: str | None = None
+        self._dirty = False
+        # 지금 드라이버에 걸려 있는 차단 목록 (같으면 CDP 호출을 생략)
+        self._blocked: list[str] | None = None
+        # 처음 뜬 탭. start_tab 으로 연 탭을 닫으면 여기로 돌아온다.
+        self._main_handle: str | None = None
+        # WebDriver 는 스레드 안전하지 않으므로 여러 사이트가 세션을 나눠 쓸 때 이 락으로 순서를 맞춘다.
+        self.lock = threading.RLock()
+
+        self.resolve_seconds = 0.0
+        self.launch_count = 0
+        self.launch_seconds = 0.0
+        self.navigation_count = 0
+        self.navigation_seconds = 0.0
+        self.restart_count = 0
+
+    def __enter__(self) -> BrowserSession:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.quit()
+
+    @property
+    def driver(self) -> webdriver.Chrome:
+        if self._driver is None:
+            self._launch()
+        assert self._driver is not None
+        return self._driver
+
+    def _launch(self) -> None:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        if self._driver_path is None:
+            started = time.perf_counter()
+            self._driver_path = resolve_driver_path()
+            self.resolve_seconds = time.perf_counter() - started
+            timings.record(timings.DRIVER_RESOLVE, self.resolve_seconds)
+        started = time.perf_counter()
+        with timings.span(timings.DRIVER_LAUNCH):
+            self._driver = webdriver.Chrome(
+                service=Service(self._driver_path),
+                options=build_chrome_options(
+                    self.window_size,
+                    performance_log=self.performance_log or capture.active() is not None,
+                    lean=self.lean,
+                ),
+            )
+        self._dirty = False
+        self._blocked = None
+        self._main_handle = self._driver.current_window_handle
+        self.launch_count += 1
+        self.launch_seconds += time.perf_counter() - started
+
+    def is_alive(self) -> bool:
+        if self._driver is None:
+            return False
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            self._driver.window_handles
+        except WebDriverException:
+            return False
+        return True
+
+    def reset_page(self) -> None:
+        from selenium.common.exceptions import WebDriverException
+
+        # 이전 날짜의 쿠키/스토리지가 다음 페이지 결과에 섞이지 않도록 비운다.
+        driver = self.driver
+        try:
+            driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        except WebDriverException:
+            pass
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+        self._dirty = False
+
+    def apply_profile(self, profile: LoadProfile) -> None:
+        """lean 세션이면 profile 의 URL 차단 목록을 CDP 로 건다. 바뀌었을 때만 호출한다."""
+        if not self.lean:
+            return
+        blocked = profile.blocked_urls()
+        if blocked == self._blocked:
+            return
+        driver = self.driver
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked})
+        self._blocked = blocked
+
+    def ensure_alive(self) -> None:
+        """세션이 떠 있는데 응답하지 않으면 다시 띄운다. (아직 띄우지 않은 세션은 그대로 둔다)"""
+        if self._driver is not None and not self.is_alive():
+            self.restart("세션 응답 없음")
+
+    def recover(self, exc: WebDriverException, attempt: int) -> None:
+        """attempt 번째 시도가 exc 로 실패했을 때 부른다. 세션이 죽었고 재시작 횟수가 남았으면 다시 띄우고, 아니면 exc 를 올린다."""
+        if attempt >= self.max_restarts or self.is_alive():
+            raise exc
+        self.restart(str(exc).splitlines()[0] if str(exc) else type(exc).__name__)
+
+    def open(self, url: str, profile: LoadProfile = DEFAULT_LOAD_PROFILE) -> webdriver.Chrome:
+        """초기화된 페이지 상태로 url 에 접속한다. 세션이 죽어 있으면 다시 띄운다."""
+        from selenium.common.exceptions import WebDriverException
+
+        for attempt in range(self.max_restarts + 1):
+            self.ensure_alive()
+            try:
+                driver = self.driver
+                if self._dirty:
+                    self.reset_page()
+                self.apply_profile(profile)
+                started = time.perf_counter()
+                self._dirty = True
+                with timings.span(timings.NAVIGATION):
+                    driver.get(url)
+                self.navigation_count += 1
+                self.navigation_seconds += time.perf_counter() - started
+                return driver
+            except WebDriverException as exc:
+                self.recover(exc, attempt)
+        raise RuntimeError("unreachable")
+
+    def start_tab(self, url: str, profile: LoadProfile = DEFAULT_LOAD_PROFILE) -> str:
+        """새 탭에서 url 로 이동을 시작만 하고(로드를 기다리지 않는다) 탭 핸들을 돌려준다.
+
+        이동이 동시에 진행되도록 여러 탭을 먼저 띄운 뒤 준비된 탭부터 읽는 용도. lock 을 잡고 불러야 한다.
+        """
+        driver = self.driver
+        driver.switch_to.new_window("tab")
+        if self.lean:
+            # CDP 차단 목록은 탭(target)마다 따로라서 새 탭에 다시 건다.
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": profile.blocked_urls()})
+        driver.execute_script("window.location.href = arguments[0];", url)
+        self._dirty = True
+        self.navigation_count += 1
+        return driver.current_window_handle
+
+    def close_tab(self, handle: str) -> None:
+        # 재시작으로 세션이 바뀌었으면 예전 탭은 이미 없다. 닫자고 새 브라우저를 띄우지 않는다.
+        driver = self._driver
+        if driver is None or self._main_handle is None or handle == self._main_handle:
+            return
+        driver.switch_to.window(handle)
+        driver.close()
+        driver.switch_to.window(self._main_handle)
+
+    def restart(self, reason: str = "") -> None:
+        print(f"⚠️ 브라우저 세션 재시작: {reason}")
+        self.quit()
+        self.restart_count += 1
+
+    def quit(self) -> None:
+        if self._driver is None:
+            return
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            self._driver.quit()
+        except WebDriverException:
+            pass
+        self._driver = None
+        self._dirty = False
+        self._blocked = None
+        self._main_handle = None
+
+    def report(self) -> str:
+        return (
+            f"⏱️ 드라이버 확인 {self.resolve_seconds:.2f}s / "
+            f"브라우저 기동 {self.launch_count}회 {self.launch_seconds:.2f}s / "
+            f"페이지 이동 {self.navigation_count}회 {self.navigation_seconds:.2f}s / "
+            f"재시작 {self.restart_count}회 / 로딩 {'lean' if self.lean else 'full'}\n"
+            f"{readiness_report()}"
+        )
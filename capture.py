@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import base64
+import json
+import os
+import threading
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any
+from urllib import parse
+
+from http_pool import HttpResponse, add_response_listener, remove_response_listener
+from replay_fixtures import (
+    FIXTURES_DIR,
+    SOURCE_BROWSER,
+    SOURCE_HTTP,
+    SOURCE_RENDERED,
+    Exchange,
+    Scenario,
+)
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+# 성능 로그에서 녹화할 응답 종류 (이미지/스타일시트 등은 재생에 필요 없다)
+BROWSER_RESOURCE_TYPES = {"Document", "XHR", "Fetch"}
+_EXTENSIONS = {"html": ".html", "json": ".json", "javascript": ".js", "xml": ".xml"}
+
+_ACTIVE: CaptureSession | None = None
+
+
+def active() -> CaptureSession | None:
+    return _ACTIVE
+
+
+def _origin(url: str) -> str:
+    parts = parse.urlsplit(url)
+    return f"{parts.scheme.lower()}://{(parts.netloc or '').lower()}"
+
+
+def _form_params(body: bytes | None, content_type: str) -> dict[str, str]:
+    if not body or "x-www-form-urlencoded" not in content_type:
+        return {}
+    return dict(parse.parse_qsl(body.decode("utf-8", errors="replace"), keep_blank_values=True))
+
+
+def _extension(content_type: str) -> str:
+    for marker, ext in _EXTENSIONS.items():
+        if marker in content_type:
+            return ext
+    return ".txt"
+
+
+class CaptureSession:
+    """실행 중 가져온 응답(봇 HTTP, 브라우저 문서/XHR, 렌더링 후 DOM)을 사이트별 시나리오로 모은다.
+
+    사이트 구분은 요청 주소의 origin 으로 한다. 재생 서버는 경로만 보므로 다른 호스트(CDN 등)의 응답은 버린다.
+    """
+
+    def __init__(
+        self,
+        origins: dict[str, str],
+        now_kst: datetime,
+        holiday_set: set[date],
+        root: str = FIXTURES_DIR,
+    ) -> None:
+        self.origins = {_origin(url): site for site, url in origins.items()}
+        self.now_kst = now_kst
+        self.holidays = sorted(d.isoformat() for d in holiday_set)
+        self.root = root
+        self.stamp = now_kst.strftime("%Y%m%d-%H%M%S")
+        self._lock = threading.Lock()
+        self._exchanges: dict[str, list[tuple[Exchange, bytes]]] = {}
+        self.skipped = 0
+
+    def __enter__(self) -> CaptureSession:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def start(self) -> CaptureSession:
+        global _ACTIVE
+        _ACTIVE = self
+        add_response_listener(self.on_http_response)
+        return self
+
+    def stop(self) -> None:
+        global _ACTIVE
+        remove_response_listener(self.on_http_response)
+        if _ACTIVE is self:
+            _ACTIVE = None
+
+    def add(
+        self,
+        url: str,
+        method: str,
+        params: dict[str, str],
+        status: int,
+        content_type: str,
+        body: bytes,
+        source: str,
+        elapsed: float = 0.0,
+    ) -> None:
+        site = self.origins.get(_origin(url))
+        if site is None:
+            with self._lock:
+                self.skipped += 1
+            return
+        parts = parse.urlsplit(url)
+        params = {**dict(parse.parse_qsl(parts.query, keep_blank_values=True)), **params}
+        with self._lock:
+            exchanges = self._exchanges.setdefault(site, [])
+            body_file = f"{len(exchanges):03d}-{source}{_extension(content_type)}"
+            exchange = Exchange(
+                method=method.upper(),
+                path=parts.path or "/",
+                params=params,
+                status=status,
+                content_type=content_type,
+                body_file=body_file,
+                source=source,
+                elapsed=round(elapsed, 4),
+            )
+            exchanges.append((exchange, body))
+
+    def on_http_response(self, method: str, body: bytes | None, response: HttpResponse) -> None:
+        content_type = response.headers.get("content-type", "application/octet-stream")
+        # 요청 본문의 Content-Type 은 알 수 없지만 post_form 만 본문을 보내므로 폼으로 해석해 본다.
+        params = _form_params(body, "x-www-form-urlencoded") if method.upper() == "POST" else {}
+        self.add(
+            response.url,
+            method,
+            params,
+            response.status,
+            content_type,
+            response.body,
+            SOURCE_HTTP,
+            response.elapsed,
+        )
+
+    def record_page(self, driver: webdriver.Chrome, rendered: bool = True) -> None:
+        """준비 대기가 끝난 페이지의 DOM 과, 그 페이지가 받은 문서/XHR 응답을 녹화한다."""
+        if rendered:
+            self.add(
+                driver.current_url,
+                "GET",
+                {},
+                200,
+                "text/html; charset=utf-8",
+                driver.page_source.encode("utf-8"),
+                SOURCE_RENDERED,
+            )
+        for entry in _browser_responses(driver):
+            self.add(**entry, source=SOURCE_BROWSER)
+
+    def save(self, scans: dict[str, tuple[list[list[str]], float]]) -> list[Scenario]:
+        """scans: 사이트 -> (찾은 [theme, date, time] 목록, 소요 초). 녹화가 있는 사이트만 저장한다."""
+        scenarios = []
+        with self._lock:
+            recorded = dict(self._exchanges)
+        for site, entries in recorded.items():
+            slots, seconds = scans.get(site, (None, 0.0))
+            scenario = Scenario(
+                name=f"{site}-{self.stamp}",
+                site=site,
+                now_kst=self.now_kst.isoformat(timespec="seconds"),
+                holidays=self.holidays,
+                expected=sorted(slots) if slots is not None else None,
+                meta={
+                    "captured_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+                    "site_seconds": round(seconds, 3),
+                    "sources": {
+                        source: sum(1 for exchange, _ in entries if exchange.source == source)
+                        for source in (SOURCE_HTTP, SOURCE_BROWSER, SOURCE_RENDERED)
+                    },
+                },
+                directory=os.path.join(self.root, f"{site}-{self.stamp}"),
+            )
+            os.makedirs(scenario.directory, exist_ok=True)
+            for exchange, body in entries:
+                with open(os.path.join(scenario.directory, exchange.body_file), "wb") as fp:
+                    fp.write(body)
+                scenario.exchanges.append(exchange)
+            scenario.save()
+            scenarios.append(scenario)
+        return scenarios
+
+
+def record_page(driver: webdriver.Chrome, rendered: bool = True) -> None:
+    """녹화 중일 때만 현재 페이지를 남긴다. 사이트 모듈이 추출 직전에 부른다.
+
+    rendered=False 면 DOM 은 빼고 그 사이 받은 XHR 응답만 남긴다. (같은 페이지에서 날짜만 바꾸는 경우)
+    """
+    session = _ACTIVE
+    if session is None:
+        return
+    try:
+        session.record_page(driver, rendered)
+    except Exception as exc:
+        # 녹화 실패로 검사 자체가 실패하면 안 된다.
+        print(f"⚠️ 페이지 녹화 실패: {type(exc).__name__}: {exc}")
+
+
+def _browser_responses(driver: webdriver.Chrome) -> list[dict[str, Any]]:
+    """Chrome 성능 로그(goog:loggingPrefs)에서 문서/XHR 응답을 찾아 본문과 함께 돌려준다.
+
+    로그는 읽으면 비워지므로 직전 record 이후 이 탭에서 일어난 요청만 나온다.
+    """
+    requests: dict[str, dict[str, Any]] = {}
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        method = message.get("method")
+        params = message.get("params") or {}
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            request = params["request"]
+            requests[request_id] = {
+                "url": request["url"],
+                "method": request.get("method", "GET"),
+                "params": _form_params(
+                    (request.get("postData") or "").encode("utf-8"),
+                    (request.get("headers") or {}).get("Content-Type", ""),
+                ),
+                "started": params.get("timestamp", 0.0),
+            }
+        elif method == "Network.responseReceived" and request_id in requests:
+            if params.get("type") not in BROWSER_RESOURCE_TYPES:
+                requests.pop(request_id)
+                continue
+            response = params["response"]
+            requests[request_id]["status"] = response.get("status", 200)
+            requests[request_id]["content_type"] = response.get("mimeType") or "text/html"
+        elif method == "Network.loadingFinished" and request_id in requests:
+            requests[request_id]["finished"] = params.get("timestamp", 0.0)
+
+    from selenium.common.exceptions import WebDriverException
+
+    found = []
+    for request_id, info in requests.items():
+        if "status" not in info or "finished" not in info:
+            continue
+        try:
+            result = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except WebDriverException:
+            # 리다이렉트 응답이나 이미 버려진 본문
+            continue
+        body = result.get("body", "")
+        payload = base64.b64decode(body) if result.get("base64Encoded") else body.encode("utf-8")
+        found.append(
+            {
+                "url": info["url"],
+                "method": info["method"],
+                "params": info["params"],
+                "status": int(info["status"]),
+                "content_type": info["content_type"],
+                "body": payload,
+                "elapsed": max(0.0, info["finished"] - info["started"]),
+            }
+        )
+    return found
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import subprocess
+from datetime import datetime
+
+# 확인된 chromedriver 경로와 그때의 Chrome/드라이버 버전을 기록하는 파일
+CACHE_PATH = os.environ.get("CHROMEDRIVER_CACHE", os.path.join(".cache", "chromedriver.json"))
+# 설치된 Chrome 실행 파일을 직접 지정할 때 사용 (없으면 PATH 에서 순서대로 찾는다)
+CHROME_BINARY = os.environ.get("CHROME_BINARY")
+CHROME_CANDIDATES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+_VERSION_PATTERN = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+
+
+def _read_version(binary: str) -> str | None:
+    try:
+        output = subprocess.run(
+            [binary, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            check=False,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = _VERSION_PATTERN.search(output or "")
+    return match.group(0) if match else None
+
+
+def installed_chrome_version() -> str | None:
+    """네트워크 없이 로컬 Chrome 실행 파일의 버전을 읽는다."""
+    candidates = [CHROME_BINARY] if CHROME_BINARY else CHROME_CANDIDATES
+    for name in candidates:
+        binary = shutil.which(name) or (name if os.path.isfile(name) else None)
+        if not binary:
+            continue
+        version = _read_version(binary)
+        if version:
+            return version
+    return None
+
+
+def major_version(version: str | None) -> str | None:
+    return version.split(".", 1)[0] if version else None
+
+
+def _load_cache() -> dict[str, str]:
+    try:
+        with open(CACHE_PATH, encoding="utf-8") as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_cache(data: dict[str, str]) -> None:
+    directory = os.path.dirname(CACHE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{CACHE_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fp:
+        json.dump(data, fp, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, CACHE_PATH)
+
+
+def _is_compatible(cached: dict[str, str], browser_version: str | None) -> bool:
+    driver_path = cached.get("driver_path") or ""
+    if not driver_path or not os.path.isfile(driver_path) or not os.access(driver_path, os.X_OK):
+        return False
+    if browser_version is None:
+        # Chrome 버전을 읽을 수 없으면 기록된 드라이버를 그대로 믿는다 (오프라인 실행 우선).
+        return True
+    browser_major = major_version(browser_version)
+    return browser_major == major_version(cached.get("browser_version")) and browser_major == major_version(
+        cached.get("driver_version")
+    )
+
+
+def resolve_driver_path() -> str:
+    """캐시된 chromedriver 가 설치된 Chrome 과 메이저 버전이 맞으면 그대로 쓰고, 아니면 webdriver-manager 로 다시 받는다."""
+    browser_version = installed_chrome_version()
+    cached = _load_cache()
+    if _is_compatible(cached, browser_version):
+        return cached["driver_path"]
+
+    if cached:
+        print(
+            f"🔁 chromedriver 재확인: Chrome {browser_version or '?'} / "
+            f"기록 {cached.get('browser_version') or '?'} ({cached.get('driver_path') or '-'})"
+        )
+    # 캐시가 맞지 않을 때만 webdriver-manager 를 불러온다.
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    driver_path = ChromeDriverManager().install()
+    try:
+        _save_cache(
+            {
+                "driver_path": driver_path,
+                "driver_version": _read_version(driver_path) or "",
+                "browser_version": browser_version or "",
+                "resolved_at": datetime.utcnow().isoformat(timespec="seconds"),
+            }
+        )
+    except OSError as exc:
+        print(f"⚠️ chromedriver 캐시 저장 실패: {exc}")
+    return driver_path
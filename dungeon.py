@@ -1,38 +1,62 @@
 from __future__ import annotations
 
-import json
 import os
-import re
 import time
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
-from typing import Any
-from urllib import parse, request
-
-try:
-    import holidays
-except ImportError:
-    holidays = None
-
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
+from http.client import HTTPException
+from typing import TYPE_CHECKING, Any, Callable
+from urllib import parse
+
+import capture
+import timings
+import watchlist
+from browser_pool import USER_AGENT, BrowserSession, register_profile
+from html_dom import Node, parse_html
+from http_pool import KeepAliveClient
+from kr_calendar import build_holiday_set
+from notifier import flush, send_telegram
+from readiness import wait_until_ready
+from slot_signals import AVAILABLE, BLOCKED, KeywordClassifier, SignalRule
+from slot_store import SiteScan, Slot, SlotStore, diff_messages
+from slot_time import COLON, colon_times, has_time, tokenize, tokenize_many
+from watchlist import Fetch, Target
+
+# selenium 은 HTTP 엔진이 폴백할 때만 불러온다.
+if TYPE_CHECKING:
+    from selenium import webdriver
 
 # --- [설정] ---
-BASE_URL = "https://xdungeon.net/layout/res/home.php"
+SITE_NAME = "dungeon"
+SITE_LABEL = "던전"
+# 녹화한 페이지로 재생할 때는 로컬 서버 주소로 바꾼다. (bench_replay.py)
+BASE_URL = os.environ.get("DUNGEON_BASE_URL", "https://xdungeon.net/layout/res/home.php")
+# 이미지/폰트/추적 스크립트 차단 설정 (browser_pool.BROWSER_PROFILE=lean 일 때)
+LOAD_PROFILE = register_profile(SITE_NAME, BASE_URL)
+# 기본 감시 대상 (watchlist.json 에 dungeon 항목이 없을 때)
 ZIZUM_ID = 9
 THEME_KEYWORD = "향"
-THEME_INDEX = int(os.environ.get("DUNGEON_THEME_INDEX", "2"))  # 1-based
+# 키워드 박스가 없을 때 고를 테마 컬럼 (1-based). 대상별로는 watchlist 의 index 로 바꾼다.
+THEME_INDEX = int(os.environ.get("DUNGEON_THEME_INDEX", "2"))
 WAIT_SECONDS = 12
 OPEN_HOUR_KST = 22
+WINDOW_SIZE = "1280,2200"
+# http: 페이지 HTML을 직접 받아 파싱하고, 마크업이 없을 때만 Selenium 으로 폴백 / browser: 항상 Selenium
+ENGINE = os.environ.get("DUNGEON_ENGINE", "http")
+# 브라우저로 볼 날짜가 여럿이면 날짜마다 탭을 열어 동시에 불러온다. 동시에 열어 둘 탭 수 (1 이면 한 탭에서 순서대로)
+MAX_TABS = max(1, int(os.environ.get("DUNGEON_MAX_TABS", "4")))
+TAB_POLL_SECONDS = 0.05
+# 탭을 돌며 가볍게 확인하는 조건. 통과한 탭부터 wait_until_ready 로 안정될 때까지 기다린 뒤 읽는다.
+TAB_READY_PROBE = "return document.readyState !== 'loading' && !!document.querySelector('.time_box');"
 
-WEEKDAY_ONLY = "20:30"
 HOLIDAY_START = "11:30"
 HOLIDAY_END = "20:30"
 KOR_WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+# 평일 구간이 없으므로 평일 날짜는 조회하지 않는다.
+DEFAULT_TARGETS: list[dict[str, object]] = [
+    {"branch": ZIZUM_ID, "theme": THEME_KEYWORD, "index": THEME_INDEX, "holiday": [f"{HOLIDAY_START}-{HOLIDAY_END}"]},
+]
 
 BLOCKED_KEYWORDS = [
     "예약불가",
@@ -47,10 +71,95 @@ BLOCKED_KEYWORDS = [
     "full",
 ]
 AVAILABLE_KEYWORDS = ["예약가능", "가능", "예약", "open", "available", "신청"]
+# 슬롯 판정은 blocked 만 쓰고, available/neutral 은 DEBUG 로그에서 이유를 보여 주는 용도
+SIGNAL_CLASSIFIER = KeywordClassifier(
+    [
+        SignalRule("text", BLOCKED, tuple(BLOCKED_KEYWORDS)),
+        SignalRule("classes", BLOCKED, ("disabled", "close", "sold", "full", "finish")),
+        SignalRule("text", AVAILABLE, tuple(AVAILABLE_KEYWORDS)),
+        SignalRule("classes", AVAILABLE, ("btn", "time", "reserve", "slot")),
+    ]
+)
 
-TELEGRAM_TOKEN = os.environ.get("MY_ALARM_TOKEN")
-TELEGRAM_CHAT_ID = os.environ.get("MY_CHAT_ID")
 DEBUG = os.environ.get("DEBUG_SLOT", "0") == "1"
+# snapshot: execute_script 한 번으로 슬롯 노드 전체를 가져온다 / element: 노드별 get_attribute (기존 방식)
+EXTRACT_MODE = os.environ.get("DUNGEON_EXTRACT_MODE", "snapshot")
+
+SLOT_TEXT_ATTRS = [
+    "innerText",
+    "textContent",
+    "aria-label",
+    "title",
+    "data-time",
+    "data-value",
+    "value",
+    "onclick",
+    "href",
+]
+
+# 테마 박스를 찾는 셀렉터와 박스 제목으로 볼 요소. 전체 묶음(.thm_box)은 박스가 아니다.
+THEME_BOX_SELECTOR = ".box"
+THEME_TITLE_SELECTOR = "h1, h2, h3, h4, h5, h6, .tit, .title, .name, strong"
+
+# 페이지의 테마 박스 전부를 한 번에 직렬화한다. 박스마다 제목/전체 텍스트/가로 위치와
+# 슬롯 노드(.time_box ul li, 없으면 .time_box *)의 속성과 하위 링크를 돌려준다.
+# Selenium get_attribute 와 같은 규칙(프로퍼티 우선, 없으면 HTML 속성)으로 값을 읽는다.
+THEME_TABLE_SCRIPT = """
+var boxSelector = arguments[0];
+var titleSelector = arguments[1];
+var names = arguments[2];
+function read(el, name) {
+  var value = null;
+  if (name.indexOf('-') === -1 && name !== 'onclick' && name in el) {
+    value = el[name];
+  }
+  if (value === null || value === undefined) {
+    value = el.getAttribute(name);
+  }
+  return value === null || value === undefined ? '' : String(value);
+}
+function snapshot(box) {
+  var nodes = box.querySelectorAll('.time_box ul li');
+  if (!nodes.length) {
+    nodes = box.querySelectorAll('.time_box *');
+  }
+  var result = [];
+  for (var i = 0; i < nodes.length; i++) {
+    var el = nodes[i];
+    var texts = [];
+    for (var n = 0; n < names.length; n++) {
+      texts.push(read(el, names[n]));
+    }
+    var hrefs = [];
+    var links = el.querySelectorAll('a[href]');
+    for (var k = 0; k < links.length; k++) {
+      hrefs.push(links[k].href || links[k].getAttribute('href') || '');
+    }
+    result.push({
+      texts: texts,
+      classes: el.getAttribute('class') || '',
+      disabled: (el.disabled || el.hasAttribute('disabled')) ? 'true' : null,
+      ariaDisabled: el.getAttribute('aria-disabled') || '',
+      hrefs: hrefs
+    });
+  }
+  return result;
+}
+var boxes = document.querySelectorAll(boxSelector);
+var table = [];
+for (var b = 0; b < boxes.length; b++) {
+  var box = boxes[b];
+  if ((box.getAttribute('class') || '').toLowerCase().indexOf('thm_box') !== -1) continue;
+  var head = box.querySelector(titleSelector);
+  table.push({
+    title: head ? (head.innerText || '') : '',
+    text: box.innerText || '',
+    x: box.getBoundingClientRect().left + window.scrollX,
+    nodes: snapshot(box)
+  });
+}
+return table;
+"""
 
 
 def get_kst_now() -> datetime:
@@ -62,211 +171,48 @@ def get_open_dates(now_kst: datetime) -> list[date]:
     return [(now_kst.date() + timedelta(days=offset)) for offset in range(total_days)]
 
 
-def build_holiday_set(open_dates: list[date]) -> set[date]:
-    if holidays is None:
-        raise RuntimeError("공휴일 판별을 위해 holidays 패키지가 필요합니다. 설치: pip install holidays")
-    years = sorted({d.year for d in open_dates})
-    kr_holidays = holidays.country_holidays("KR", years=years)
-    return set(kr_holidays.keys())
+def target_name(target: Target) -> str:
+    return f"{target.branch}/{target.theme}"
+
+
+def load_targets() -> list[Target]:
+    return watchlist.targets_for(SITE_NAME, DEFAULT_TARGETS, target_name)
+
 
+def theme_index(target: Target) -> int:
+    return int(target.param("index", THEME_INDEX))
 
-def build_url(target_date: str) -> str:
+
+def build_url(target_date: str, zizum_id: object = ZIZUM_ID) -> str:
     params = {
         "go": "rev.main",
-        "s_zizum": str(ZIZUM_ID),
+        "s_zizum": str(zizum_id),
         "rev_days": target_date,
     }
     return f"{BASE_URL}?{parse.urlencode(params)}"
 
 
-def to_minutes(hhmm: str) -> int:
-    hh, mm = hhmm.split(":")
-    return int(hh) * 60 + int(mm)
-
-
-def is_in_allowed_time_range(slot_time: str, is_holiday: bool) -> bool:
-    value = to_minutes(slot_time)
-    if is_holiday:
-        return to_minutes(HOLIDAY_START) <= value <= to_minutes(HOLIDAY_END)
-    return value == to_minutes(WEEKDAY_ONLY)
-
-
-def extract_time(text: str) -> str | None:
-    for pattern in [
-        r"\b([01]?\d|2[0-3]):([0-5]\d)\b",
-        r"\b([01]?\d|2[0-3])\s*시\s*([0-5]?\d)\s*분?\b",
-        r"\b([01]?\d|2[0-3])\s*시\b",
-        r"\b([01]\d|2[0-3])([0-5]\d)\b",
-    ]:
-        m = re.search(pattern, text)
-        if not m:
-            continue
-        if pattern.endswith("시\\b"):
-            return f"{int(m.group(1)):02d}:00"
-        if len(m.groups()) == 2:
-            return f"{int(m.group(1)):02d}:{int(m.group(2)):02d}"
-    return None
-
-
-def extract_times(text: str) -> list[str]:
-    matches = re.findall(r"\b([01]?\d|2[0-3]):([0-5]\d)\b", text)
-    result = []
-    seen = set()
-    for hh, mm in matches:
-        value = f"{int(hh):02d}:{mm}"
-        if value in seen:
-            continue
-        seen.add(value)
-        result.append(value)
-    return result
-
-
-def has_blocked_signal(text: str, classes: str, disabled_attr: str | None, aria_disabled: str) -> bool:
-    if disabled_attr is not None or aria_disabled == "true":
-        return True
-
-    lowered = text.lower()
-    lowered_classes = classes.lower()
-    if any(token in lowered_classes for token in ["disabled", "close", "sold", "full", "finish"]):
-        return True
-    return any(token in lowered for token in BLOCKED_KEYWORDS)
-
-
-def has_available_hint(text: str, classes: str) -> bool:
-    lowered = text.lower()
-    if any(token in lowered for token in AVAILABLE_KEYWORDS):
-        return True
-    lowered_classes = classes.lower()
-    return any(token in lowered_classes for token in ["btn", "time", "reserve", "slot"])
-
-
-def _has_time_pattern(text: str) -> bool:
-    return re.search(r"\b([01]?\d|2[0-3]):([0-5]\d)\b", text) is not None
-
-
-def _pick_theme_containers(driver: webdriver.Chrome) -> list[Any]:
-    # 핵심: thm_box(전체 묶음) 제외, 개별 테마 박스(.box)만 대상으로 한다.
-    boxes = []
-    for selector in [".thm_box > .box", ".thm_box .box", ".box"]:
-        boxes.extend(driver.find_elements(By.CSS_SELECTOR, selector))
-
-    # 중복 제거
-    uniq: list[Any] = []
-    seen = set()
-    for box in boxes:
-        key = box.id
-        if key in seen:
-            continue
-        seen.add(key)
-        uniq.append(box)
-
-    # 1) 향 키워드 박스 우선
-    keyword_hits = []
-    for elem in uniq:
-        text = " ".join((elem.text or "").split())
-        cls = (elem.get_attribute("class") or "").lower()
-        if "thm_box" in cls:
-            continue
-        if THEME_KEYWORD in text and _has_time_pattern(text):
-            keyword_hits.append(elem)
-    if keyword_hits:
-        return keyword_hits
-
-    # 2) 키워드가 없으면 가운데 박스 선택
-    # 박스 기준 x좌표 정렬 후 theme index(기본 2번) 선택
-    col = []
-    for elem in uniq:
-        text = " ".join((elem.text or "").split())
-        cls = (elem.get_attribute("class") or "").lower()
-        if "thm_box" in cls:
-            continue
-        if not _has_time_pattern(text):
-            continue
-        rect = elem.rect or {}
-        col.append((float(rect.get("x") or 0), elem))
-    if not col:
-        return []
-    col.sort(key=lambda x: x[0])
-    idx = min(max(THEME_INDEX, 1), len(col)) - 1
-    return [col[idx][1]]
-
-
-def send_telegram(msg: str) -> None:
-    if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
-        print("⚠️ 텔레그램 설정 없음: MY_ALARM_TOKEN / MY_CHAT_ID")
-        return
-
-    endpoint = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-    payload = json.dumps({"chat_id": TELEGRAM_CHAT_ID, "text": msg}).encode("utf-8")
-    headers = {"Content-Type": "application/json"}
-    try:
-        req = request.Request(endpoint, data=payload, headers=headers, method="POST")
-        with request.urlopen(req, timeout=10) as resp:
-            print(f"📡 텔레그램 전송 결과: {resp.status}")
-    except Exception as exc:
-        print(f"⚠️ 텔레그램 전송 실패: {exc}")
-
-
-def create_driver() -> webdriver.Chrome:
-    options = Options()
-    options.add_argument("--headless=new")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1280,2200")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/121.0.0.0 Safari/537.36"
+def has_reservation_link(hrefs: list[str]) -> bool:
+    return any(
+        ("go=rev." in h and "rev.main" not in h and "javascript:" not in h.lower())
+        or ("rev.write" in h)
+        or ("rev.resv" in h)
+        for h in hrefs
     )
-    return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
-
-def collect_slots(driver: webdriver.Chrome, target_date: str, is_holiday: bool) -> list[str]:
-    url = build_url(target_date)
-    print(f"🔎 접속: {url}")
 
-    driver.get(url)
-    WebDriverWait(driver, WAIT_SECONDS).until(EC.presence_of_element_located((By.CSS_SELECTOR, "body")))
-    time.sleep(1.2)
-
-    # 1) '향' 키워드 우선, 없으면 가운데 컬럼(2번 테마) 폴백
-    containers = _pick_theme_containers(driver)
-    elements = []
-    for container in containers:
-        # 던전 페이지 구조 기준: time_box > ul > li 가 시간 슬롯 단위
-        li_slots = container.find_elements(By.CSS_SELECTOR, ".time_box ul li")
-        if li_slots:
-            elements.extend(li_slots)
-            continue
-        # 폴백
-        elements.extend(container.find_elements(By.CSS_SELECTOR, ".time_box *"))
 
+def evaluate_slot_nodes(nodes: list[dict[str, Any]], allows: Callable[[str], bool]) -> tuple[set[str], list[str]]:
     slots = set()
     debug_lines = []
 
-    for elem in elements:
-        text_parts = []
-        for attr in [
-            "innerText",
-            "textContent",
-            "aria-label",
-            "title",
-            "data-time",
-            "data-value",
-            "value",
-            "onclick",
-            "href",
-        ]:
-            value = elem.get_attribute(attr) or ""
-            if value:
-                text_parts.append(value)
-
-        text = " ".join(" ".join(text_parts).split())
+    texts = [" ".join(" ".join(value for value in node.get("texts", []) if value).split()) for node in nodes]
+    # 스냅샷 전체의 시간 표기를 한 번에 훑는다.
+    for node, text, tokens in zip(nodes, texts, tokenize_many(texts)):
         if not text:
             continue
         # 테마명 텍스트가 없는 시간 노드가 많으므로 여기서는 키워드 강제 제외
 
-        slot_times = extract_times(text)
+        slot_times = colon_times(tokens)
         if not slot_times:
             continue
 
@@ -276,33 +222,31 @@ def collect_slots(driver: webdriver.Chrome, target_date: str, is_holiday: bool)
                 debug_lines.append(f"SKIP(BULK_NODE) {','.join(slot_times[:5])} | text={text[:120]}")
             continue
 
-        classes = elem.get_attribute("class") or ""
-        disabled_attr = elem.get_attribute("disabled")
-        aria_disabled = (elem.get_attribute("aria-disabled") or "").lower()
+        classes = node.get("classes") or ""
+        disabled_attr = node.get("disabled")
+        aria_disabled = (node.get("ariaDisabled") or "").lower()
 
-        if has_blocked_signal(text, classes, disabled_attr, aria_disabled):
+        verdict = SIGNAL_CLASSIFIER.classify(
+            disabled=disabled_attr is not None or aria_disabled == "true",
+            text=text,
+            classes=classes,
+        )
+        if verdict.blocked:
             if DEBUG:
-                debug_lines.append(f"BLOCKED {','.join(slot_times[:5])} | text={text} | class={classes}")
+                debug_lines.append(
+                    f"BLOCKED {','.join(slot_times[:5])} [{verdict.describe()}] | text={text} | class={classes}"
+                )
             continue
 
+        hrefs = [h.strip() for h in node.get("hrefs", []) if h and h.strip()]
         for slot_time in slot_times:
-            if not is_in_allowed_time_range(slot_time, is_holiday):
+            if not allows(slot_time):
                 if DEBUG:
                     debug_lines.append(f"SKIP(TIME_FILTER) {slot_time} | text={text} | class={classes}")
                 continue
 
             # 핵심: 실제 예약 페이지로 이동 가능한 슬롯만 허용
-            links = elem.find_elements(By.CSS_SELECTOR, "a[href]")
-            hrefs = [((a.get_attribute("href") or "").strip()) for a in links]
-            hrefs = [h for h in hrefs if h]
-            has_reservation_link = any(
-                ("go=rev." in h and "rev.main" not in h and "javascript:" not in h.lower())
-                or ("rev.write" in h)
-                or ("rev.resv" in h)
-                for h in hrefs
-            )
-
-            if not has_reservation_link:
+            if not has_reservation_link(hrefs):
                 if DEBUG:
                     debug_lines.append(
                         f"SKIP(NO_RESERVATION_LINK) {slot_time} | text={text} | class={classes} | hrefs={hrefs}"
@@ -311,72 +255,451 @@ def collect_slots(driver: webdriver.Chrome, target_date: str, is_holiday: bool)
 
             slots.add(slot_time)
             if DEBUG:
-                debug_lines.append(f"OPEN(LINK) {slot_time} | text={text} | class={classes} | hrefs={hrefs}")
+                debug_lines.append(
+                    f"OPEN(LINK) {slot_time} [{verdict.describe()}] | text={text} | class={classes} | hrefs={hrefs}"
+                )
 
-    if DEBUG:
-        print("----- DEBUG SLOT CANDIDATES -----")
-        print(
-            f"DEBUG: theme={THEME_KEYWORD}, theme_index={THEME_INDEX}, "
-            f"containers={len(containers)}, candidates={len(elements)}"
+    return slots, debug_lines
+
+
+@dataclass
+class ThemeSlots:
+    """rev.main 페이지의 테마 박스(컬럼) 하나. times 는 시간 구간으로 거르기 전의 예약 가능 시간."""
+
+    column: int
+    name: str
+    text: str
+    times: list[str]
+    candidates: int = 0
+    debug: list[str] = field(default_factory=list)
+
+
+def _theme_title(title: str, text: str) -> str:
+    title = " ".join((title or "").split())
+    if title:
+        return title
+    # 제목 요소가 없으면 첫 시간 표기 앞의 텍스트를 이름으로 쓴다.
+    first = next((token for token in tokenize(text) if token.kind == COLON), None)
+    return text[: first.start].strip() if first else text
+
+
+def build_theme_table(boxes: list[dict[str, Any]]) -> list[ThemeSlots]:
+    """박스 스냅샷(title, text, x, nodes) 전부를 가로 위치 순 컬럼 표로 만든다. 시간이 없는 박스는 컬럼이 아니다."""
+    columns = []
+    for box in boxes:
+        text = " ".join((box.get("text") or "").split())
+        if has_time(text):
+            columns.append((float(box.get("x") or 0), text, box))
+    # 같은 위치면 문서 순서를 유지한다.
+    columns.sort(key=lambda item: item[0])
+
+    table = []
+    for column, (_, text, box) in enumerate(columns, start=1):
+        nodes = box.get("nodes") or []
+        times, debug_lines = evaluate_slot_nodes(nodes, lambda _: True)
+        table.append(
+            ThemeSlots(
+                column=column,
+                name=_theme_title(box.get("title") or "", text),
+                text=text,
+                times=sorted(times),
+                candidates=len(nodes),
+                debug=debug_lines,
+            )
         )
-        for line in debug_lines[:120]:
+    return table
+
+
+def select_themes(table: list[ThemeSlots], keyword: str, index: int) -> list[ThemeSlots]:
+    """키워드가 들어간 박스 전부, 없으면 index 번째 컬럼(1-based)을 고른다."""
+    hits = [row for row in table if keyword in row.text]
+    if hits or not table:
+        return hits
+    return [table[min(max(index, 1), len(table)) - 1]]
+
+
+def slots_for_targets(fetch: Fetch, table: list[ThemeSlots]) -> dict[Target, list[str]]:
+    results = {}
+    for target in fetch.targets:
+        rows = select_themes(table, target.theme, theme_index(target))
+        times = {t for row in rows for t in row.times if target.allows(t, fetch.is_holiday)}
+        results[target] = sorted(times)
+    return results
+
+
+def _theme_boxes(driver: webdriver.Chrome) -> list[dict[str, Any]]:
+    if EXTRACT_MODE == "element":
+        return _theme_boxes_by_element(driver)
+    return driver.execute_script(THEME_TABLE_SCRIPT, THEME_BOX_SELECTOR, THEME_TITLE_SELECTOR, SLOT_TEXT_ATTRS) or []
+
+
+def _theme_boxes_by_element(driver: webdriver.Chrome) -> list[dict[str, Any]]:
+    # 노드마다 get_attribute 를 호출하는 기존 방식. THEME_TABLE_SCRIPT 와 같은 구조로 돌려준다.
+    from selenium.webdriver.common.by import By
+
+    boxes = []
+    for elem in driver.find_elements(By.CSS_SELECTOR, THEME_BOX_SELECTOR):
+        if "thm_box" in (elem.get_attribute("class") or "").lower():
+            continue
+        heads = elem.find_elements(By.CSS_SELECTOR, THEME_TITLE_SELECTOR)
+        boxes.append(
+            {
+                "title": heads[0].text if heads else "",
+                "text": elem.text or "",
+                "x": (elem.rect or {}).get("x") or 0,
+                "nodes": _snapshot_slot_nodes_by_element(elem),
+            }
+        )
+    return boxes
+
+
+def _snapshot_slot_nodes_by_element(container: Any) -> list[dict[str, Any]]:
+    from selenium.webdriver.common.by import By
+
+    # 던전 페이지 구조 기준: time_box > ul > li 가 시간 슬롯 단위
+    elements = container.find_elements(By.CSS_SELECTOR, ".time_box ul li")
+    if not elements:
+        # 폴백
+        elements = container.find_elements(By.CSS_SELECTOR, ".time_box *")
+
+    nodes = []
+    for elem in elements:
+        links = elem.find_elements(By.CSS_SELECTOR, "a[href]")
+        nodes.append(
+            {
+                "texts": [elem.get_attribute(attr) or "" for attr in SLOT_TEXT_ATTRS],
+                "classes": elem.get_attribute("class") or "",
+                "disabled": elem.get_attribute("disabled"),
+                "ariaDisabled": elem.get_attribute("aria-disabled") or "",
+                "hrefs": [a.get_attribute("href") or "" for a in links],
+            }
+        )
+    return nodes
+
+
+def _is_theme_box(node: Node) -> bool:
+    return node.has_class("box") and not node.has_class("thm_box")
+
+
+def _is_theme_title(node: Node) -> bool:
+    return node.tag in ("h1", "h2", "h3", "h4", "h5", "h6", "strong") or any(
+        node.has_class(name) for name in ("tit", "title", "name")
+    )
+
+
+def _read_html_attr(node: Node, name: str, base_url: str) -> str:
+    if name == "innerText":
+        return node.inner_text()
+    if name == "textContent":
+        return node.text_content()
+    value = node.get(name) or ""
+    if name == "href" and value:
+        return parse.urljoin(base_url, value)
+    return value
+
+
+def _snapshot_slot_nodes_html(container: Node, base_url: str) -> list[dict[str, Any]]:
+    # THEME_TABLE_SCRIPT 의 snapshot 과 같은 구조로 직렬화해 evaluate_slot_nodes 를 그대로 쓴다.
+    time_boxes = container.find_all(lambda n: n.has_class("time_box"))
+    elements = [
+        li
+        for box in time_boxes
+        for li in box.find_all(lambda n: n.tag == "li" and n.has_ancestor(lambda p: p.tag == "ul", stop=box))
+    ]
+    if not elements:
+        elements = [node for box in time_boxes for node in box.iter()]
+    nodes = []
+    for elem in elements:
+        links = elem.find_all(lambda n: n.tag == "a" and "href" in n.attrs)
+        nodes.append(
+            {
+                "texts": [_read_html_attr(elem, attr, base_url) for attr in SLOT_TEXT_ATTRS],
+                "classes": elem.get("class") or "",
+                "disabled": "true" if "disabled" in elem.attrs else None,
+                "ariaDisabled": elem.get("aria-disabled") or "",
+                "hrefs": [parse.urljoin(base_url, a.get("href") or "") for a in links],
+            }
+        )
+    return nodes
+
+
+def _theme_boxes_html(root: Node, base_url: str) -> list[dict[str, Any]]:
+    # 좌표가 없으므로 문서 순서를 컬럼 순서로 본다.
+    boxes = []
+    for position, box in enumerate(root.find_all(_is_theme_box)):
+        heads = box.find_all(_is_theme_title)
+        boxes.append(
+            {
+                "title": heads[0].inner_text() if heads else "",
+                "text": box.inner_text(),
+                "x": position,
+                "nodes": _snapshot_slot_nodes_html(box, base_url),
+            }
+        )
+    return boxes
+
+
+def _debug_report(title: str, fetch: Fetch, table: list[ThemeSlots], detail: str) -> None:
+    print(f"----- DEBUG SLOT CANDIDATES{title} -----")
+    print(f"DEBUG: zizum={fetch.unit}, date={fetch.label}, columns={len(table)}, {detail}")
+    for row in table:
+        print(f"DEBUG: column={row.column} theme={row.name} candidates={row.candidates} open={row.times}")
+        for line in row.debug[:120]:
             print(line)
-        print("----- END DEBUG -----")
-        if not debug_lines:
-            dump_path = os.path.abspath(f"debug_dungeon_{target_date}.html")
-            with open(dump_path, "w", encoding="utf-8") as fp:
-                fp.write(driver.page_source)
-            print(f"DEBUG: no slot candidates, html dump saved: {dump_path}")
+    for target in fetch.targets:
+        columns = [row.column for row in select_themes(table, target.theme, theme_index(target))]
+        print(f"DEBUG: target={target.name} keyword={target.theme} index={theme_index(target)} -> columns={columns}")
+    print("----- END DEBUG -----")
 
-    return sorted(slots)
 
+def _dump_page(fetch: Fetch, html: str) -> None:
+    dump_path = os.path.abspath(f"debug_dungeon_{fetch.label}.html")
+    with open(dump_path, "w", encoding="utf-8") as fp:
+        fp.write(html)
+    print(f"DEBUG: no slot candidates, html dump saved: {dump_path}")
 
-def main() -> None:
-    now_kst = get_kst_now()
-    open_dates = get_open_dates(now_kst)
-    holiday_set = build_holiday_set(open_dates)
 
+def collect_theme_table_http(client: KeepAliveClient, fetch: Fetch) -> list[ThemeSlots] | None:
+    """브라우저 없이 rev.main HTML을 한 번 받아 모든 테마 박스를 표로 만든다. 슬롯 마크업이 없으면 None (Selenium 폴백)."""
+    url = build_url(fetch.label, fetch.unit)
+    print(f"🔎 접속(HTTP): {url}")
+    try:
+        with timings.span(timings.HTTP_FETCH):
+            resp = client.get(url, timeout=WAIT_SECONDS)
+    except (OSError, HTTPException) as exc:
+        print(f"⚠️ HTTP 조회 실패: {exc}")
+        return None
+    if resp.status != 200:
+        print(f"⚠️ HTTP 응답 코드 {resp.status}")
+        return None
+
+    html = resp.text()
+    with timings.span(timings.EXTRACT):
+        boxes = _theme_boxes_html(parse_html(html), url)
+    with timings.span(timings.CLASSIFY):
+        table = build_theme_table(boxes)
+    if not any(row.candidates for row in table):
+        if DEBUG:
+            print(f"DEBUG: http engine found no slot markup (boxes={len(boxes)})")
+        return None
+
+    if DEBUG:
+        _debug_report(" (HTTP)", fetch, table, f"elapsed={resp.elapsed:.3f}s")
+        if not any(row.debug for row in table):
+            _dump_page(fetch, html)
+    return table
+
+
+def collect_theme_table(session: BrowserSession, fetch: Fetch) -> list[ThemeSlots]:
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    url = build_url(fetch.label, fetch.unit)
+    print(f"🔎 접속: {url}")
+
+    driver = session.open(url, LOAD_PROFILE)
+    WebDriverWait(driver, WAIT_SECONDS).until(EC.presence_of_element_located((By.CSS_SELECTOR, "body")))
+    return read_theme_table(driver, fetch)
+
+
+def read_theme_table(driver: webdriver.Chrome, fetch: Fetch, timeout: float = WAIT_SECONDS) -> list[ThemeSlots]:
+    """현재 탭의 페이지가 안정되기를 기다렸다가 모든 테마 박스를 한 번에 읽는다."""
+    # 테마 박스의 시간 목록이 그려지고 더 이상 바뀌지 않을 때까지 기다린다.
+    wait_until_ready(driver, f"dungeon {fetch.label}", "body", ".time_box", timeout=timeout)
+    capture.record_page(driver)
+
+    with timings.span(timings.EXTRACT):
+        boxes = _theme_boxes(driver)
+    with timings.span(timings.CLASSIFY):
+        table = build_theme_table(boxes)
+
+    if DEBUG:
+        _debug_report("", fetch, table, f"mode={EXTRACT_MODE}")
+        if not any(row.debug for row in table):
+            _dump_page(fetch, driver.page_source)
+    return table
+
+
+def _next_ready_tab(driver: webdriver.Chrome, tabs: dict[str, tuple[int, float]]) -> str:
+    """열어 둔 탭을 돌며 먼저 준비된 탭을 고른다. 시간이 다 된 탭도 (대기 실패로 읽도록) 돌려준다."""
+    while True:
+        now = time.perf_counter()
+        for handle, (_, started) in tabs.items():
+            driver.switch_to.window(handle)
+            if now - started >= WAIT_SECONDS or driver.execute_script(TAB_READY_PROBE):
+                return handle
+        time.sleep(TAB_POLL_SECONDS)
+
+
+def _read_tabs(
+    session: BrowserSession, fetches: list[Fetch], results: dict[int, list[ThemeSlots]], max_tabs: int
+) -> None:
+    """results 에 아직 없는 페이지들을 탭으로 동시에 열고, 준비된 탭부터 읽어 results 에 채운다."""
+    pending = deque((position, fetch) for position, fetch in enumerate(fetches) if position not in results)
+    tabs: dict[str, tuple[int, float]] = {}
+    # 이전 페이지의 쿠키/스토리지를 한 번 비우고 시작한다. (탭끼리는 같은 상태를 공유한다)
+    session.reset_page()
+    driver = session.driver
+    try:
+        while pending or tabs:
+            while pending and len(tabs) < max_tabs:
+                position, fetch = pending.popleft()
+                url = build_url(fetch.label, fetch.unit)
+                print(f"🔎 접속(탭): {url}")
+                tabs[session.start_tab(url, LOAD_PROFILE)] = (position, time.perf_counter())
+
+            handle = _next_ready_tab(driver, tabs)
+            position, started = tabs[handle]
+            fetch = fetches[position]
+            with timings.context(SITE_NAME, fetch.label):
+                remaining = max(1.0, started + WAIT_SECONDS - time.perf_counter())
+                results[position] = read_theme_table(driver, fetch, timeout=remaining)
+                del tabs[handle]
+                session.close_tab(handle)
+                timings.record(timings.DATE, time.perf_counter() - started)
+    finally:
+        from selenium.common.exceptions import WebDriverException
+
+        # 중간에 실패했으면 남은 탭을 정리한다. (브라우저가 죽었으면 원래 예외를 그대로 올린다)
+        for handle in tabs:
+            try:
+                session.close_tab(handle)
+            except WebDriverException:
+                pass
+
+
+def collect_theme_tables_tabs(
+    session: BrowserSession, fetches: list[Fetch], max_tabs: int = MAX_TABS
+) -> dict[int, list[ThemeSlots]]:
+    """페이지마다 탭을 열어 이동을 한꺼번에 시작하고, 준비된 탭부터 읽고 닫는다. session.lock 을 잡고 부른다.
+
+    전체 시간이 페이지별 시간의 합이 아니라 가장 느린 페이지에 가까워진다. 탭은 같은 Chrome 프로세스 안에서 열린다.
+    결과는 fetches 의 순번으로 돌려준다. 도중에 Chrome 이 죽으면 session.open 처럼 다시 띄우고 못 읽은 페이지만 다시 연다.
+    """
+    from selenium.common.exceptions import WebDriverException
+
+    results: dict[int, list[ThemeSlots]] = {}
+    for attempt in range(session.max_restarts + 1):
+        session.ensure_alive()
+        try:
+            _read_tabs(session, fetches, results, max_tabs)
+            return results
+        except WebDriverException as exc:
+            session.recover(exc, attempt)
+    raise RuntimeError("unreachable")
+
+
+def run(
+    now_kst: datetime,
+    holiday_set: set[date],
+    session: BrowserSession,
+    client: KeepAliveClient,
+) -> SiteScan:
+    """검사 기간 전체를 확인하고 열린 슬롯과 확인한 날짜 범위를 돌려준다."""
+    open_dates = get_open_dates(now_kst)
     date_labels = [d.strftime("%Y-%m-%d") for d in open_dates]
     print(
         f"📅 검사 기간: {date_labels[0]} ~ {date_labels[-1]} "
         f"(기준시각 KST {now_kst.strftime('%Y-%m-%d %H:%M')}, 오픈시각 {OPEN_HOUR_KST}:00)"
     )
 
-    findings = []
-    driver = create_driver()
-    try:
-        for target in open_dates:
-            target_date = target.strftime("%Y-%m-%d")
-            is_holiday = target.weekday() >= 5 or target in holiday_set
-            if not is_holiday:
-                if DEBUG:
-                    print(f"SKIP [평일 제외] {target_date}")
-                continue
-            day_name = KOR_WEEKDAYS[target.weekday()]
-            kind = "휴일" if is_holiday else "평일"
-            print(f"🧭 확인: {target_date}({day_name}) [{kind}]")
+    # rev.main 한 페이지에 지점의 모든 테마가 나오므로 (지점, 날짜)마다 한 번만 불러온다.
+    targets = load_targets()
+    fetches = watchlist.plan_fetches(
+        targets, open_dates, lambda d: d.weekday() >= 5 or d in holiday_set, unit=lambda t: t.branch
+    )
+    print(watchlist.describe_plan(SITE_NAME, targets, fetches))
+
+    results: dict[int, list[ThemeSlots]] = {}
+    browser_fetches: list[int] = []
+    for position, fetch in enumerate(fetches):
+        day_name = KOR_WEEKDAYS[fetch.date.weekday()]
+        kind = "휴일" if fetch.is_holiday else "평일"
+        print(f"🧭 확인: {fetch.label}({day_name}) [{kind}] 지점 {fetch.unit}")
+
+        table = None
+        if ENGINE == "http":
+            with timings.context(SITE_NAME, fetch.label), timings.span(timings.DATE):
+                table = collect_theme_table_http(client, fetch)
+            if table is None:
+                print("↩️ HTTP 응답에 슬롯 마크업이 없어 브라우저로 확인합니다.")
+        if table is None:
+            browser_fetches.append(position)
+        else:
+            results[position] = table
+
+    # 브라우저로 볼 페이지는 모아서 탭 여러 개로 동시에 불러온다.
+    if browser_fetches:
+        with session.lock:
+            if MAX_TABS > 1 and len(browser_fetches) > 1:
+                tab_results = collect_theme_tables_tabs(session, [fetches[p] for p in browser_fetches])
+                results.update({browser_fetches[i]: slots for i, slots in tab_results.items()})
+            else:
+                for position in browser_fetches:
+                    fetch = fetches[position]
+                    with timings.context(SITE_NAME, fetch.label), timings.span(timings.DATE):
+                        results[position] = collect_theme_table(session, fetch)
+
+    scan = SiteScan(SITE_NAME)
+    for position, fetch in enumerate(fetches):
+        day_name = KOR_WEEKDAYS[fetch.date.weekday()]
+        kind = "휴일" if fetch.is_holiday else "평일"
+        for target, slots in slots_for_targets(fetch, results[position]).items():
+            scan.add(target.name, fetch.label, slots, kind)
+            if slots:
+                print(f"✅ [{target.name}] {fetch.label}({day_name}) [{kind}] -> {', '.join(slots)}")
+
+    if not scan.slots:
+        print("❌ 검사 기간 내 빈자리 없음")
+    return scan
+
+
+def build_messages(slots: list[Slot]) -> list[str]:
+    targets = {target.name: target for target in load_targets()}
+    by_theme: dict[str, dict[str, list[Slot]]] = {}
+    for slot in slots:
+        by_theme.setdefault(slot.theme, {}).setdefault(slot.date, []).append(slot)
+
+    messages = []
+    for theme, by_date in by_theme.items():
+        findings = []
+        for target_date, date_slots in sorted(by_date.items()):
+            joined = ", ".join(sorted(slot.time for slot in date_slots))
+            findings.append(f"- {target_date}({date_slots[0].day_name}) [{date_slots[0].kind}] {joined}")
+
+        target = targets.get(theme)
+        zizum_id = target.branch if target else theme.partition("/")[0]
+        theme_name = target.theme if target else theme.partition("/")[2]
+        messages.append(
+            "🔥 [던전 빈자리 발견]\n"
+            f"지점: {zizum_id} / 테마: {theme_name}\n"
+            f"{chr(10).join(findings)}\n"
+            f"예약: {BASE_URL}?go=rev.main&s_zizum={zizum_id}"
+        )
+    return messages
 
-            slots = collect_slots(driver, target_date, is_holiday)
-            if not slots:
-                continue
 
-            joined = ", ".join(slots)
-            print(f"✅ {target_date}({day_name}) [{kind}] -> {joined}")
-            findings.append(f"- {target_date}({day_name}) [{kind}] {joined}")
-    finally:
-        driver.quit()
-
-    if not findings:
-        print("❌ 검사 기간 내 빈자리 없음")
-        return
+def main() -> None:
+    now_kst = get_kst_now()
+    holiday_set = build_holiday_set(get_open_dates(now_kst))
 
-    msg = (
-        "🔥 [던전 빈자리 발견]\n"
-        f"지점: {ZIZUM_ID}\n"
-        f"{chr(10).join(findings)}\n"
-        f"예약: {BASE_URL}?go=rev.main&s_zizum={ZIZUM_ID}"
-    )
-    send_telegram(msg)
+    # 브라우저는 HTTP 엔진이 폴백할 때만 실제로 띄운다.
+    session = BrowserSession(window_size=WINDOW_SIZE)
+    client = KeepAliveClient(headers={"User-Agent": USER_AGENT})
+    try:
+        scan = run(now_kst, holiday_set, session, client)
+    finally:
+        client.close()
+        if session.launch_count:
+            print(session.report())
+        session.quit()
+
+    with SlotStore() as store:
+        messages = diff_messages(store, scan, build_messages, SITE_LABEL)
+    for msg in messages:
+        send_telegram(msg)
+    flush()
 
 
 if __name__ == "__main__":
@@ -1,27 +1,29 @@
 from __future__ import annotations
 
-import json
 import os
-import re
-import time
 from datetime import date, datetime, timedelta
-from urllib import request
-
-try:
-    import holidays
-except ImportError:
-    holidays = None
-
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
+from typing import Any, Callable
+
+import capture
+import timings
+import watchlist
+from browser_pool import BrowserSession, register_profile
+from kr_calendar import build_holiday_set
+from notifier import flush, send_telegram
+from readiness import wait_until_ready
+from slot_signals import AVAILABLE, BLOCKED, NEUTRAL, KeywordClassifier, SignalRule
+from slot_store import SiteScan, Slot, SlotStore, diff_messages
+from slot_time import COMPACT, first_time, tokenize, tokenize_many
+from watchlist import Fetch, Target
 
 # --- [설정] ---
-BASE_URL = "https://xn--2e0b040a4xj.com/reservation"
+SITE_NAME = "earth_star"
+SITE_LABEL = "어스스타"
+# 녹화한 페이지로 재생할 때는 로컬 서버 주소로 바꾼다. (bench_replay.py)
+BASE_URL = os.environ.get("EARTH_STAR_BASE_URL", "https://xn--2e0b040a4xj.com/reservation")
+# 이미지/폰트/추적 스크립트 차단 설정 (browser_pool.BROWSER_PROFILE=lean 일 때)
+LOAD_PROFILE = register_profile(SITE_NAME, BASE_URL)
+# 기본 감시 대상 (watchlist.json 에 earth_star 항목이 없을 때)
 BRANCH_ID = 2
 THEME_ID = 25
 WAIT_SECONDS = 12
@@ -40,13 +42,136 @@ BLOCKED_KEYWORDS = [
     "soldout",
     "full",
 ]
+# href/onclick 에 이런 말이 있으면 예약 페이지로 가는 슬롯으로 본다.
+CLICKABLE_HINTS = ("reserve", "reservation", "book", "apply", "theme", "time", "date")
 WEEKDAY_START = "18:30"
 WEEKDAY_END = "22:30"
 HOLIDAY_END_EXCLUSIVE = "22:30"
 KOR_WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+# 평일: 18:30~22:30, 휴일: 22:30 이하 (양끝 포함)
+DEFAULT_TARGETS: list[dict[str, object]] = [
+    {
+        "branch": BRANCH_ID,
+        "theme": THEME_ID,
+        "weekday": [f"{WEEKDAY_START}-{WEEKDAY_END}"],
+        "holiday": [f"-{HOLIDAY_END_EXCLUSIVE}"],
+    },
+]
+
+# 막힘 신호가 하나라도 있으면 blocked. 그 외에는 예약 힌트가 있거나 class 에 full 이 없으면 available.
+SIGNAL_CLASSIFIER = KeywordClassifier(
+    [
+        SignalRule("text", BLOCKED, tuple(BLOCKED_KEYWORDS)),
+        SignalRule("classes", BLOCKED, ("sold", "close", "end", "finish")),
+        SignalRule("href", BLOCKED, ("sold", "closed", "full")),
+        SignalRule("onclick", BLOCKED, ("return false",)),
+        SignalRule("text", AVAILABLE, tuple(AVAILABLE_KEYWORDS)),
+        SignalRule("href", AVAILABLE, CLICKABLE_HINTS),
+        SignalRule("onclick", AVAILABLE, CLICKABLE_HINTS),
+        SignalRule("classes", NEUTRAL, ("full",)),
+    ],
+    default=AVAILABLE,
+)
+
+CANDIDATE_SELECTORS = [
+    "#list button",
+    "#list a",
+    "#list li",
+    "#list .item",
+    "#list .schedule",
+    "#list .list-group-item",
+    "#list [onclick]",
+    "#list .time",
+    "#list *",
+    ".time",
+    "[class*='time']",
+    "[id*='time']",
+]
+SLOT_TEXT_ATTRS = [
+    "innerText",
+    "textContent",
+    "aria-label",
+    "title",
+    "data-time",
+    "data-value",
+    "value",
+    "onclick",
+    "href",
+]
+
+# 셀렉터 묶음을 브라우저 안에서 한 번만 평가한다.
+# - 같은 노드는 한 번만 남기고(identity 기준)
+# - 자기 텍스트/속성 없이 하위 후보의 텍스트만 반복하는 상위 노드는 잘라낸 뒤
+# - 남은 노드의 속성을 한 번의 응답으로 돌려준다.
+CANDIDATE_SCRIPT = """
+var selectors = arguments[0];
+var names = arguments[1];
+var raw = 0;
+for (var s = 0; s < selectors.length; s++) {
+  raw += document.querySelectorAll(selectors[s]).length;
+}
+var nodes = Array.prototype.slice.call(document.querySelectorAll(selectors.join(',')));
+var fallback = false;
+if (!nodes.length) {
+  nodes = Array.prototype.slice.call(document.querySelectorAll('body *'));
+  raw = nodes.length;
+  fallback = true;
+}
+var unique = nodes.length;
+var set = new Set(nodes);
+var ownText = new Map();
+var hasChild = new Set();
+var walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+while (walker.nextNode()) {
+  var textNode = walker.currentNode;
+  if (!textNode.nodeValue.trim()) continue;
+  for (var p = textNode.parentElement; p; p = p.parentElement) {
+    if (set.has(p)) { ownText.set(p, true); break; }
+  }
+}
+for (var i = 0; i < nodes.length; i++) {
+  for (var q = nodes[i].parentElement; q; q = q.parentElement) {
+    if (set.has(q)) { hasChild.add(q); break; }
+  }
+}
+var signalAttrs = ['href', 'onclick', 'aria-label', 'title', 'data-time', 'data-value', 'value',
+                   'disabled', 'aria-disabled'];
+function hasOwnSignal(el) {
+  for (var a = 0; a < signalAttrs.length; a++) {
+    if (el.hasAttribute(signalAttrs[a])) return true;
+  }
+  return false;
+}
+function read(el, name) {
+  var value = null;
+  if (name.indexOf('-') === -1 && name !== 'onclick' && name in el) {
+    value = el[name];
+  }
+  if (value === null || value === undefined) {
+    value = el.getAttribute(name);
+  }
+  return value === null || value === undefined ? '' : String(value);
+}
+var result = [];
+for (var j = 0; j < nodes.length; j++) {
+  var el = nodes[j];
+  if (hasChild.has(el) && !ownText.has(el) && !hasOwnSignal(el)) continue;
+  var texts = [];
+  for (var n = 0; n < names.length; n++) {
+    texts.push(read(el, names[n]));
+  }
+  result.push({
+    texts: texts,
+    classes: el.getAttribute('class') || '',
+    disabled: (el.disabled || el.hasAttribute('disabled')) ? 'true' : null,
+    ariaDisabled: el.getAttribute('aria-disabled') || '',
+    href: read(el, 'href'),
+    onclick: el.getAttribute('onclick') || ''
+  });
+}
+return {raw: raw, unique: unique, fallback: fallback, nodes: result};
+"""
 
-TELEGRAM_TOKEN = os.environ.get("MY_ALARM_TOKEN")
-TELEGRAM_CHAT_ID = os.environ.get("MY_CHAT_ID")
 DEBUG = os.environ.get("DEBUG_SLOT", "0") == "1"
 
 
@@ -64,280 +189,202 @@ def get_open_dates(now_kst: datetime) -> list[date]:
     return [(now_kst.date() + timedelta(days=offset)) for offset in range(total_days)]
 
 
-def build_holiday_set(open_dates: list[date]) -> set[date]:
-    if holidays is None:
-        raise RuntimeError(
-            "공휴일 판별을 위해 holidays 패키지가 필요합니다. "
-            "설치: pip install holidays"
-        )
-    years = sorted({d.year for d in open_dates})
-    kr_holidays = holidays.country_holidays("KR", years=years)
-    return set(kr_holidays.keys())
-
-
-def build_url(target_date: str) -> str:
-    return f"{BASE_URL}?branch={BRANCH_ID}&theme={THEME_ID}&date={target_date}#list"
-
-
-def send_telegram(msg: str) -> None:
-    if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
-        print("⚠️ 텔레그램 설정 없음: MY_ALARM_TOKEN / MY_CHAT_ID")
-        return
-
-    endpoint = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-    payload = json.dumps({"chat_id": TELEGRAM_CHAT_ID, "text": msg}).encode("utf-8")
-    headers = {"Content-Type": "application/json"}
-
-    try:
-        req = request.Request(endpoint, data=payload, headers=headers, method="POST")
-        with request.urlopen(req, timeout=10) as resp:
-            print(f"📡 텔레그램 전송 결과: {resp.status}")
-    except Exception as exc:
-        print(f"⚠️ 텔레그램 전송 실패: {exc}")
-
-
-def is_blocked_slot(
-    text: str,
-    classes: str,
-    disabled_attr: str | None,
-    aria_disabled: str,
-    href: str,
-    onclick: str,
-) -> bool:
-    lowered = text.lower()
-    if disabled_attr is not None:
-        return True
-    if aria_disabled == "true":
-        return True
-
-    lowered_classes = classes.lower()
-    if any(keyword in lowered_classes for keyword in ["sold", "close", "end", "finish"]):
-        return True
+def target_name(target: Target) -> str:
+    return f"{target.branch}/{target.theme}"
 
-    lowered_href = href.lower()
-    lowered_onclick = onclick.lower()
-    if "return false" in lowered_onclick:
-        return True
-    if any(keyword in lowered_href for keyword in ["sold", "closed", "full"]):
-        return True
 
-    return any(word in lowered for word in BLOCKED_KEYWORDS)
+def load_targets() -> list[Target]:
+    return watchlist.targets_for(SITE_NAME, DEFAULT_TARGETS, target_name)
 
 
-def is_available_slot(text: str) -> bool:
-    lowered = text.lower()
-    return any(word in lowered for word in AVAILABLE_KEYWORDS)
+def build_url(target_date: str, branch: object = BRANCH_ID, theme: object = THEME_ID) -> str:
+    return f"{BASE_URL}?branch={branch}&theme={theme}&date={target_date}#list"
 
 
-def extract_time(text: str) -> str | None:
-    match = re.search(r"\b([01]?\d|2[0-3]):([0-5]\d)\b", text)
-    if match:
-        return f"{int(match.group(1)):02d}:{match.group(2)}"
+def evaluate_candidates(nodes: list[dict[str, Any]], allows: Callable[[str], bool]) -> tuple[set[str], list[str]]:
+    slots = set()
+    debug_lines = []
+    texts = [" ".join(" ".join(value for value in node.get("texts", []) if value).split()) for node in nodes]
+    # 후보 노드 전체의 시간 표기를 한 번에 훑는다.
+    for node, text, tokens in zip(nodes, texts, tokenize_many(texts)):
+        if not text.strip():
+            continue
 
-    match = re.search(r"\b([01]?\d|2[0-3])\s*시\s*([0-5]?\d)\s*분?\b", text)
-    if match:
-        return f"{int(match.group(1)):02d}:{int(match.group(2)):02d}"
+        classes = node.get("classes") or ""
+        disabled_attr = node.get("disabled")
+        aria_disabled = (node.get("ariaDisabled") or "").lower()
+        href = node.get("href") or ""
+        onclick = node.get("onclick") or ""
+        slot_time = first_time(tokens)
+        if not slot_time:
+            continue
 
-    match = re.search(r"\b([01]?\d|2[0-3])\s*시\b", text)
-    if match:
-        return f"{int(match.group(1)):02d}:00"
-
-    match = re.search(r"\b([01]\d|2[0-3])([0-5]\d)\b", text)
-    if match:
-        return f"{match.group(1)}:{match.group(2)}"
-
-    return None
-
-
-def to_minutes(hhmm: str) -> int:
-    hour, minute = hhmm.split(":")
-    return int(hour) * 60 + int(minute)
-
-
-def is_in_allowed_time_range(slot_time: str, is_holiday: bool) -> bool:
-    value = to_minutes(slot_time)
-    if is_holiday:
-        # 휴일: 22:30 이하(포함)
-        return value <= to_minutes(HOLIDAY_END_EXCLUSIVE)
-    # 평일: 18:30~22:30 (포함)
-    return to_minutes(WEEKDAY_START) <= value <= to_minutes(WEEKDAY_END)
-
-
-def check_empty_slots(target_date: str, is_holiday: bool) -> list[str]:
-    options = Options()
-    options.add_argument("--headless=new")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
-    )
-
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    url = build_url(target_date)
-    print(f"🔎 접속: {url}")
-
-    try:
-        driver.get(url)
-        WebDriverWait(driver, WAIT_SECONDS).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "#list"))
+        verdict = SIGNAL_CLASSIFIER.classify(
+            disabled=disabled_attr is not None or aria_disabled == "true",
+            text=text,
+            classes=classes,
+            href=href,
+            onclick=onclick,
         )
-        time.sleep(1)
-
-        selectors = [
-            "#list button",
-            "#list a",
-            "#list li",
-            "#list .item",
-            "#list .schedule",
-            "#list .list-group-item",
-            "#list [onclick]",
-            "#list .time",
-            "#list *",
-            ".time",
-            "[class*='time']",
-            "[id*='time']",
-        ]
-
-        elements = []
-        for selector in selectors:
-            found = driver.find_elements(By.CSS_SELECTOR, selector)
-            if found:
-                elements.extend(found)
-        if DEBUG:
-            print(f"DEBUG: selector candidates={len(elements)}")
-
-        if not elements:
-            elements = driver.find_elements(By.CSS_SELECTOR, "body *")
+        if verdict.blocked:
             if DEBUG:
-                print(f"DEBUG: body fallback candidates={len(elements)}")
-
-        slots = set()
-        debug_lines = []
-        for elem in elements:
-            text_parts = []
-            for attr in [
-                "innerText",
-                "textContent",
-                "aria-label",
-                "title",
-                "data-time",
-                "data-value",
-                "value",
-                "onclick",
-                "href",
-            ]:
-                value = elem.get_attribute(attr) or ""
-                if value:
-                    text_parts.append(value)
-            text = " ".join(" ".join(text_parts).split())
-            if not text.strip():
-                continue
-
-            classes = elem.get_attribute("class") or ""
-            disabled_attr = elem.get_attribute("disabled")
-            aria_disabled = (elem.get_attribute("aria-disabled") or "").lower()
-            href = elem.get_attribute("href") or ""
-            onclick = elem.get_attribute("onclick") or ""
-            slot_time = extract_time(text)
-            if not slot_time:
-                continue
+                debug_lines.append(
+                    f"BLOCKED {slot_time} [{verdict.describe()}] | text={text} | class={classes} | "
+                    f"aria={aria_disabled} | onclick={onclick} | href={href}"
+                )
+            continue
 
-            if is_blocked_slot(text, classes, disabled_attr, aria_disabled, href, onclick):
+        if verdict.available:
+            if not allows(slot_time):
                 if DEBUG:
                     debug_lines.append(
-                        f"BLOCKED {slot_time} | text={text} | class={classes} | "
-                        f"aria={aria_disabled} | onclick={onclick} | href={href}"
+                        f"SKIP(TIME_FILTER) {slot_time} | text={text} | class={classes}"
                     )
                 continue
-
-            clickable_hint = any(
-                keyword in f"{href} {onclick}".lower()
-                for keyword in ["reserve", "reservation", "book", "apply", "theme", "time", "date"]
-            )
-            class_allows = not any(keyword in classes.lower() for keyword in ["sold", "close", "full"])
-            if is_available_slot(text) or clickable_hint or class_allows:
-                if not is_in_allowed_time_range(slot_time, is_holiday):
-                    if DEBUG:
-                        reason = "HOLIDAY_TIME_FILTER" if is_holiday else "WEEKDAY_TIME_FILTER"
-                        debug_lines.append(
-                            f"SKIP({reason}) {slot_time} | text={text} | class={classes}"
-                        )
-                    continue
-                slots.add(slot_time)
-                if DEBUG:
-                    debug_lines.append(
-                        f"OPEN {slot_time} | text={text} | class={classes} | "
-                        f"aria={aria_disabled} | onclick={onclick} | href={href}"
-                    )
-            elif DEBUG:
+            slots.add(slot_time)
+            if DEBUG:
                 debug_lines.append(
-                    f"SKIP {slot_time} | text={text} | class={classes} | "
+                    f"OPEN {slot_time} [{verdict.describe()}] | text={text} | class={classes} | "
                     f"aria={aria_disabled} | onclick={onclick} | href={href}"
                 )
-
-        if DEBUG:
-            print("----- DEBUG SLOT CANDIDATES -----")
-            for line in debug_lines[:120]:
-                print(line)
-            print("----- END DEBUG -----")
-            source = driver.page_source
-            source_time_hits = re.findall(
-                r"(?:[01]?\d|2[0-3]):[0-5]\d|(?:[01]?\d|2[0-3])\s*시\s*(?:[0-5]?\d)\s*분?",
-                source,
-                flags=re.IGNORECASE,
+        elif DEBUG:
+            debug_lines.append(
+                f"SKIP {slot_time} [{verdict.describe()}] | text={text} | class={classes} | "
+                f"aria={aria_disabled} | onclick={onclick} | href={href}"
             )
-            print(f"DEBUG: page_source time-pattern hits={len(source_time_hits)}")
-            if source_time_hits:
-                print(f"DEBUG: sample hits={sorted(set(source_time_hits))[:20]}")
-            if not debug_lines:
-                dump_path = os.path.abspath(f"debug_{BRANCH_ID}_{THEME_ID}_{target_date}.html")
-                with open(dump_path, "w", encoding="utf-8") as fp:
-                    fp.write(source)
-                print(f"DEBUG: no slot candidates, html dump saved: {dump_path}")
+    return slots, debug_lines
 
-        return sorted(slots)
-    finally:
-        driver.quit()
 
+def check_empty_slots(session: BrowserSession, fetch: Fetch) -> dict[Target, list[str]]:
+    """(지점, 테마, 날짜) 페이지를 한 번 읽고, 그 페이지를 보는 대상마다 시간 구간으로 나눠 돌려준다."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    target_date = fetch.label
+    branch, theme = fetch.unit
+    url = build_url(target_date, branch, theme)
+    print(f"🔎 접속: {url}")
+
+    driver = session.open(url, LOAD_PROFILE)
+    WebDriverWait(driver, WAIT_SECONDS).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "#list"))
+    )
+    # #list 내용이 채워지고 잠잠해질 때까지 기다린다.
+    wait_until_ready(driver, f"earth_star {target_date}", "#list", timeout=WAIT_SECONDS)
+    capture.record_page(driver)
+
+    # 후보 수집과 속성 추출을 스크립트 한 번으로 한다.
+    with timings.span(timings.COLLECT):
+        collected = driver.execute_script(CANDIDATE_SCRIPT, CANDIDATE_SELECTORS, SLOT_TEXT_ATTRS) or {}
+    nodes = collected.get("nodes") or []
+    print(
+        f"🧩 후보 노드: {collected.get('raw', 0)} -> 중복 제거 {collected.get('unique', 0)} "
+        f"-> 상위 노드 정리 {len(nodes)}" + (" (body 폴백)" if collected.get("fallback") else "")
+    )
+
+    with timings.span(timings.CLASSIFY):
+        slots, debug_lines = evaluate_candidates(nodes, fetch.allows)
+
+    if DEBUG:
+        print("----- DEBUG SLOT CANDIDATES -----")
+        for line in debug_lines[:120]:
+            print(line)
+        print("----- END DEBUG -----")
+        source = driver.page_source
+        source_time_hits = [token.raw for token in tokenize(source) if token.kind != COMPACT]
+        print(f"DEBUG: page_source time-pattern hits={len(source_time_hits)}")
+        if source_time_hits:
+            print(f"DEBUG: sample hits={sorted(set(source_time_hits))[:20]}")
+        if not debug_lines:
+            dump_path = os.path.abspath(f"debug_{branch}_{theme}_{target_date}.html")
+            with open(dump_path, "w", encoding="utf-8") as fp:
+                fp.write(source)
+            print(f"DEBUG: no slot candidates, html dump saved: {dump_path}")
+
+    return fetch.split(slots)
+
+
+def run(now_kst: datetime, holiday_set: set[date], session: BrowserSession) -> SiteScan:
+    """검사 기간 전체를 확인하고 열린 슬롯과 확인한 날짜 범위를 돌려준다."""
+    from selenium.common.exceptions import WebDriverException
 
-def main() -> None:
-    now_kst = get_kst_now()
     open_dates = get_open_dates(now_kst)
-    holiday_set = build_holiday_set(open_dates)
     date_labels = [d.strftime("%Y-%m-%d") for d in open_dates]
     print(
         f"📅 검사 기간: {date_labels[0]} ~ {date_labels[-1]} "
         f"(기준시각 KST {now_kst.strftime('%Y-%m-%d %H:%M')}, 오픈시각 {OPEN_HOUR_KST}:00)"
     )
 
-    findings = []
-    for target in open_dates:
-        target_date = target.strftime("%Y-%m-%d")
-        is_holiday = target.weekday() >= 5 or target in holiday_set
-        day_name = KOR_WEEKDAYS[target.weekday()]
-        kind = "휴일" if is_holiday else "평일"
-        print(f"🧭 확인: {target_date}({day_name}) [{kind}]")
-        empty_slots = check_empty_slots(target_date, is_holiday=is_holiday)
-        if empty_slots:
-            findings.append((target_date, day_name, kind, empty_slots))
-
-    if findings:
+    # 페이지는 (지점, 테마, 날짜)마다 하나이므로 시간 구간만 다른 대상은 같은 페이지를 함께 쓴다.
+    targets = load_targets()
+    fetches = watchlist.plan_fetches(
+        targets, open_dates, lambda d: d.weekday() >= 5 or d in holiday_set, unit=lambda t: (t.branch, t.theme)
+    )
+    print(watchlist.describe_plan(SITE_NAME, targets, fetches))
+
+    scan = SiteScan(SITE_NAME)
+    # 날짜마다 브라우저를 새로 띄우지 않고 세션 하나를 끝까지 재사용한다.
+    for fetch in fetches:
+        target_date = fetch.label
+        day_name = KOR_WEEKDAYS[fetch.date.weekday()]
+        kind = "휴일" if fetch.is_holiday else "평일"
+        print(f"🧭 확인: {target_date}({day_name}) [{kind}] 지점/테마 {'/'.join(fetch.unit)}")
+        with session.lock, timings.context(SITE_NAME, target_date), timings.span(timings.DATE):
+            try:
+                results = check_empty_slots(session, fetch)
+            except WebDriverException:
+                # 세션이 살아 있으면(단순 타임아웃 등) 기존처럼 실패로 처리하고,
+                # 브라우저가 죽은 경우에만 재기동 후 한 번 더 시도한다.
+                if session.is_alive():
+                    raise
+                session.restart(f"{target_date} 검사 중 브라우저 종료")
+                results = check_empty_slots(session, fetch)
+        for target, empty_slots in results.items():
+            scan.add(target.name, target_date, empty_slots, kind)
+            if empty_slots:
+                print(f"✅ [{target.name}] {target_date}({day_name}) [{kind}] -> {', '.join(empty_slots)}")
+
+    if not scan.slots:
+        print("❌ 검사 기간 내 빈자리 없음")
+    return scan
+
+
+def build_messages(slots: list[Slot]) -> list[str]:
+    targets = {target.name: target for target in load_targets()}
+    by_theme: dict[str, dict[str, list[Slot]]] = {}
+    for slot in slots:
+        by_theme.setdefault(slot.theme, {}).setdefault(slot.date, []).append(slot)
+
+    messages = []
+    for theme, by_date in by_theme.items():
         lines = []
-        for target_date, day_name, kind, slots in findings:
-            joined = ", ".join(slots)
-            lines.append(f"- {target_date}({day_name}) [{kind}] {joined}")
-            print(f"✅ {target_date}({day_name}) [{kind}] -> {joined}")
+        for target_date, date_slots in sorted(by_date.items()):
+            joined = ", ".join(sorted(slot.time for slot in date_slots))
+            lines.append(f"- {target_date}({date_slots[0].day_name}) [{date_slots[0].kind}] {joined}")
 
-        msg = (
+        target = targets.get(theme)
+        branch, theme_id = (target.branch, target.theme) if target else theme.partition("/")[::2]
+        messages.append(
             f"🔥 [방탈출 빈자리 발견]\n"
-            f"지점/테마: {BRANCH_ID}/{THEME_ID}\n"
+            f"지점/테마: {branch}/{theme_id}\n"
             f"{chr(10).join(lines)}\n"
-            f"예약: {BASE_URL}?branch={BRANCH_ID}&theme={THEME_ID}#list"
+            f"예약: {BASE_URL}?branch={branch}&theme={theme_id}#list"
         )
+    return messages
+
+
+def main() -> None:
+    now_kst = get_kst_now()
+    holiday_set = build_holiday_set(get_open_dates(now_kst))
+    with BrowserSession() as session:
+        scan = run(now_kst, holiday_set, session)
+        print(session.report())
+    with SlotStore() as store:
+        messages = diff_messages(store, scan, build_messages, SITE_LABEL)
+    for msg in messages:
         send_telegram(msg)
-    else:
-        print("❌ 검사 기간 내 빈자리 없음")
+    flush()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from html.parser import HTMLParser
+from typing import Callable, Iterator
+
+VOID_TAGS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "param",
+    "source",
+    "track",
+    "wbr",
+}
+HIDDEN_TEXT_TAGS = {"script", "style", "noscript", "template"}
+# innerText 처럼 블록 요소 경계에는 공백을 넣어 "테마11:30" 같이 붙지 않게 한다.
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "fieldset",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li",
+    "main", "nav", "ol", "p", "section", "table", "tbody", "td", "th", "thead", "tr", "ul",
+}
+
+
+class Node:
+    """브라우저 없이 슬롯 구조만 읽기 위한 최소 DOM 노드."""
+
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: dict[str, str], parent: Node | None = None) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.children: list[Node | str] = []
+        self.parent = parent
+
+    def __repr__(self) -> str:
+        return f"<{self.tag} class={self.attrs.get('class', '')!r}>"
+
+    def get(self, name: str, default: str | None = None) -> str | None:
+        return self.attrs.get(name, default)
+
+    @property
+    def classes(self) -> list[str]:
+        return (self.attrs.get("class") or "").split()
+
+    def has_class(self, name: str) -> bool:
+        return name in self.classes
+
+    def iter(self) -> Iterator[Node]:
+        """자기 자신을 제외한 하위 요소를 문서 순서로 돈다."""
+        stack = [child for child in reversed(self.children) if isinstance(child, Node)]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(child for child in reversed(node.children) if isinstance(child, Node))
+
+    def find_all(self, predicate: Callable[[Node], bool]) -> list[Node]:
+        return [node for node in self.iter() if predicate(node)]
+
+    def has_ancestor(self, predicate: Callable[[Node], bool], stop: Node | None = None) -> bool:
+        node = self.parent
+        while node is not None and node is not stop:
+            if predicate(node):
+                return True
+            node = node.parent
+        return False
+
+    def text_content(self) -> str:
+        parts: list[str] = []
+        self._collect_text(parts, include_hidden=True)
+        return "".join(parts)
+
+    def inner_text(self) -> str:
+        parts: list[str] = []
+        self._collect_text(parts, include_hidden=False)
+        return " ".join("".join(parts).split())
+
+    def _collect_text(self, parts: list[str], include_hidden: bool) -> None:
+        for child in self.children:
+            if isinstance(child, str):
+                parts.append(child)
+            elif include_hidden:
+                child._collect_text(parts, include_hidden)
+            elif child.tag not in HIDDEN_TEXT_TAGS:
+                block = child.tag in BLOCK_TAGS
+                if block:
+                    parts.append(" ")
+                child._collect_text(parts, include_hidden)
+                if block:
+                    parts.append(" ")
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {})
+        self._stack = [self.root]
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        parent = self._stack[-1]
+        # <li>/<p>/<option> 등은 닫는 태그가 생략되는 경우가 있어 같은 태그를 만나면 닫아준다.
+        if tag in {"li", "p", "option", "tr", "td", "th"} and parent.tag == tag:
+            self._stack.pop()
+            parent = self._stack[-1]
+        node = Node(tag, {name: (value if value is not None else "") for name, value in attrs}, parent)
+        parent.children.append(node)
+        if tag not in VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        parent = self._stack[-1]
+        parent.children.append(Node(tag, {name: (value if value is not None else "") for name, value in attrs}, parent))
+
+    def handle_endtag(self, tag: str) -> None:
+        for index in range(len(self._stack) - 1, 0, -1):
+            if self._stack[index].tag == tag:
+                del self._stack[index:]
+                return
+
+    def handle_data(self, data: str) -> None:
+        self._stack[-1].children.append(data)
+
+
+def parse_html(markup: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(markup)
+    builder.close()
+    return builder.root
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import http.client
+import re
+import ssl
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+from urllib import parse
+
+DEFAULT_TIMEOUT = 15
+MAX_IDLE_PER_HOST = 4
+# 서버가 keep-alive 소켓을 먼저 닫은 경우 새 연결로 한 번 더 보낸다.
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+
+@dataclass
+class HttpResponse:
+    url: str
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    elapsed: float = 0.0
+    reused: bool = False
+
+    @property
+    def charset(self) -> str:
+        content_type = self.headers.get("content-type", "")
+        match = re.search(r"charset=([\w-]+)", content_type, re.IGNORECASE)
+        if match:
+            return match.group(1)
+        match = _META_CHARSET.search(self.body[:4096])
+        if match:
+            return match.group(1).decode("ascii")
+        return "utf-8"
+
+    def text(self) -> str:
+        try:
+            return self.body.decode(self.charset, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+
+# 응답을 받을 때마다 (method, 요청 본문, 응답)으로 불린다. 녹화 모드(capture.py)가 쓴다.
+ResponseListener = Callable[[str, "bytes | None", HttpResponse], None]
+_LISTENERS: list[ResponseListener] = []
+
+
+@dataclass
+class _HostPool:
+    idle: list[http.client.HTTPConnection] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    slots: threading.BoundedSemaphore | None = None
+    tls_session: ssl.SSLSession | None = None
+
+
+class _SessionReusingHTTPSConnection(http.client.HTTPSConnection):
+    """새 연결을 맺을 때도 같은 호스트의 직전 TLS 세션을 재개해 전체 핸드셰이크를 줄인다."""
+
+    def __init__(self, host: str, port: int, timeout: float, context: ssl.SSLContext, pool: _HostPool) -> None:
+        super().__init__(host, port, timeout=timeout, context=context)
+        self._pool = pool
+
+    def connect(self) -> None:
+        http.client.HTTPConnection.connect(self)
+        session = self._pool.tls_session
+        try:
+            self.sock = self._context.wrap_socket(self.sock, server_hostname=self.host, session=session)
+        except ValueError:
+            # 다른 컨텍스트에서 만든 세션 등 재개할 수 없는 경우
+            self.sock = self._context.wrap_socket(self.sock, server_hostname=self.host)
+
+
+class KeepAliveClient:
+    """호스트별로 keep-alive 연결을 재사용하는 stdlib 기반 HTTP 클라이언트 (스레드 안전)."""
+
+    def __init__(
+        self,
+        headers: dict[str, str] | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        ssl_context: ssl.SSLContext | None = None,
+        max_idle_per_host: int = MAX_IDLE_PER_HOST,
+        max_per_host: int | None = None,
+    ) -> None:
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.max_idle_per_host = max_idle_per_host
+        # 호스트별 동시 요청 상한 (None 이면 제한 없음)
+        self.max_per_host = max_per_host
+        self._pools: dict[tuple[str, str, int], _HostPool] = {}
+        self._pools_lock = threading.Lock()
+
+        self.request_count = 0
+        self.connect_count = 0
+        self.tls_resumed_count = 0
+        # 요청별 소요 시간 합계 (동시 요청은 겹쳐서 더해진다)
+        self.elapsed_seconds = 0.0
+
+    def __enter__(self) -> KeepAliveClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _pool_for(self, key: tuple[str, str, int]) -> _HostPool:
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                slots = threading.BoundedSemaphore(self.max_per_host) if self.max_per_host else None
+                pool = self._pools[key] = _HostPool(slots=slots)
+            return pool
+
+    def _connect(self, key: tuple[str, str, int], timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        with self._pools_lock:
+            self.connect_count += 1
+        if scheme == "https":
+            return _SessionReusingHTTPSConnection(host, port, timeout, self.ssl_context, self._pool_for(key))
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _checkout(self, key: tuple[str, str, int], timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        pool = self._pool_for(key)
+        with pool.lock:
+            if pool.idle:
+                conn = pool.idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return self._connect(key, timeout), False
+
+    def _checkin(self, key: tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        pool = self._pool_for(key)
+        with pool.lock:
+            if isinstance(conn.sock, ssl.SSLSocket) and conn.sock.session is not None:
+                pool.tls_session = conn.sock.session
+            if len(pool.idle) < self.max_idle_per_host:
+                pool.idle.append(conn)
+                return
+        conn.close()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> HttpResponse:
+        parts = parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname or "", port)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        merged = {**self.headers, **(headers or {})}
+        merged.setdefault("Connection", "keep-alive")
+        timeout = self.timeout if timeout is None else timeout
+
+        pool = self._pool_for(key)
+        if pool.slots is not None:
+            pool.slots.acquire()
+        try:
+            return self._send(key, method, path, url, body, merged, timeout)
+        finally:
+            if pool.slots is not None:
+                pool.slots.release()
+
+    def _send(
+        self,
+        key: tuple[str, str, int],
+        method: str,
+        path: str,
+        url: str,
+        body: bytes | None,
+        headers: dict[str, str],
+        timeout: float,
+    ) -> HttpResponse:
+        started = time.perf_counter()
+        for attempt in range(2):
+            conn, reused = self._checkout(key, timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except _STALE_ERRORS:
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            elapsed = time.perf_counter() - started
+            resumed = not reused and isinstance(conn.sock, ssl.SSLSocket) and conn.sock.session_reused
+            # whos_there 는 스레드 풀에서 같은 클라이언트를 쓰므로 카운터는 락 안에서 올린다.
+            with self._pools_lock:
+                self.request_count += 1
+                self.elapsed_seconds += elapsed
+                if resumed:
+                    self.tls_resumed_count += 1
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            response = HttpResponse(
+                url=url,
+                status=resp.status,
+                headers={k.lower(): v for k, v in resp.getheaders()},
+                body=data,
+                elapsed=elapsed,
+                reused=reused,
+            )
+            for listener in _LISTENERS:
+                listener(method, body, response)
+            return response
+        raise RuntimeError("unreachable")
+
+    def get(self, url: str, headers: dict[str, str] | None = None, timeout: float | None = None) -> HttpResponse:
+        return self.request("GET", url, headers=headers, timeout=timeout)
+
+    def post_form(
+        self,
+        url: str,
+        form: dict[str, object],
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> HttpResponse:
+        body = parse.urlencode(form).encode("utf-8")
+        merged = {"Content-Type": "application/x-www-form-urlencoded; charset=UTF-8", **(headers or {})}
+        return self.request("POST", url, body=body, headers=merged, timeout=timeout)
+
+    def stats(self) -> str:
+        return (
+            f"요청 {self.request_count}회 / 새 연결 {self.connect_count}회 / "
+            f"TLS 세션 재개 {self.tls_resumed_count}회"
+        )
+
+    def close(self) -> None:
+        with self._pools_lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            with pool.lock:
+                for conn in pool.idle:
+                    conn.close()
+                pool.idle.clear()
+
+
+def add_response_listener(listener: ResponseListener) -> None:
+    """모든 KeepAliveClient 의 응답을 listener 에도 넘긴다."""
+    _LISTENERS.append(listener)
+
+
+def remove_response_listener(listener: ResponseListener) -> None:
+    if listener in _LISTENERS:
+        _LISTENERS.remove(listener)
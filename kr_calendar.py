@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+# 날짜별 요일 종류를 미리 계산해 두는 파일
+CALENDAR_PATH = os.environ.get("KR_CALENDAR_PATH", os.path.join(".cache", "kr_calendar.json"))
+# 올해 1월 1일부터 몇 년 뒤 12월 31일까지 만들어 둘지
+YEARS_AHEAD = int(os.environ.get("KR_CALENDAR_YEARS_AHEAD", "2"))
+# 대체공휴일/임시공휴일 반영을 위해 이 기간이 지나면 (holidays 가 있을 때) 다시 만든다.
+MAX_AGE_DAYS = int(os.environ.get("KR_CALENDAR_MAX_AGE_DAYS", "30"))
+
+# 하루를 한 글자로 기록한다.
+WEEKDAY = "W"
+WEEKEND = "E"
+HOLIDAY = "H"
+
+
+@dataclass(frozen=True)
+class KrCalendar:
+    start: date
+    codes: str
+    generated_at: str = ""
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=len(self.codes) - 1)
+
+    def covers(self, target: date) -> bool:
+        return 0 <= (target - self.start).days < len(self.codes)
+
+    def day_type(self, target: date) -> str:
+        offset = (target - self.start).days
+        if not 0 <= offset < len(self.codes):
+            raise KeyError(f"달력 범위 밖의 날짜: {target} ({self.start} ~ {self.end})")
+        return self.codes[offset]
+
+    def is_rest_day(self, target: date) -> bool:
+        """주말 또는 공휴일이면 True (기존 `weekday() >= 5 or target in holiday_set` 과 같다)."""
+        return self.day_type(target) != WEEKDAY
+
+    def holiday_set(self) -> set[date]:
+        return {self.start + timedelta(days=i) for i, code in enumerate(self.codes) if code == HOLIDAY}
+
+    def is_stale(self, now: datetime) -> bool:
+        try:
+            generated = datetime.fromisoformat(self.generated_at)
+        except ValueError:
+            return True
+        return now - generated > timedelta(days=MAX_AGE_DAYS)
+
+
+def generate(start_year: int, end_year: int) -> KrCalendar:
+    """holidays 패키지로 start_year~end_year 의 달력을 만든다. 여기서만 holidays 를 불러온다."""
+    try:
+        import holidays
+    except ImportError as exc:
+        raise RuntimeError("공휴일 판별을 위해 holidays 패키지가 필요합니다. 설치: pip install holidays") from exc
+
+    kr_holidays = holidays.country_holidays("KR", years=range(start_year, end_year + 1))
+    start = date(start_year, 1, 1)
+    total = (date(end_year, 12, 31) - start).days + 1
+    codes = []
+    for offset in range(total):
+        day = start + timedelta(days=offset)
+        if day in kr_holidays:
+            codes.append(HOLIDAY)
+        elif day.weekday() >= 5:
+            codes.append(WEEKEND)
+        else:
+            codes.append(WEEKDAY)
+    return KrCalendar(start=start, codes="".join(codes), generated_at=datetime.utcnow().isoformat(timespec="seconds"))
+
+
+def _load(path: str) -> KrCalendar | None:
+    try:
+        with open(path, encoding="utf-8") as fp:
+            data = json.load(fp)
+        return KrCalendar(
+            start=date.fromisoformat(data["start"]),
+            codes=str(data["codes"]),
+            generated_at=str(data.get("generated_at") or ""),
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save(path: str, calendar: KrCalendar) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fp:
+        json.dump(
+            {"start": calendar.start.isoformat(), "generated_at": calendar.generated_at, "codes": calendar.codes},
+            fp,
+        )
+    os.replace(tmp_path, path)
+
+
+_CALENDAR: KrCalendar | None = None
+_LOCK = threading.Lock()
+
+
+def load_calendar(required: Iterable[date] = (), path: str = CALENDAR_PATH) -> KrCalendar:
+    """캐시된 달력을 읽는다. required 날짜를 덮지 못하거나 오래됐으면 다시 만들어 저장한다."""
+    global _CALENDAR
+    required = list(required)
+    with _LOCK:
+        calendar = _CALENDAR or _load(path)
+        covered = calendar is not None and all(calendar.covers(d) for d in required)
+        if calendar is not None and covered and not calendar.is_stale(datetime.utcnow()):
+            _CALENDAR = calendar
+            return calendar
+
+        first_year = min([datetime.utcnow().year] + [d.year for d in required])
+        last_year = max([first_year + YEARS_AHEAD] + [d.year for d in required])
+        try:
+            fresh = generate(first_year, last_year)
+        except RuntimeError:
+            if calendar is None or not covered:
+                raise
+            # 범위는 충분한데 갱신만 못 한 경우에는 기존 달력을 계속 쓴다.
+            print("⚠️ holidays 패키지가 없어 공휴일 달력을 갱신하지 못했습니다. 기존 달력을 사용합니다.")
+            _CALENDAR = calendar
+            return calendar
+
+        print(f"📅 공휴일 달력 생성: {fresh.start} ~ {fresh.end}")
+        try:
+            _save(path, fresh)
+        except OSError as exc:
+            print(f"⚠️ 공휴일 달력 저장 실패: {exc}")
+        _CALENDAR = fresh
+        return fresh
+
+
+def build_holiday_set(dates: Iterable[date]) -> set[date]:
+    """dates 를 덮는 달력의 공휴일 전체. holidays.country_holidays("KR", years=...) 대신 쓴다."""
+    return load_calendar(dates).holiday_set()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="공휴일/요일 종류 달력 캐시를 만들거나 확인한다.")
+    parser.add_argument("--rebuild", action="store_true", help="캐시를 무시하고 다시 만든다")
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        year = datetime.utcnow().year
+        calendar = generate(year, year + YEARS_AHEAD)
+        _save(CALENDAR_PATH, calendar)
+    else:
+        calendar = load_calendar()
+    holidays_count = calendar.codes.count(HOLIDAY)
+    print(f"{CALENDAR_PATH}: {calendar.start} ~ {calendar.end}, 공휴일 {holidays_count}일, 생성 {calendar.generated_at}")
+
+
+if __name__ == "__main__":
+    main()
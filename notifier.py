@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+
+from http_pool import KeepAliveClient
+
+TELEGRAM_TOKEN = os.environ.get("MY_ALARM_TOKEN")
+# 여러 명에게 보낼 때는 쉼표로 구분한다. (예: 111,222)
+TELEGRAM_CHAT_IDS = [c.strip() for c in os.environ.get("MY_CHAT_ID", "").split(",") if c.strip()]
+# 로컬 스텁 서버로 시험할 때 바꾼다. (예: http://127.0.0.1:8081)
+TELEGRAM_API_BASE = os.environ.get("TELEGRAM_API_BASE", "https://api.telegram.org").rstrip("/")
+# 이 시간(초) 안에 들어온 메시지는 하나로 합쳐 보낸다.
+COALESCE_SECONDS = float(os.environ.get("TELEGRAM_COALESCE_SECONDS", "1.0"))
+# 텔레그램 sendMessage 의 본문 길이 제한
+MAX_MESSAGE_CHARS = 4096
+MAX_ATTEMPTS = 5
+REQUEST_TIMEOUT = 10
+_SEPARATOR = "\n\n"
+_STOP = object()
+
+
+@dataclass
+class NotifierStats:
+    queued: int = 0
+    batches: int = 0
+    delivered: int = 0
+    failed: int = 0
+    rate_limited: int = 0
+
+
+def pack_messages(messages: list[str], limit: int = MAX_MESSAGE_CHARS) -> list[str]:
+    """메시지를 순서대로 이어 붙이되 한 건이 limit 를 넘지 않게 나눈다."""
+    packed: list[str] = []
+    current = ""
+    for msg in messages:
+        while len(msg) > limit:
+            if current:
+                packed.append(current)
+                current = ""
+            packed.append(msg[:limit])
+            msg = msg[limit:]
+        if not msg:
+            continue
+        if current and len(current) + len(_SEPARATOR) + len(msg) > limit:
+            packed.append(current)
+            current = ""
+        current = f"{current}{_SEPARATOR}{msg}" if current else msg
+    if current:
+        packed.append(current)
+    return packed
+
+
+class TelegramNotifier:
+    """백그라운드 스레드에서 텔레그램으로 보낸다. send() 는 큐에 넣기만 하고 바로 돌아온다."""
+
+    def __init__(
+        self,
+        token: str | None = TELEGRAM_TOKEN,
+        chat_ids: list[str] | None = None,
+        api_base: str = TELEGRAM_API_BASE,
+        coalesce_seconds: float = COALESCE_SECONDS,
+        client: KeepAliveClient | None = None,
+    ) -> None:
+        self.token = token
+        self.chat_ids = list(TELEGRAM_CHAT_IDS if chat_ids is None else chat_ids)
+        self.api_base = api_base.rstrip("/")
+        self.coalesce_seconds = coalesce_seconds
+        # api.telegram.org 로 가는 keep-alive 연결 하나를 계속 쓴다.
+        self.client = client or KeepAliveClient(timeout=REQUEST_TIMEOUT, max_idle_per_host=1)
+        self.stats = NotifierStats()
+        self._queue: queue.Queue[object] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.token and self.chat_ids)
+
+    def __enter__(self) -> TelegramNotifier:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def send(self, msg: str) -> None:
+        if not self.configured:
+            print("⚠️ 텔레그램 설정 없음: MY_ALARM_TOKEN / MY_CHAT_ID")
+            return
+        self._ensure_thread()
+        self.stats.queued += 1
+        self._queue.put(msg)
+
+    def flush(self, timeout: float | None = 30) -> bool:
+        """지금까지 넣은 메시지를 모두 보낼 때까지 기다린다. 시간 안에 끝나면 True."""
+        if self._thread is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    print(f"⚠️ 텔레그램 전송 대기 시간 초과 (남은 {self._queue.unfinished_tasks}건)")
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = 30) -> None:
+        self.flush(timeout)
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        self.client.close()
+
+    def _ensure_thread(self) -> None:
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="telegram-notifier", daemon=True)
+                self._thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                return
+            batch = [first]
+            stop = False
+            # 첫 메시지 이후 잠깐 더 받아서 한 번에 보낸다.
+            deadline = time.monotonic() + self.coalesce_seconds
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._deliver([str(msg) for msg in batch])
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _deliver(self, messages: list[str]) -> None:
+        for text in pack_messages(messages):
+            self.stats.batches += 1
+            for chat_id in self.chat_ids:
+                if self._post(chat_id, text):
+                    self.stats.delivered += 1
+                else:
+                    self.stats.failed += 1
+
+    def _post(self, chat_id: str, text: str) -> bool:
+        url = f"{self.api_base}/bot{self.token}/sendMessage"
+        payload = json.dumps({"chat_id": chat_id, "text": text}).encode("utf-8")
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                resp = self.client.request(
+                    "POST", url, body=payload, headers={"Content-Type": "application/json"}
+                )
+            except Exception as exc:
+                print(f"⚠️ 텔레그램 전송 실패 ({chat_id}): {exc}")
+                if attempt == MAX_ATTEMPTS:
+                    return False
+                time.sleep(attempt)
+                continue
+
+            if resp.status == 429:
+                self.stats.rate_limited += 1
+                retry_after = _retry_after(resp.body)
+                print(f"⏳ 텔레그램 429: {retry_after}초 뒤 다시 보냄 ({chat_id})")
+                time.sleep(retry_after)
+                continue
+            print(f"📡 텔레그램 전송 결과: {resp.status}")
+            if resp.status >= 500 and attempt < MAX_ATTEMPTS:
+                time.sleep(attempt)
+                continue
+            return resp.status < 400
+        return False
+
+    def report(self) -> str:
+        s = self.stats
+        return (
+            f"📨 텔레그램: 메시지 {s.queued}건 -> 전송 {s.batches}묶음 / "
+            f"성공 {s.delivered} / 실패 {s.failed} / 429 {s.rate_limited}회"
+        )
+
+
+def _retry_after(body: bytes) -> float:
+    try:
+        data = json.loads(body.decode("utf-8"))
+        return max(1.0, float(data["parameters"]["retry_after"]))
+    except (ValueError, KeyError, TypeError):
+        return 1.0
+
+
+_DEFAULT: TelegramNotifier | None = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_notifier() -> TelegramNotifier:
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = TelegramNotifier()
+            # main 에서 flush 를 빠뜨려도 종료 전에 남은 메시지를 보낸다.
+            atexit.register(_DEFAULT.close)
+        return _DEFAULT
+
+
+def send_telegram(msg: str) -> None:
+    default_notifier().send(msg)
+
+
+def flush(timeout: float | None = 30) -> bool:
+    return default_notifier().flush(timeout)
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+import notifier
+import timings
+import whos_there
+from run_bots import (
+    DEFAULT_SITES,
+    SITES,
+    SiteResult,
+    collect_messages,
+    export_timings,
+    send_messages,
+)
+from slot_store import SiteScan, SlotStore
+
+# 10분 작업 제한에서 체크아웃/설치 시간을 뺀 전체 마감 (초)
+DEFAULT_DEADLINE = float(os.environ.get("ORCHESTRATE_DEADLINE", "480"))
+# 사이트별 제한. 브라우저를 쓰는 사이트는 시간/메모리를 더 준다.
+DEFAULT_TIMEOUTS = {"earth_star": 300.0, "dungeon": 240.0, "whos_there": 120.0, "page_today": 240.0}
+DEFAULT_MEMORY_MB = float(os.environ.get("ORCHESTRATE_MEMORY_MB", "1536"))
+DEFAULT_CPU_SECONDS = float(os.environ.get("ORCHESTRATE_CPU_SECONDS", "240"))
+POLL_SECONDS = 0.5
+# SIGTERM 뒤 이만큼 기다렸다가 SIGKILL
+KILL_GRACE_SECONDS = 3.0
+
+
+@dataclass
+class SiteLimits:
+    timeout: float
+    memory_mb: float | None = DEFAULT_MEMORY_MB
+    cpu_seconds: float | None = DEFAULT_CPU_SECONDS
+
+
+@dataclass
+class Worker:
+    """사이트 하나를 맡은 자식 프로세스. 새 세션으로 띄워 Chrome/chromedriver 까지 한 번에 정리한다."""
+
+    name: str
+    limits: SiteLimits
+    result_path: str
+    proc: subprocess.Popen[str]
+    started: float
+    killed: str | None = None
+    peak_memory_mb: float = 0.0
+    cpu_seconds: float = 0.0
+    output: threading.Thread | None = None
+
+
+@dataclass
+class Usage:
+    memory_mb: float
+    cpu_seconds: float
+    pids: list[int] = field(default_factory=list)
+
+
+def _page_kb() -> float:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") / 1024
+    except (AttributeError, ValueError, OSError):
+        return 4.0
+
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_KB = _page_kb()
+
+
+def session_usage(sid: int) -> Usage | None:
+    """세션 sid 에 속한 모든 프로세스의 RSS 합과 CPU 시간 합. /proc 이 없으면 None."""
+    if not os.path.isdir("/proc"):
+        return None
+    usage = Usage(0.0, 0.0)
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="ascii", errors="replace") as fp:
+                stat = fp.read()
+        except OSError:
+            continue
+        # comm 에 공백/괄호가 있을 수 있어 마지막 ')' 뒤부터 나눈다.
+        fields = stat[stat.rfind(")") + 2:].split()
+        if len(fields) < 22 or int(fields[3]) != sid:
+            continue
+        usage.pids.append(int(entry))
+        usage.cpu_seconds += (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+        usage.memory_mb += int(fields[21]) * _PAGE_KB / 1024
+    return usage
+
+
+def _limit_cpu(cpu_seconds: float | None) -> None:
+    # 자식 프로세스가 시작하자마자 스스로 건다. CPU 시간은 프로세스마다 걸리므로 세션 합계는 감시 루프가 본다.
+    if not cpu_seconds:
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    soft = int(cpu_seconds)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 5))
+
+
+def spawn(name: str, now_kst: datetime, limits: SiteLimits, result_dir: str) -> Worker:
+    result_path = os.path.join(result_dir, f"{name}.json")
+    cmd = [
+        sys.executable,
+        os.path.abspath(__file__),
+        "--worker",
+        name,
+        "--now",
+        now_kst.isoformat(),
+        "--result",
+        result_path,
+    ]
+    if limits.cpu_seconds:
+        cmd += ["--cpu-seconds", f"{name}={limits.cpu_seconds}"]
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        start_new_session=True,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    worker = Worker(name=name, limits=limits, result_path=result_path, proc=proc, started=time.monotonic())
+    worker.output = threading.Thread(target=_relay_output, args=(worker,), name=f"{name}-output", daemon=True)
+    worker.output.start()
+    return worker
+
+
+def _relay_output(worker: Worker) -> None:
+    assert worker.proc.stdout is not None
+    for line in worker.proc.stdout:
+        print(f"[{worker.name}] {line}", end="", flush=True)
+
+
+def _signal_session(worker: Worker, signum: int) -> None:
+    usage = session_usage(worker.proc.pid)
+    pids = usage.pids if usage else [worker.proc.pid]
+    for pid in pids:
+        try:
+            os.kill(pid, signum)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+def stop(worker: Worker, reason: str) -> None:
+    """worker 와 그 아래 Chrome/chromedriver 까지 종료한다."""
+    if worker.proc.poll() is not None:
+        return
+    worker.killed = reason
+    print(f"⛔ [{worker.name}] 중단: {reason}")
+    _signal_session(worker, signal.SIGTERM)
+    try:
+        worker.proc.wait(timeout=KILL_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        pass
+    _signal_session(worker, getattr(signal, "SIGKILL", signal.SIGTERM))
+    worker.proc.wait()
+
+
+def supervise(workers: list[Worker], deadline: float) -> None:
+    """모든 worker 가 끝날 때까지 시간/메모리/CPU 제한을 확인한다. deadline 은 time.monotonic 기준."""
+    while True:
+        running = [w for w in workers if w.proc.poll() is None]
+        if not running:
+            break
+        now = time.monotonic()
+        for worker in running:
+            usage = session_usage(worker.proc.pid)
+            if usage is not None:
+                worker.peak_memory_mb = max(worker.peak_memory_mb, usage.memory_mb)
+                worker.cpu_seconds = max(worker.cpu_seconds, usage.cpu_seconds)
+            limits = worker.limits
+            if now >= deadline:
+                stop(worker, "전체 마감 시간 초과")
+            elif now - worker.started >= limits.timeout:
+                stop(worker, f"시간 초과 ({limits.timeout:.0f}s)")
+            elif usage and limits.memory_mb and usage.memory_mb > limits.memory_mb:
+                stop(worker, f"메모리 초과 ({usage.memory_mb:.0f}MB > {limits.memory_mb:.0f}MB)")
+            elif usage and limits.cpu_seconds and usage.cpu_seconds > limits.cpu_seconds:
+                stop(worker, f"CPU 시간 초과 ({usage.cpu_seconds:.0f}s > {limits.cpu_seconds:.0f}s)")
+        time.sleep(POLL_SECONDS)
+    for worker in workers:
+        if worker.output is not None:
+            worker.output.join(timeout=1)
+
+
+def read_result(worker: Worker) -> tuple[SiteResult, list[timings.Span]]:
+    result = SiteResult(name=worker.name, seconds=time.monotonic() - worker.started)
+    try:
+        with open(worker.result_path, encoding="utf-8") as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        data = None
+    if worker.killed:
+        result.error = worker.killed
+    elif data is None:
+        result.error = f"결과 없음 (종료 코드 {worker.proc.returncode})"
+    if data is None:
+        return result, []
+    result.seconds = data["seconds"]
+    result.error = result.error or data.get("error")
+    if data.get("scan") is not None and not worker.killed:
+        result.scan = SiteScan.from_dict(data["scan"])
+    return result, [timings.Span(**item) for item in data.get("spans") or []]
+
+
+def run_worker(name: str, now_kst: datetime, result_path: str, cpu_seconds: float | None = None) -> None:
+    """자식 프로세스: 사이트 하나를 자기 브라우저/연결로 돌리고 결과를 JSON 으로 남긴다. 알림은 부모가 한다."""
+    _limit_cpu(cpu_seconds)
+    import dungeon
+    from browser_pool import USER_AGENT, BrowserSession
+    from http_pool import KeepAliveClient
+    from run_bots import SharedContext, build_shared_holiday_set, run_site
+
+    session = BrowserSession(window_size=dungeon.WINDOW_SIZE)
+    client = KeepAliveClient(headers={"User-Agent": USER_AGENT})
+    result = SiteResult(name=name)
+    try:
+        ctx = SharedContext(
+            now_kst=now_kst, holiday_set=build_shared_holiday_set(now_kst), session=session, client=client
+        )
+        run_site(name, ctx, result)
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+    finally:
+        client.close()
+        if session.launch_count:
+            print(session.report())
+        session.quit()
+
+    data = {
+        "name": name,
+        "seconds": result.seconds,
+        "error": result.error,
+        "scan": result.scan.to_dict() if result.scan is not None else None,
+        "spans": [asdict(span) for span in timings.spans()],
+    }
+    tmp_path = f"{result_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fp:
+        json.dump(data, fp, ensure_ascii=False)
+    os.replace(tmp_path, result_path)
+
+
+def parse_site_values(values: list[str], label: str) -> dict[str, float]:
+    parsed = {}
+    for value in values:
+        name, _, number = value.partition("=")
+        if name not in SITES or not number:
+            raise ValueError(f"잘못된 {label} 지정: {value} (예: earth_star=120)")
+        parsed[name] = float(number)
+    return parsed
+
+
+def print_report(workers: list[Worker], results: list[SiteResult], total_seconds: float) -> None:
+    print("----- 사이트별 결과 -----")
+    for worker, result in zip(workers, results):
+        status = f"실패 ({result.error})" if result.error else f"알림 {len(result.messages)}건"
+        usage = f"메모리 최대 {worker.peak_memory_mb:6.0f}MB / CPU {worker.cpu_seconds:6.1f}s"
+        print(f"⏱️ {result.name:<11} {result.seconds:7.2f}s  {usage}  {status}")
+    print(f"⏱️ {'total':<11} {total_seconds:7.2f}s")
+    telegram = notifier.default_notifier()
+    if telegram.stats.queued:
+        print(telegram.report())
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="사이트 검사를 사이트별 자식 프로세스로 동시에 돌리고, 끝나면 결과와 알림을 한 번에 모은다."
+    )
+    parser.add_argument("sites", nargs="*", metavar="SITE", help=f"실행할 사이트 (기본: {' '.join(DEFAULT_SITES)})")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE, help="전체 마감 (초)")
+    parser.add_argument("--timeout", action="append", default=[], metavar="SITE=SECONDS", help="사이트별 시간 제한")
+    parser.add_argument("--memory-mb", action="append", default=[], metavar="SITE=MB", help="사이트별 메모리(RSS 합) 제한")
+    parser.add_argument("--cpu-seconds", action="append", default=[], metavar="SITE=SECONDS", help="사이트별 CPU 시간 제한")
+    parser.add_argument("--timings", default=timings.JSONL_PATH, metavar="PATH", help="구간별 소요 시간 JSON lines 파일")
+    parser.add_argument("--prometheus", default=timings.PROM_PATH, metavar="PATH", help="Prometheus textfile 출력 경로")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--now", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--result", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        cpu = parse_site_values(args.cpu_seconds, "CPU 제한")
+        run_worker(args.worker, datetime.fromisoformat(args.now), args.result, cpu.get(args.worker))
+        return
+
+    unknown = [name for name in args.sites if name not in SITES]
+    if unknown:
+        parser.error(f"알 수 없는 사이트: {', '.join(unknown)}")
+    try:
+        timeouts = parse_site_values(args.timeout, "시간 제한")
+        memory = parse_site_values(args.memory_mb, "메모리 제한")
+        cpu = parse_site_values(args.cpu_seconds, "CPU 제한")
+    except ValueError as exc:
+        parser.error(str(exc))
+    names = list(dict.fromkeys(args.sites or DEFAULT_SITES))
+
+    started = time.monotonic()
+    deadline = started + args.deadline
+    now_kst = whos_there.get_kst_now()
+    with tempfile.TemporaryDirectory(prefix="orchestrate_") as result_dir:
+        workers = [
+            spawn(
+                name,
+                now_kst,
+                SiteLimits(
+                    timeout=min(timeouts.get(name, DEFAULT_TIMEOUTS.get(name, args.deadline)), args.deadline),
+                    memory_mb=memory.get(name, DEFAULT_MEMORY_MB),
+                    cpu_seconds=cpu.get(name, DEFAULT_CPU_SECONDS),
+                ),
+                result_dir,
+            )
+            for name in names
+        ]
+        try:
+            supervise(workers, deadline)
+        except KeyboardInterrupt:
+            for worker in workers:
+                stop(worker, "사용자 중단")
+            raise
+        collected = [read_result(worker) for worker in workers]
+
+    results = [result for result, _ in collected]
+    spans = [span for _, worker_spans in collected for span in worker_spans]
+    # 끝난 사이트의 결과만 상태 저장소에 반영하고, 새로 열린 슬롯 알림은 한 번에 보낸다. (notifier 가 묶어서 보낸다)
+    with SlotStore() as store:
+        collect_messages(results, store)
+    send_messages(results)
+    spans.extend(timings.spans())
+
+    print_report(workers, results, time.monotonic() - started)
+    print(timings.report(spans))
+    export_timings(spans, args.timings, args.prometheus)
+    if any(result.error for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,71 +1,206 @@
-import time
+import json
 import os
-import requests
-from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from http.client import HTTPException
+from urllib.parse import urlencode, urljoin
+
+import capture
+import timings
+import watchlist
+from browser_pool import USER_AGENT, BrowserSession, register_profile
+from html_dom import parse_html
+from http_pool import KeepAliveClient
+from notifier import flush, send_telegram
+from readiness import wait_until_ready
+from slot_store import SiteScan, SlotStore, diff_messages
 
 # --- [설정] ---
+SITE_NAME = "page_today"
+SITE_LABEL = "페이지투데이"
+# 사이트의 회차 시간표. 어느 회차를 알릴지는 감시 대상의 시간 구간으로 정한다.
 WEEKEND_TIMES = ["10:50", "12:00", "13:10", "14:20", "15:30", "16:40", "17:50", "19:00", "20:10", "21:20"]
 WEEKDAY_TIMES = ["19:00", "20:10", "21:20"]
+# 기본 감시 대상 (watchlist.json 에 page_today 항목이 없을 때). 테마가 하나뿐이라 모든 대상이 같은 요청을 쓴다.
+# 이 사이트의 holiday 구간은 주말에 쓴다.
+DEFAULT_TARGETS = [{"theme": "reserve", "weekday": ["00:00-23:59"], "holiday": ["00:00-23:59"]}]
 
-TELEGRAM_TOKEN = os.environ.get('MY_ALARM_TOKEN')
-TELEGRAM_CHAT_ID = os.environ.get('MY_CHAT_ID')
-
-
-def send_telegram(msg):
-    if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
-        print("⚠️ 텔레그램 설정 확인 필요")
-        return
-    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-    try:
-        res = requests.post(url, json={"chat_id": TELEGRAM_CHAT_ID, "text": msg}, timeout=10)
-        print(f"📡 알람 전송 결과: {res.status_code}")
-    except Exception as e:
-        print(f"⚠️ 전송 에러: {e}")
+# 녹화한 페이지로 재생할 때는 로컬 서버 주소로 바꾼다. (bench_replay.py)
+SITE_URL = os.environ.get('PAGE_TODAY_SITE_URL', "https://page-today.co.kr/").rstrip('/') + '/'
+RESERVE_URL = f"{SITE_URL}#reserve"
+# 이미지/폰트/추적 스크립트 차단 설정 (browser_pool.BROWSER_PROFILE=lean 일 때)
+LOAD_PROFILE = register_profile(SITE_NAME, SITE_URL)
+# ajax: get_theme_list 뒤의 엔드포인트를 직접 호출 (실패한 날짜만 브라우저로 폴백) / browser: 기존 datepicker 방식
+BACKEND = os.environ.get('PAGE_TODAY_BACKEND', 'ajax')
+# 엔드포인트를 알고 있으면 지정해서 사이트 JS 탐색을 건너뛴다. 예) /reserve/theme_list.php
+THEME_LIST_URL = os.environ.get('PAGE_TODAY_THEME_LIST_URL')
+THEME_LIST_METHOD = os.environ.get('PAGE_TODAY_THEME_LIST_METHOD', 'POST')
+THEME_LIST_PARAM = os.environ.get('PAGE_TODAY_THEME_LIST_PARAM', 'date')
+HTTP_TIMEOUT = 10
+# 예전 고정 대기(7초/3초) 대신 조건 대기의 최대 시간
+PAGE_READY_SECONDS = 15
+DATE_READY_SECONDS = 8
 
 
-def get_next_week_info():
+def get_next_week_info(now_kst=None):
     day_list = []
     # 한국 요일 이름 리스트
     weekdays = ['월', '화', '수', '목', '금', '토', '일']
+    now_kst = now_kst or datetime.utcnow() + timedelta(hours=9)
 
     for i in range(7):
-        target = datetime.utcnow() + timedelta(hours=9) + timedelta(days=i)
+        target = now_kst + timedelta(days=i)
         day_list.append({
             "date": target.strftime('%Y-%m-%d'),
             "day_name": weekdays[target.weekday()],  # 요일 추출
-            "is_weekend": target.weekday() >= 5
+            "is_weekend": target.weekday() >= 5,
+            "times": WEEKEND_TIMES if target.weekday() >= 5 else WEEKDAY_TIMES,
         })
     return day_list
 
 
-def check_reservations():
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36")
+def load_targets():
+    return watchlist.targets_for(SITE_NAME, DEFAULT_TARGETS, lambda target: target.theme)
+
+
+def scan_buttons(buttons, target_times):
+    """(텍스트, class, disabled) 목록에서 시간별 예약 가능 여부를 만든다. 버튼 스캔과 AJAX 응답이 같은 규칙을 쓴다."""
+    states = {}
+    for target_time in target_times:
+        for btn_text, classes, is_disabled in buttons:
+            if target_time in btn_text:
+                states[target_time] = "btn-primary" in (classes or "") and is_disabled is None
+                break
+    return states
+
+
+def _find_theme_list_call(source):
+    match = re.search(r"function\s+get_theme_list\s*\(\s*(\w*)\s*\)\s*\{(.{0,3000})", source, re.S)
+    if not match:
+        return None
+    arg, body = match.group(1), match.group(2)
+    url = re.search(r"url\s*:\s*['\"]([^'\"]+)['\"]", body) or re.search(
+        r"\$\.(?:post|get|ajax)\(\s*['\"]([^'\"]+)['\"]", body
+    )
+    if not url:
+        return None
+    is_get = re.search(r"\$\.get\(|type\s*:\s*['\"]get['\"]|method\s*:\s*['\"]get['\"]", body, re.I)
+    param = None
+    if arg:
+        param_match = re.search(r"['\"]?(\w+)['\"]?\s*[:=]\s*" + re.escape(arg) + r"\b", body)
+        if param_match:
+            param = param_match.group(1)
+    return url.group(1), "GET" if is_get else "POST", param or THEME_LIST_PARAM
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    day_info_list = get_next_week_info()
 
-    print(f"🕵️ 감시 시작: {day_info_list[0]['date']} ~ {day_info_list[-1]['date']}")
+def discover_theme_list_endpoint(client):
+    """메인 페이지와 같은 호스트의 스크립트에서 get_theme_list 가 호출하는 URL/메서드/파라미터를 찾는다."""
+    if THEME_LIST_URL:
+        return urljoin(SITE_URL, THEME_LIST_URL), THEME_LIST_METHOD.upper(), THEME_LIST_PARAM
+
+    html = client.get(SITE_URL, timeout=HTTP_TIMEOUT).text()
+    sources = [(SITE_URL, html)]
+    for src in re.findall(r"<script[^>]+src=['\"]([^'\"]+)['\"]", html, re.I):
+        script_url = urljoin(SITE_URL, src)
+        if not script_url.startswith(SITE_URL):
+            continue
+        try:
+            sources.append((script_url, client.get(script_url, timeout=HTTP_TIMEOUT).text()))
+        except (OSError, HTTPException):
+            continue
+
+    for base_url, source in sources:
+        found = _find_theme_list_call(source)
+        if found:
+            url, method, param = found
+            return urljoin(base_url, url), method, param
+    return None
+
+
+def parse_theme_list(body, target_times):
+    """get_theme_list 응답(HTML 조각 또는 HTML을 담은 JSON)을 시간별 상태로 바꾼다. 버튼이 없으면 None."""
+    markup = body
+    try:
+        data = json.loads(body)
+    except ValueError:
+        data = None
+    if data is not None:
+        fragments = []
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, dict):
+                stack.extend(item.values())
+            elif isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, str) and "<button" in item:
+                fragments.append(item)
+        markup = "".join(fragments)
+
+    buttons = [
+        (node.inner_text(), node.get("class") or "", "true" if "disabled" in node.attrs else None)
+        for node in parse_html(markup).find_all(lambda n: n.tag == "button")
+    ]
+    if not buttons:
+        return None
+    return scan_buttons(buttons, target_times)
+
+
+def fetch_day_states(client, endpoint, day_info):
+    url, method, param = endpoint
+    target_times = day_info["times"]
+    form = {param: day_info["date"]}
+    headers = {"X-Requested-With": "XMLHttpRequest", "Referer": RESERVE_URL}
+    try:
+        with timings.span(timings.HTTP_FETCH, SITE_NAME, day_info["date"]):
+            if method == "GET":
+                resp = client.get(f"{url}?{urlencode(form)}", headers=headers, timeout=HTTP_TIMEOUT)
+            else:
+                resp = client.post_form(url, form, headers=headers, timeout=HTTP_TIMEOUT)
+    except (OSError, HTTPException) as e:
+        print(f"⚠️ AJAX 조회 실패 {day_info['date']}: {e}")
+        return None
+    if resp.status != 200:
+        print(f"⚠️ AJAX 응답 코드 {resp.status} ({day_info['date']})")
+        return None
+    with timings.span(timings.CLASSIFY, SITE_NAME, day_info["date"]):
+        return parse_theme_list(resp.text(), target_times)
+
 
+def fetch_states_ajax(client, day_info_list):
+    """날짜별 get_theme_list 를 동시에 호출한다. 실패하거나 버튼이 없는 날짜는 결과에서 빠진다."""
     try:
-        driver.get("https://page-today.co.kr/#reserve")
-        time.sleep(7)
+        endpoint = discover_theme_list_endpoint(client)
+    except (OSError, HTTPException) as e:
+        print(f"⚠️ 메인 페이지 조회 실패: {e}")
+        return {}
+    if not endpoint:
+        print("⚠️ get_theme_list 엔드포인트를 찾지 못했습니다.")
+        return {}
+    print(f"🔗 AJAX 엔드포인트: {endpoint[1]} {endpoint[0]} ({endpoint[2]}=날짜)")
+
+    def fetch(info):
+        with timings.span(timings.DATE, SITE_NAME, info["date"]):
+            return fetch_day_states(client, endpoint, info)
+
+    with ThreadPoolExecutor(max_workers=len(day_info_list)) as pool:
+        results = list(pool.map(fetch, day_info_list))
+    return {info["date"]: states for info, states in zip(day_info_list, results) if states is not None}
+
+
+def fetch_states_browser(session, day_info_list):
+    from selenium.webdriver.common.by import By
+
+    states_by_date = {}
+    with session.lock, timings.context(SITE_NAME):
+        driver = session.open(RESERVE_URL, LOAD_PROFILE)
+        wait_until_ready(driver, "page_today 첫 화면", "body", "button", timeout=PAGE_READY_SECONDS)
+        capture.record_page(driver)
 
         for day_info in day_info_list:
             target_date = day_info["date"]
-            day_name = day_info["day_name"]
-            target_times = WEEKEND_TIMES if day_info["is_weekend"] else WEEKDAY_TIMES
-
-            print(f"📅 확인 중: {target_date}({day_name})")
+            target_times = day_info["times"]
 
             # 날짜 변경 JS
             update_script = f"""
@@ -79,28 +214,89 @@ def check_reservations():
             if (dpEl) dpEl.dispatchEvent(new Event('change', {{ bubbles: true }}));
             if (typeof get_theme_list === 'function') {{ get_theme_list(date); }}
             """
-            driver.execute_script(update_script)
-            time.sleep(3)
-
-            buttons = driver.find_elements(By.TAG_NAME, "button")
-            for target_time in target_times:
-                for btn in buttons:
-                    btn_text = btn.get_attribute("innerText").replace('\n', ' ').strip()
-                    if target_time in btn_text:
-                        classes = btn.get_attribute("class")
-                        is_disabled = btn.get_attribute("disabled")
-                        if "btn-primary" in classes and is_disabled is None:
-                            print(f"✅ 발견: {target_date}({day_name}) {target_time}")
-
-                            # 요일 포함 알람 메시지
-                            msg = f"🔥 [방탈출 발견!] 🔥\n날짜: {target_date}({day_name})\n시간: {target_time}\n예약: https://page-today.co.kr/#reserve"
-                            send_telegram(msg)
-                        break
+            with timings.context(SITE_NAME, target_date), timings.span(timings.DATE):
+                driver.execute_script(update_script)
+                # get_theme_list 의 AJAX 가 끝나고 버튼 목록이 다시 그려질 때까지 기다린다.
+                wait_until_ready(driver, f"page_today {target_date}", "body", "button", timeout=DATE_READY_SECONDS)
+                capture.record_page(driver, rendered=False)
+
+                with timings.span(timings.EXTRACT):
+                    buttons = [
+                        (
+                            btn.get_attribute("innerText").replace('\n', ' ').strip(),
+                            btn.get_attribute("class"),
+                            btn.get_attribute("disabled"),
+                        )
+                        for btn in driver.find_elements(By.TAG_NAME, "button")
+                    ]
+                with timings.span(timings.CLASSIFY):
+                    states_by_date[target_date] = scan_buttons(buttons, target_times)
+    return states_by_date
+
+
+def run(session, client, now_kst=None):
+    """7일치 예약 상태를 확인하고 열린 슬롯과 확인한 날짜 범위를 돌려준다."""
+    week = get_next_week_info(now_kst)
+    print(f"🕵️ 감시 시작: {week[0]['date']} ~ {week[-1]['date']}")
+
+    # 날짜 하나의 회차 목록은 요청 한 번으로 오므로, 대상이 여럿이어도 날짜마다 한 번만 묻는다.
+    targets = load_targets()
+    fetches = watchlist.plan_fetches(
+        targets,
+        [date.fromisoformat(info["date"]) for info in week],
+        lambda d: d.weekday() >= 5,
+        unit=lambda target: SITE_NAME,
+    )
+    print(watchlist.describe_plan(SITE_NAME, targets, fetches))
+    fetch_by_date = {fetch.label: fetch for fetch in fetches}
+    day_info_list = []
+    for info in week:
+        fetch = fetch_by_date.get(info["date"])
+        if fetch:
+            day_info_list.append({**info, "times": [t for t in info["times"] if fetch.allows(t)]})
+
+    states_by_date = fetch_states_ajax(client, day_info_list) if BACKEND == 'ajax' and day_info_list else {}
+    missing = [info for info in day_info_list if info["date"] not in states_by_date]
+    if missing:
+        if BACKEND == 'ajax':
+            print(f"↩️ AJAX 결과 없는 {len(missing)}일은 브라우저로 확인합니다.")
+        states_by_date.update(fetch_states_browser(session, missing))
+
+    scan = SiteScan(SITE_NAME)
+    for day_info in day_info_list:
+        target_date = day_info["date"]
+        day_name = day_info["day_name"]
+        print(f"📅 확인 중: {target_date}({day_name})")
+        if target_date not in states_by_date:
+            continue
+
+        open_times = [t for t, is_open in states_by_date[target_date].items() if is_open]
+        for target_time in open_times:
+            print(f"✅ 발견: {target_date}({day_name}) {target_time}")
+        kind = "주말" if day_info["is_weekend"] else "평일"
+        for target, target_times in fetch_by_date[target_date].split(open_times).items():
+            scan.add(target.name, target_date, target_times, kind)
+    return scan
+
+
+def build_messages(slots):
+    # 버튼마다 따로 보내지 않고 새로 열린 시간을 한 메시지로 묶는다. (요일 포함)
+    lines = [f"- {slot.date}({slot.day_name}) {slot.time}" for slot in sorted(slots, key=lambda s: (s.date, s.time))]
+    return ["🔥 [방탈출 발견!] 🔥\n" + "\n".join(lines) + f"\n예약: {RESERVE_URL}"]
+
+
+def check_reservations():
+    try:
+        with BrowserSession() as session, KeepAliveClient(headers={"User-Agent": USER_AGENT}) as client:
+            scan = run(session, client)
+        with SlotStore() as store:
+            messages = diff_messages(store, scan, build_messages, SITE_LABEL)
+        for msg in messages:
+            send_telegram(msg)
+        flush()
     except Exception as e:
         print(f"⚠️ 에러: {e}")
-    finally:
-        driver.quit()
 
 
 if __name__ == "__main__":
-    check_reservations()
\ No newline at end of file
+    check_reservations()
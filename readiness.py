@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import timings
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+# 이 시간(ms) 동안 대상 영역에 DOM 변경이 없으면 렌더링이 끝난 것으로 본다.
+QUIET_MS = int(os.environ.get("READY_QUIET_MS", "300"))
+
+# 브라우저 안에서 조건을 기다린다.
+# - root 가 존재하고, item 셀렉터가 주어졌으면 root 아래에 하나 이상 있고
+# - jQuery 대기 중인 AJAX 가 0 이며
+# - root 주변에 MutationObserver 로 감지한 변경이 quietMs 동안 없을 때 완료
+# timeoutMs 가 지나면 조건과 상관없이 ok=false 로 끝낸다.
+READY_SCRIPT = """
+var rootSelector = arguments[0];
+var itemSelector = arguments[1];
+var quietMs = arguments[2];
+var timeoutMs = arguments[3];
+var done = arguments[arguments.length - 1];
+var started = Date.now();
+var last = started;
+var finished = false;
+function root() {
+  return rootSelector ? document.querySelector(rootSelector) : document.body;
+}
+function itemCount(r) {
+  return itemSelector ? r.querySelectorAll(itemSelector).length : -1;
+}
+function pendingAjax() {
+  return window.jQuery && window.jQuery.active ? window.jQuery.active : 0;
+}
+function ready() {
+  var r = root();
+  if (!r || itemCount(r) === 0) return false;
+  return pendingAjax() === 0 && document.readyState !== 'loading';
+}
+var observer = new MutationObserver(function (records) {
+  var r = root();
+  for (var i = 0; i < records.length; i++) {
+    var target = records[i].target;
+    if (!r || r.contains(target) || target.contains(r)) {
+      last = Date.now();
+      return;
+    }
+  }
+});
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+var timer = null;
+function finish(ok) {
+  if (finished) return;
+  finished = true;
+  observer.disconnect();
+  clearInterval(timer);
+  var r = root();
+  done({ok: ok, elapsed: Date.now() - started, items: r ? itemCount(r) : 0, ajax: pendingAjax()});
+}
+timer = setInterval(function () {
+  var now = Date.now();
+  if (now - started >= timeoutMs) {
+    finish(false);
+  } else if (ready() && now - last >= quietMs) {
+    finish(true);
+  }
+}, 50);
+"""
+
+
+@dataclass
+class WaitRecord:
+    label: str
+    seconds: float
+    ok: bool
+    items: int
+
+
+# watch.py 처럼 오래 도는 프로세스에서도 메모리가 늘지 않도록 최근 기록만 남긴다.
+_RECORDS: deque[WaitRecord] = deque(maxlen=1000)
+_RECORDS_LOCK = threading.Lock()
+
+
+def wait_until_ready(
+    driver: webdriver.Chrome,
+    label: str,
+    root_selector: str | None = "body",
+    item_selector: str | None = None,
+    timeout: float = 12,
+    quiet_ms: int = QUIET_MS,
+) -> bool:
+    """고정 sleep 대신 구체적인 조건(요소 등장, AJAX 0건, DOM 안정)을 기다린다. 시간 초과면 False."""
+    from selenium.common.exceptions import WebDriverException
+
+    started = time.perf_counter()
+    items = 0
+    try:
+        driver.set_script_timeout(timeout + 5)
+        result = driver.execute_async_script(READY_SCRIPT, root_selector, item_selector, quiet_ms, int(timeout * 1000))
+        ok = bool(result and result.get("ok"))
+        items = int((result or {}).get("items") or 0)
+    except WebDriverException as exc:
+        ok = False
+        print(f"⚠️ 준비 대기 실패 [{label}]: {str(exc).splitlines()[0] if str(exc) else type(exc).__name__}")
+
+    record = WaitRecord(label=label, seconds=time.perf_counter() - started, ok=ok, items=items)
+    with _RECORDS_LOCK:
+        _RECORDS.append(record)
+    timings.record(timings.READY_WAIT, record.seconds, ok=ok)
+    if not ok:
+        print(f"⚠️ 준비 대기 시간 초과 [{label}] {record.seconds:.2f}s")
+    return ok
+
+
+def records() -> list[WaitRecord]:
+    with _RECORDS_LOCK:
+        return list(_RECORDS)
+
+
+def report() -> str:
+    current = records()
+    if not current:
+        return "⏱️ 준비 대기 없음"
+    total = sum(r.seconds for r in current)
+    timeouts = sum(1 for r in current if not r.ok)
+    slowest = max(current, key=lambda r: r.seconds)
+    return (
+        f"⏱️ 준비 대기 {len(current)}회 합계 {total:.2f}s (평균 {total / len(current):.2f}s, "
+        f"최장 {slowest.label} {slowest.seconds:.2f}s, 시간 초과 {timeouts}회)"
+    )
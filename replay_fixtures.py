@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib import parse
+
+# 녹화한 시나리오를 두는 곳. 시나리오마다 디렉터리 하나 (manifest.json + 응답 본문 파일)
+FIXTURES_DIR = os.environ.get("REPLAY_FIXTURES_DIR", "fixtures")
+MANIFEST_NAME = "manifest.json"
+# manifest 형식 버전. 필드를 바꾸면 올리고 load_scenario 에서 예전 형식을 처리한다.
+FORMAT_VERSION = 1
+# Exchange.source: 봇이 직접 보낸 요청 / 브라우저가 받은 문서·XHR (성능 로그) / 렌더링 후 DOM
+SOURCE_HTTP = "http"
+SOURCE_BROWSER = "browser"
+SOURCE_RENDERED = "rendered"
+
+# 사이트별 원래 주소와, 재생 때 로컬 서버를 가리키도록 바꿀 환경 변수
+SITE_ORIGINS = {
+    "dungeon": ("DUNGEON_BASE_URL", "/layout/res/home.php"),
+    "earth_star": ("EARTH_STAR_BASE_URL", "/reservation"),
+    "whos_there": ("WHOS_THERE_BASE_SITE", ""),
+    "page_today": ("PAGE_TODAY_SITE_URL", "/"),
+}
+
+
+@dataclass
+class Exchange:
+    """요청 하나(method, path, 파라미터)와 그에 대한 녹화된 응답."""
+
+    method: str
+    path: str
+    params: dict[str, str]
+    status: int
+    content_type: str
+    body_file: str
+    source: str = SOURCE_HTTP
+    # 녹화 당시 응답까지 걸린 시간(초)
+    elapsed: float = 0.0
+
+    def key(self) -> tuple[str, str, tuple[tuple[str, str], ...]]:
+        return request_key(self.method, self.path, self.params)
+
+
+@dataclass
+class Scenario:
+    name: str
+    site: str
+    now_kst: str
+    holidays: list[str] = field(default_factory=list)
+    exchanges: list[Exchange] = field(default_factory=list)
+    # [theme, date, time] 목록. 재생 결과와 비교한다.
+    expected: list[list[str]] | None = None
+    # 녹화 시각, 사이트 소요 시간 등 참고용 정보
+    meta: dict[str, Any] = field(default_factory=dict)
+    directory: str = ""
+
+    @property
+    def now(self) -> datetime:
+        return datetime.fromisoformat(self.now_kst)
+
+    @property
+    def holiday_set(self) -> set[date]:
+        return {date.fromisoformat(value) for value in self.holidays}
+
+    def body(self, exchange: Exchange) -> bytes:
+        with open(os.path.join(self.directory, exchange.body_file), "rb") as fp:
+            return fp.read()
+
+    def save(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        data = {"format": FORMAT_VERSION, **asdict(self)}
+        data.pop("directory")
+        data.pop("name")
+        tmp_path = os.path.join(self.directory, f"{MANIFEST_NAME}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump(data, fp, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, os.path.join(self.directory, MANIFEST_NAME))
+
+
+def request_key(method: str, path: str, params: dict[str, str]) -> tuple[str, str, tuple[tuple[str, str], ...]]:
+    return method.upper(), path, tuple(sorted((str(k), str(v)) for k, v in params.items()))
+
+
+def load_scenario(directory: str) -> Scenario:
+    with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as fp:
+        data = json.load(fp)
+    if data.get("format", FORMAT_VERSION) > FORMAT_VERSION:
+        raise ValueError(f"{directory}: 지원하지 않는 manifest 형식 {data['format']}")
+    return Scenario(
+        name=os.path.basename(os.path.normpath(directory)),
+        site=data["site"],
+        now_kst=data["now_kst"],
+        holidays=list(data.get("holidays") or []),
+        exchanges=[Exchange(**item) for item in data.get("exchanges") or []],
+        expected=data.get("expected"),
+        meta=dict(data.get("meta") or {}),
+        directory=directory,
+    )
+
+
+def find_scenarios(names: list[str], root: str = FIXTURES_DIR) -> list[Scenario]:
+    """이름(또는 디렉터리 경로)으로 시나리오를 찾는다. 비어 있으면 root 아래 전부."""
+    if not names:
+        if not os.path.isdir(root):
+            return []
+        names = sorted(
+            entry for entry in os.listdir(root) if os.path.isfile(os.path.join(root, entry, MANIFEST_NAME))
+        )
+    return [load_scenario(name if os.path.isdir(name) else os.path.join(root, name)) for name in names]
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: ReplayServer
+
+    def _serve(self) -> None:
+        parts = parse.urlsplit(self.path)
+        params = dict(parse.parse_qsl(parts.query, keep_blank_values=True))
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode("utf-8", errors="replace")
+            if "x-www-form-urlencoded" in (self.headers.get("Content-Type") or ""):
+                params.update(parse.parse_qsl(body, keep_blank_values=True))
+
+        found = self.server.lookup(self.command, parts.path, params)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if found is None:
+            status, content_type, payload = 404, "text/plain; charset=utf-8", b"not recorded"
+        else:
+            status, content_type, payload = found
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _serve
+    do_POST = _serve
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """현재 시나리오의 녹화 응답을 (method, path, 파라미터)로 찾아 돌려주는 로컬 HTTP 서버."""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", 0), _ReplayHandler)
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._responses: dict[tuple[str, str, tuple[tuple[str, str], ...]], tuple[int, str, bytes]] = {}
+        self.hits = 0
+        self.misses: list[str] = []
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> ReplayServer:
+        self._thread = threading.Thread(target=self.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def use(self, scenario: Scenario) -> None:
+        responses = {}
+        # 같은 요청이 여러 번 녹화됐으면 처음 것을 쓴다. 렌더링 후 DOM 은 원래 응답이 없을 때만 쓴다.
+        for exchange in sorted(scenario.exchanges, key=lambda e: e.source == SOURCE_RENDERED):
+            responses.setdefault(exchange.key(), (exchange.status, exchange.content_type, scenario.body(exchange)))
+        with self._lock:
+            self._responses = responses
+            self.hits = 0
+            self.misses = []
+
+    def lookup(self, method: str, path: str, params: dict[str, str]) -> tuple[int, str, bytes] | None:
+        with self._lock:
+            found = self._responses.get(request_key(method, path, params))
+            if found is None:
+                self.misses.append(f"{method} {path}?{parse.urlencode(params)}")
+            else:
+                self.hits += 1
+            return found
+
+
+def point_sites_at(base_url: str) -> None:
+    """봇 모듈을 import 하기 전에 불러야 한다. 각 사이트의 기본 주소를 base_url 로 바꾼다."""
+    for env_name, path in SITE_ORIGINS.values():
+        os.environ[env_name] = f"{base_url}{path}"
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from types import ModuleType
+from typing import Callable
+
+import capture
+import dungeon
+import earth_star
+import notifier
+import page_today
+import timings
+import whos_there
+from browser_pool import USER_AGENT, BrowserSession
+from http_pool import KeepAliveClient
+from kr_calendar import build_holiday_set
+from replay_fixtures import FIXTURES_DIR
+from slot_store import SiteScan, SlotStore, diff_messages
+
+# whos_there 테마 오픈 기간(doing)이 기본 7~8일보다 길 수 있어 공휴일은 넉넉한 범위로 만든다.
+HOLIDAY_HORIZON_DAYS = 31
+DEFAULT_SITES = ["earth_star", "whos_there", "dungeon"]
+
+
+@dataclass
+class SharedContext:
+    now_kst: datetime
+    holiday_set: set[date]
+    session: BrowserSession
+    client: KeepAliveClient
+
+
+@dataclass
+class SiteResult:
+    name: str
+    scan: SiteScan | None = None
+    messages: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+    error: str | None = None
+
+
+def _run_earth_star(ctx: SharedContext) -> SiteScan:
+    return earth_star.run(ctx.now_kst, ctx.holiday_set, ctx.session)
+
+
+def _run_whos_there(ctx: SharedContext) -> SiteScan:
+    return whos_there.run(ctx.now_kst, ctx.holiday_set)
+
+
+def _run_dungeon(ctx: SharedContext) -> SiteScan:
+    return dungeon.run(ctx.now_kst, ctx.holiday_set, ctx.session, ctx.client)
+
+
+def _run_page_today(ctx: SharedContext) -> SiteScan:
+    return page_today.run(ctx.session, ctx.client, ctx.now_kst)
+
+
+# 사이트별 메시지 형식(build_messages)과 표시 이름(SITE_LABEL)을 가진 모듈
+SITE_MODULES: dict[str, ModuleType] = {
+    "earth_star": earth_star,
+    "whos_there": whos_there,
+    "dungeon": dungeon,
+    "page_today": page_today,
+}
+SITES: dict[str, Callable[[SharedContext], SiteScan]] = {
+    "earth_star": _run_earth_star,
+    "whos_there": _run_whos_there,
+    "dungeon": _run_dungeon,
+    "page_today": _run_page_today,
+}
+
+
+def capture_origins(names: list[str]) -> dict[str, str]:
+    """녹화 때 응답을 사이트별로 나눌 기준 주소."""
+    origins = {
+        "earth_star": earth_star.BASE_URL,
+        "whos_there": whos_there.BASE_SITE,
+        "dungeon": dungeon.BASE_URL,
+        "page_today": page_today.SITE_URL,
+    }
+    return {name: origins[name] for name in names}
+
+
+def save_capture(recorder: capture.CaptureSession, results: list[SiteResult]) -> None:
+    scans = {
+        result.name: ([[slot.theme, slot.date, slot.time] for slot in result.scan.slots], result.seconds)
+        for result in results
+        if result.scan is not None
+    }
+    for scenario in recorder.save(scans):
+        print(f"📼 녹화 저장: {scenario.directory} ({len(scenario.exchanges)}개 응답)")
+    if recorder.skipped:
+        print(f"📼 다른 호스트 응답 {recorder.skipped}건은 녹화하지 않음")
+
+
+def build_shared_holiday_set(now_kst: datetime) -> set[date]:
+    window = [now_kst.date(), now_kst.date() + timedelta(days=HOLIDAY_HORIZON_DAYS)]
+    return build_holiday_set(window)
+
+
+def run_site(name: str, ctx: SharedContext, result: SiteResult) -> None:
+    started = time.perf_counter()
+    try:
+        with timings.context(name), timings.span(timings.SITE_TOTAL):
+            result.scan = SITES[name](ctx)
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+        print(f"⚠️ [{name}] 실행 실패: {result.error}")
+    finally:
+        result.seconds = time.perf_counter() - started
+
+
+def run_sites(names: list[str], ctx: SharedContext) -> list[SiteResult]:
+    """사이트들을 스레드로 동시에 돌린다. 브라우저 사용 구간은 session.lock 으로 순서가 정해진다."""
+    results = [SiteResult(name=name) for name in names]
+    threads = [
+        threading.Thread(target=run_site, args=(result.name, ctx, result), name=result.name, daemon=True)
+        for result in results
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def collect_messages(results: list[SiteResult], store: SlotStore) -> None:
+    """검사 결과를 상태 저장소에 반영하고, 새로 열린 슬롯에 대한 메시지만 result.messages 에 채운다."""
+    for result in results:
+        if result.scan is None:
+            continue
+        module = SITE_MODULES[result.name]
+        result.messages = diff_messages(store, result.scan, module.build_messages, module.SITE_LABEL)
+
+
+def print_summary(results: list[SiteResult], total_seconds: float, ctx: SharedContext) -> None:
+    print("----- 사이트별 소요 시간 -----")
+    for result in results:
+        status = f"실패 ({result.error})" if result.error else f"알림 {len(result.messages)}건"
+        print(f"⏱️ {result.name:<11} {result.seconds:7.2f}s  {status}")
+    print(f"⏱️ {'total':<11} {total_seconds:7.2f}s")
+    if ctx.session.launch_count:
+        print(ctx.session.report())
+    print(f"🌐 공유 HTTP: {ctx.client.stats()}")
+    telegram = notifier.default_notifier()
+    if telegram.stats.queued:
+        print(telegram.report())
+    print(timings.report(timings.spans()))
+
+
+def send_messages(results: list[SiteResult], wait: bool = True) -> None:
+    with timings.span(timings.NOTIFY, "notifier"):
+        for result in results:
+            for msg in result.messages:
+                notifier.send_telegram(msg)
+        if wait:
+            notifier.flush()
+
+
+def export_timings(items: list[timings.Span], jsonl_path: str, prom_path: str) -> None:
+    """구간 기록을 JSON lines 로 이어 쓰고, 경로가 있으면 Prometheus textfile 도 새로 쓴다."""
+    try:
+        if jsonl_path:
+            timings.write_jsonl(jsonl_path, items)
+        if prom_path:
+            timings.write_prometheus(prom_path, items)
+    except OSError as exc:
+        print(f"⚠️ 구간 기록 저장 실패: {exc}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="여러 예약 사이트 검사를 한 프로세스에서 실행한다.")
+    parser.add_argument(
+        "sites",
+        nargs="*",
+        metavar="SITE",
+        help=f"실행할 사이트 (기본: {' '.join(DEFAULT_SITES)} / 선택: {', '.join(SITES)})",
+    )
+    parser.add_argument(
+        "--capture",
+        nargs="?",
+        const=FIXTURES_DIR,
+        default=None,
+        metavar="DIR",
+        help=f"가져온 페이지/API 응답을 재생용 시나리오로 녹화 (기본 위치: {FIXTURES_DIR})",
+    )
+    parser.add_argument("--timings", default=timings.JSONL_PATH, metavar="PATH", help="구간별 소요 시간 JSON lines 파일")
+    parser.add_argument(
+        "--prometheus", default=timings.PROM_PATH, metavar="PATH", help="Prometheus textfile (.prom) 출력 경로"
+    )
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.sites if name not in SITES]
+    if unknown:
+        parser.error(f"알 수 없는 사이트: {', '.join(unknown)}")
+    names = list(dict.fromkeys(args.sites or DEFAULT_SITES))
+
+    started = time.perf_counter()
+    now_kst = whos_there.get_kst_now()
+    session = BrowserSession(window_size=dungeon.WINDOW_SIZE)
+    client = KeepAliveClient(headers={"User-Agent": USER_AGENT})
+    ctx = SharedContext(
+        now_kst=now_kst,
+        holiday_set=build_shared_holiday_set(now_kst),
+        session=session,
+        client=client,
+    )
+    recorder = None
+    if args.capture is not None:
+        recorder = capture.CaptureSession(capture_origins(names), now_kst, ctx.holiday_set, root=args.capture).start()
+    try:
+        results = run_sites(names, ctx)
+    finally:
+        client.close()
+        session.quit()
+        if recorder is not None:
+            recorder.stop()
+    if recorder is not None:
+        save_capture(recorder, results)
+
+    with SlotStore() as store:
+        collect_messages(results, store)
+    send_messages(results)
+
+    print_summary(results, time.perf_counter() - started, ctx)
+    export_timings(timings.spans(), args.timings, args.prometheus)
+    if any(result.error for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import NamedTuple
+
+BLOCKED = "blocked"
+AVAILABLE = "available"
+NEUTRAL = "neutral"
+# 여러 필드에서 동시에 걸리면 이 순서로 이긴다.
+_PRIORITY = (BLOCKED, AVAILABLE, NEUTRAL)
+
+
+@dataclass(frozen=True)
+class SignalRule:
+    """field(텍스트, class, href 등)에 tokens 중 하나가 부분 문자열로 들어 있으면 verdict."""
+
+    field: str
+    verdict: str
+    tokens: tuple[str, ...]
+
+
+class Verdict(NamedTuple):
+    label: str
+    field: str | None = None
+    token: str | None = None
+
+    @property
+    def blocked(self) -> bool:
+        return self.label == BLOCKED
+
+    @property
+    def available(self) -> bool:
+        return self.label == AVAILABLE
+
+    def describe(self) -> str:
+        return f"{self.label}({self.field}:{self.token})" if self.token else self.label
+
+
+def _compile(tokens: set[str]) -> re.Pattern[str]:
+    # 긴 토큰을 먼저 시도해 디버그용으로 가장 구체적인 토큰이 잡히게 한다.
+    ordered = sorted(tokens, key=lambda t: (-len(t), t))
+    return re.compile("|".join(re.escape(t) for t in ordered), re.IGNORECASE)
+
+
+class KeywordClassifier:
+    """사이트별 키워드 표를 (판정, 필드)마다 정규식 하나로 묶는다. 키워드가 늘어도 필드당 스캔 횟수는 같다."""
+
+    def __init__(self, rules: list[SignalRule], default: str = NEUTRAL) -> None:
+        self.default = default
+        grouped: dict[tuple[str, str], set[str]] = {}
+        for rule in rules:
+            if rule.verdict not in _PRIORITY:
+                raise ValueError(f"알 수 없는 판정: {rule.verdict}")
+            grouped.setdefault((rule.verdict, rule.field), set()).update(t.lower() for t in rule.tokens)
+        self._table: list[tuple[str, str, re.Pattern[str]]] = [
+            (verdict, field, _compile(tokens))
+            for verdict in _PRIORITY
+            for (rule_verdict, field), tokens in grouped.items()
+            if rule_verdict == verdict and tokens
+        ]
+
+    def classify(self, disabled: bool = False, **fields: str) -> Verdict:
+        """disabled 이거나 어느 필드에든 BLOCKED 토큰이 있으면 blocked, 아니면 available > neutral > default."""
+        if disabled:
+            return Verdict(BLOCKED, "disabled", "disabled")
+        for verdict, field, pattern in self._table:
+            value = fields.get(field)
+            if not value:
+                continue
+            match = pattern.search(value)
+            if match:
+                return Verdict(verdict, field, match.group())
+        return Verdict(self.default)
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable
+
+# 슬롯 상태를 기록하는 SQLite 파일
+STORE_PATH = os.environ.get("SLOT_STORE_PATH", os.path.join(".cache", "slots.sqlite3"))
+# 1이면 다시 마감된 슬롯도 알린다.
+NOTIFY_CLOSED = os.environ.get("NOTIFY_CLOSED", "0") == "1"
+KOR_WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS slots (
+    site TEXT NOT NULL,
+    theme TEXT NOT NULL,
+    slot_date TEXT NOT NULL,
+    slot_time TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT '',
+    first_seen TEXT NOT NULL,
+    opened_at TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    closed_at TEXT,
+    PRIMARY KEY (site, theme, slot_date, slot_time)
+);
+CREATE INDEX IF NOT EXISTS slots_opened_at ON slots (opened_at);
+"""
+
+
+@dataclass(frozen=True)
+class Slot:
+    site: str
+    theme: str
+    date: str
+    time: str
+    # 메시지 표시용(휴일/평일 등). 슬롯 식별에는 쓰지 않는다.
+    kind: str = field(default="", compare=False)
+
+    @property
+    def day_name(self) -> str:
+        return KOR_WEEKDAYS[datetime.strptime(self.date, "%Y-%m-%d").weekday()]
+
+
+@dataclass
+class SiteScan:
+    """한 사이트를 한 번 검사한 결과. checked 는 실제로 확인이 끝난 (theme, date) 범위."""
+
+    site: str
+    slots: list[Slot] = field(default_factory=list)
+    checked: set[tuple[str, str]] = field(default_factory=set)
+
+    def add(self, theme: str, target_date: str, times: list[str], kind: str = "") -> None:
+        self.checked.add((theme, target_date))
+        self.slots.extend(Slot(self.site, theme, target_date, t, kind) for t in times)
+
+    def to_dict(self) -> dict[str, object]:
+        """다른 프로세스로 넘기기 위한 JSON 형태. (orchestrate.py)"""
+        return {
+            "site": self.site,
+            "slots": [[s.theme, s.date, s.time, s.kind] for s in self.slots],
+            "checked": sorted([theme, d] for theme, d in self.checked),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, object]) -> SiteScan:
+        site = str(data["site"])
+        return cls(
+            site=site,
+            slots=[Slot(site, theme, d, t, kind) for theme, d, t, kind in data.get("slots") or []],
+            checked={(theme, d) for theme, d in data.get("checked") or []},
+        )
+
+
+@dataclass
+class SlotDiff:
+    opened: list[Slot] = field(default_factory=list)
+    closed: list[Slot] = field(default_factory=list)
+    still_open: list[Slot] = field(default_factory=list)
+
+
+@dataclass
+class SlotRecord:
+    slot: Slot
+    first_seen: str
+    opened_at: str
+    last_seen: str
+    closed_at: str | None
+
+
+def _slot_order(slot: Slot) -> tuple[str, str, str]:
+    return slot.theme, slot.date, slot.time
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat(timespec="seconds")
+
+
+class SlotStore:
+    """(site, theme, date, time) 별로 처음/마지막으로 본 시각을 기록하고 새로 열린 슬롯만 골라낸다."""
+
+    def __init__(self, path: str = STORE_PATH) -> None:
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> SlotStore:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def sync(self, scan: SiteScan, now: str | None = None) -> SlotDiff:
+        """이번 검사 결과를 반영한다. checked 범위 안에서 사라진 슬롯만 마감으로 본다."""
+        now = now or _now()
+        current = {slot: slot for slot in scan.slots}
+        diff = SlotDiff()
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT theme, slot_date, slot_time, kind, closed_at FROM slots WHERE site = ?",
+                (scan.site,),
+            ).fetchall()
+            known = {Slot(scan.site, theme, d, t, kind): closed_at for theme, d, t, kind, closed_at in rows}
+
+            for slot in current:
+                if slot not in known:
+                    self._conn.execute(
+                        "INSERT INTO slots (site, theme, slot_date, slot_time, kind, first_seen, opened_at, last_seen)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (slot.site, slot.theme, slot.date, slot.time, slot.kind, now, now, now),
+                    )
+                    diff.opened.append(slot)
+                elif known[slot] is not None:
+                    self._conn.execute(
+                        "UPDATE slots SET opened_at = ?, last_seen = ?, closed_at = NULL, kind = ?"
+                        " WHERE site = ? AND theme = ? AND slot_date = ? AND slot_time = ?",
+                        (now, now, slot.kind, slot.site, slot.theme, slot.date, slot.time),
+                    )
+                    diff.opened.append(slot)
+                else:
+                    self._conn.execute(
+                        "UPDATE slots SET last_seen = ?"
+                        " WHERE site = ? AND theme = ? AND slot_date = ? AND slot_time = ?",
+                        (now, slot.site, slot.theme, slot.date, slot.time),
+                    )
+                    diff.still_open.append(slot)
+
+            for slot, closed_at in known.items():
+                if closed_at is not None or slot in current or (slot.theme, slot.date) not in scan.checked:
+                    continue
+                self._conn.execute(
+                    "UPDATE slots SET closed_at = ?"
+                    " WHERE site = ? AND theme = ? AND slot_date = ? AND slot_time = ?",
+                    (now, slot.site, slot.theme, slot.date, slot.time),
+                )
+                diff.closed.append(slot)
+
+        diff.opened.sort(key=_slot_order)
+        diff.closed.sort(key=_slot_order)
+        diff.still_open.sort(key=_slot_order)
+        return diff
+
+    def recent_openings(self, hours: float = 24, site: str | None = None, limit: int = 100) -> list[SlotRecord]:
+        """최근 hours 시간 안에 열린(다시 열린 포함) 슬롯을 최신순으로 돌려준다."""
+        since = (datetime.utcnow() - timedelta(hours=hours)).isoformat(timespec="seconds")
+        query = (
+            "SELECT site, theme, slot_date, slot_time, kind, first_seen, opened_at, last_seen, closed_at"
+            " FROM slots WHERE opened_at >= ?"
+        )
+        params: list[object] = [since]
+        if site:
+            query += " AND site = ?"
+            params.append(site)
+        query += " ORDER BY opened_at DESC, site, theme, slot_date, slot_time LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            SlotRecord(
+                slot=Slot(site_, theme, d, t, kind),
+                first_seen=first_seen,
+                opened_at=opened_at,
+                last_seen=last_seen,
+                closed_at=closed_at,
+            )
+            for site_, theme, d, t, kind, first_seen, opened_at, last_seen, closed_at in rows
+        ]
+
+
+def format_closed(site_label: str, slots: list[Slot]) -> str:
+    lines = []
+    for slot in slots:
+        parts = [slot.theme, f"{slot.date}({slot.day_name})", slot.time]
+        lines.append("- " + " ".join(part for part in parts if part))
+    return f"🔒 [{site_label} 마감]\n" + "\n".join(lines)
+
+
+def diff_messages(
+    store: SlotStore,
+    scan: SiteScan,
+    build_messages: Callable[[list[Slot]], list[str]],
+    site_label: str,
+) -> list[str]:
+    """검사 결과를 저장소에 반영하고, 새로 열린 슬롯(및 선택적으로 마감된 슬롯)에 대한 메시지만 만든다."""
+    diff = store.sync(scan)
+    if diff.still_open:
+        print(f"ℹ️ [{scan.site}] 이미 알린 슬롯 {len(diff.still_open)}건은 다시 보내지 않습니다.")
+    messages = build_messages(diff.opened) if diff.opened else []
+    if NOTIFY_CLOSED and diff.closed:
+        messages.append(format_closed(site_label, diff.closed))
+    return messages
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="슬롯 상태 저장소 조회")
+    parser.add_argument("--hours", type=float, default=24, help="최근 몇 시간 안에 열린 슬롯을 볼지")
+    parser.add_argument("--site", default=None)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    with SlotStore() as store:
+        records = store.recent_openings(args.hours, args.site, args.limit)
+    if not records:
+        print(f"최근 {args.hours:g}시간 동안 열린 슬롯 없음")
+        return
+    for record in records:
+        slot = record.slot
+        state = f"마감 {record.closed_at}" if record.closed_at else f"열림 (마지막 확인 {record.last_seen})"
+        print(f"{record.opened_at}  {slot.site:<11} {slot.theme} {slot.date}({slot.day_name}) {slot.time}  {state}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Iterable, NamedTuple
+
+# 토큰 종류. extract_time 은 이 순서대로 우선한다. (예전 패턴별 re.search 순서와 같다)
+COLON = "colon"  # 18:30
+HOUR_MINUTE = "hour_minute"  # 18시 30분 / 18시30
+HOUR = "hour"  # 18시
+COMPACT = "compact"  # 1830
+KIND_PRIORITY = {COLON: 0, HOUR_MINUTE: 1, HOUR: 2, COMPACT: 3}
+
+# 네 가지 표기를 한 번에 훑는 패턴. 분이 없는 'N시' 는 HOUR 로 분류한다.
+TIME_PATTERN = re.compile(
+    r"\b(?P<ch>[01]?\d|2[0-3]):(?P<cm>[0-5]\d)\b"
+    r"|\b(?P<kh>[01]?\d|2[0-3])\s*시"
+    r"(?:\s*(?P<km>[0-5]?\d)(?!(?<=\s\d):[0-5]\d\b)(?!(?<=\s[01]\d|\s2[0-3]):[0-5]\d\b)\s*분?)?\b"
+    r"|\b(?P<nh>[01]\d|2[0-3])(?P<nm>[0-5]\d)\b"
+)
+# 분 자리 뒤의 부정 전방탐색은 "9시 6:10" 에서 6 을 분으로 먹어 뒤의 HH:MM 을 놓치지 않게 한다.
+# 배치 파싱 때 텍스트 사이에 넣는 구분자. 공백/단어 문자가 아니라서 패턴이 텍스트 경계를 넘지 않는다.
+_BATCH_SEPARATOR = "\x00"
+
+
+class TimeToken(NamedTuple):
+    value: str
+    kind: str
+    start: int
+    raw: str
+
+
+# 같은 표기는 페이지마다 반복되므로 정규화 결과를 원문 기준으로 재사용한다.
+_NORMALIZED: dict[str, tuple[str, str]] = {}
+_NORMALIZED_LIMIT = 4096
+
+
+def _normalize(match: re.Match[str]) -> tuple[str, str]:
+    # lastgroup 은 마지막으로 잡힌 그룹 이름이라 어떤 표기인지 바로 알 수 있다.
+    group = match.lastgroup
+    if group == "cm":
+        return f"{int(match.group('ch')):02d}:{match.group('cm')}", COLON
+    if group == "km":
+        return f"{int(match.group('kh')):02d}:{int(match.group('km')):02d}", HOUR_MINUTE
+    if group == "kh":
+        return f"{int(match.group('kh')):02d}:00", HOUR
+    return f"{match.group('nh')}:{match.group('nm')}", COMPACT
+
+
+def _to_token(match: re.Match[str], offset: int = 0) -> TimeToken:
+    raw = match.group()
+    normalized = _NORMALIZED.get(raw)
+    if normalized is None:
+        if len(_NORMALIZED) >= _NORMALIZED_LIMIT:
+            _NORMALIZED.clear()
+        normalized = _NORMALIZED[raw] = _normalize(match)
+    return TimeToken(normalized[0], normalized[1], match.start() - offset, raw)
+
+
+def tokenize(text: str) -> list[TimeToken]:
+    """text 에 나온 시간 표기를 나온 순서대로 모두 돌려준다."""
+    return [_to_token(match) for match in TIME_PATTERN.finditer(text)]
+
+
+def tokenize_many(texts: Iterable[str]) -> list[list[TimeToken]]:
+    """여러 텍스트(DOM 스냅샷 전체 등)를 한 번의 스캔으로 처리한다. 결과는 texts 와 같은 순서."""
+    texts = list(texts)
+    result: list[list[TimeToken]] = [[] for _ in texts]
+    if not texts:
+        return result
+    joined = _BATCH_SEPARATOR.join(texts)
+    if joined.count(_BATCH_SEPARATOR) != len(texts) - 1:
+        texts = [text.replace(_BATCH_SEPARATOR, " ") for text in texts]
+        joined = _BATCH_SEPARATOR.join(texts)
+
+    offsets = list(accumulate((len(text) + len(_BATCH_SEPARATOR) for text in texts), initial=0))
+    for match in TIME_PATTERN.finditer(joined):
+        index = bisect_right(offsets, match.start()) - 1
+        result[index].append(_to_token(match, offsets[index]))
+    return result
+
+
+def first_time(tokens: list[TimeToken]) -> str | None:
+    """우선순위(HH:MM > N시 M분 > N시 > HHMM)가 가장 높은 종류 중 처음 나온 시간."""
+    best: TimeToken | None = None
+    for token in tokens:
+        if best is None or KIND_PRIORITY[token.kind] < KIND_PRIORITY[best.kind]:
+            best = token
+            if token.kind == COLON:
+                break
+    return best.value if best else None
+
+
+def colon_times(tokens: list[TimeToken]) -> list[str]:
+    """HH:MM 표기만 중복 없이 나온 순서대로."""
+    return list(dict.fromkeys(token.value for token in tokens if token.kind == COLON))
+
+
+def extract_time(text: str) -> str | None:
+    return first_time(tokenize(text))
+
+
+def extract_times(text: str) -> list[str]:
+    return colon_times(tokenize(text))
+
+
+def has_time(text: str) -> bool:
+    return any(token.kind == COLON for token in tokenize(text))
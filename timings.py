@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Iterator
+
+# 실행이 끝나면 여기에 구간 기록을 쓴다. (비어 있으면 쓰지 않는다, run_bots.py 인자로도 지정 가능)
+JSONL_PATH = os.environ.get("TIMINGS_JSONL", "")
+PROM_PATH = os.environ.get("TIMINGS_PROM", "")
+METRIC_PREFIX = "reservation_bot"
+# 구간 길이 분포용 버킷(초). 빠른 API 호출부터 10분 실행 예산까지 덮는다.
+HISTOGRAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# 구간 이름. 사이트마다 쓰는 것만 남는다.
+DRIVER_RESOLVE = "driver_resolve"
+DRIVER_LAUNCH = "driver_launch"
+NAVIGATION = "navigation"
+READY_WAIT = "ready_wait"
+HTTP_FETCH = "http_fetch"
+COLLECT = "collect"
+EXTRACT = "extract"
+CLASSIFY = "classify"
+API = "api"
+NOTIFY = "notify"
+# 날짜 하나를 확인하는 전체 시간 (날짜별 히스토그램)
+DATE = "date"
+# 사이트 하나를 끝까지 도는 전체 시간
+SITE_TOTAL = "total"
+
+
+@dataclass
+class Span:
+    site: str
+    phase: str
+    seconds: float
+    date: str | None = None
+    ok: bool = True
+    # 구간 시작 시각 (unix time)
+    started_at: float = 0.0
+
+
+# watch.py 처럼 오래 도는 프로세스에서도 메모리가 늘지 않도록 최근 기록만 남긴다.
+_SPANS: deque[Span] = deque(maxlen=20000)
+_SPANS_LOCK = threading.Lock()
+# 스레드마다 지금 어느 사이트/날짜를 보고 있는지. 브라우저/준비 대기처럼 사이트를 모르는 코드가 쓴다.
+_CONTEXT = threading.local()
+
+
+@contextmanager
+def context(site: str, date: str | None = None) -> Iterator[None]:
+    """이 스레드에서 기록하는 구간의 기본 사이트/날짜를 정한다. 날짜만 바꿀 때는 site 를 그대로 넘긴다."""
+    previous = (getattr(_CONTEXT, "site", None), getattr(_CONTEXT, "date", None))
+    _CONTEXT.site, _CONTEXT.date = site, date
+    try:
+        yield
+    finally:
+        _CONTEXT.site, _CONTEXT.date = previous
+
+
+def record(
+    phase: str,
+    seconds: float,
+    site: str | None = None,
+    date: str | None = None,
+    ok: bool = True,
+    started_at: float | None = None,
+) -> None:
+    span = Span(
+        site=site or getattr(_CONTEXT, "site", None) or "-",
+        phase=phase,
+        seconds=seconds,
+        date=date or getattr(_CONTEXT, "date", None),
+        ok=ok,
+        started_at=time.time() - seconds if started_at is None else started_at,
+    )
+    with _SPANS_LOCK:
+        _SPANS.append(span)
+
+
+@contextmanager
+def span(phase: str, site: str | None = None, date: str | None = None) -> Iterator[None]:
+    """with 블록의 소요 시간을 기록한다. 예외로 빠져나오면 ok=False."""
+    started_at = time.time()
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        record(phase, time.perf_counter() - started, site, date, ok, started_at)
+
+
+def spans() -> list[Span]:
+    with _SPANS_LOCK:
+        return list(_SPANS)
+
+
+def take() -> list[Span]:
+    """지금까지의 기록을 돌려주고 비운다. (watch.py 처럼 회차마다 내보낼 때)"""
+    with _SPANS_LOCK:
+        current = list(_SPANS)
+        _SPANS.clear()
+    return current
+
+
+def write_jsonl(path: str, items: list[Span], run_id: str | None = None) -> None:
+    """구간 하나당 JSON 한 줄로 이어 쓴다. run 으로 같은 실행의 줄을 묶는다."""
+    run_id = run_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as fp:
+        for item in items:
+            fp.write(json.dumps({"run": run_id, **asdict(item)}, ensure_ascii=False) + "\n")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram(name: str, help_text: str, groups: dict[tuple[tuple[str, str], ...], list[float]]) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, values in sorted(groups.items()):
+        label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+        for bucket in HISTOGRAM_BUCKETS:
+            count = sum(1 for value in values if value <= bucket)
+            lines.append(f'{name}_bucket{{{label_text},le="{bucket:g}"}} {count}')
+        lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {len(values)}')
+        lines.append(f"{name}_sum{{{label_text}}} {sum(values):.6f}")
+        lines.append(f"{name}_count{{{label_text}}} {len(values)}")
+    return lines
+
+
+def render_prometheus(items: list[Span]) -> str:
+    """node_exporter textfile collector 형식. 사이트×구간, 사이트×날짜 히스토그램과 실패 수."""
+    by_phase: dict[tuple[tuple[str, str], ...], list[float]] = {}
+    by_date: dict[tuple[tuple[str, str], ...], list[float]] = {}
+    failures: dict[tuple[str, str], int] = {}
+    for item in items:
+        by_phase.setdefault((("site", item.site), ("phase", item.phase)), []).append(item.seconds)
+        if item.phase == DATE and item.date:
+            by_date.setdefault((("site", item.site), ("date", item.date)), []).append(item.seconds)
+        if not item.ok:
+            failures[(item.site, item.phase)] = failures.get((item.site, item.phase), 0) + 1
+
+    lines = _histogram(f"{METRIC_PREFIX}_phase_seconds", "Time spent per bot phase.", by_phase)
+    lines += _histogram(f"{METRIC_PREFIX}_date_seconds", "Time spent checking one date.", by_date)
+    name = f"{METRIC_PREFIX}_phase_failures_total"
+    lines += [f"# HELP {name} Phases that ended with an exception.", f"# TYPE {name} counter"]
+    for (site, phase), count in sorted(failures.items()):
+        lines.append(f'{name}{{site="{_escape(site)}",phase="{_escape(phase)}"}} {count}')
+    name = f"{METRIC_PREFIX}_last_run_timestamp_seconds"
+    lines += [f"# HELP {name} When these timings were written.", f"# TYPE {name} gauge", f"{name} {time.time():.0f}"]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str, items: list[Span]) -> None:
+    # collector 가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓰고 바꿔 끼운다.
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fp:
+        fp.write(render_prometheus(items))
+    os.replace(tmp_path, path)
+
+
+def report(items: list[Span]) -> str:
+    """사이트별로 시간이 많이 든 구간 순서대로 합계를 보여 준다."""
+    totals: dict[str, dict[str, tuple[int, float]]] = {}
+    for item in items:
+        if item.phase in (DATE, SITE_TOTAL):
+            continue
+        count, seconds = totals.setdefault(item.site, {}).get(item.phase, (0, 0.0))
+        totals[item.site][item.phase] = (count + 1, seconds + item.seconds)
+    if not totals:
+        return "⏱️ 구간 기록 없음"
+    lines = ["----- 구간별 소요 시간 -----"]
+    for site, phases in sorted(totals.items()):
+        ordered = sorted(phases.items(), key=lambda kv: -kv[1][1])
+        parts = [f"{phase} {seconds:.2f}s/{count}회" for phase, (count, seconds) in ordered]
+        lines.append(f"⏱️ {site:<11} " + " | ".join(parts))
+    return "\n".join(lines)
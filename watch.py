@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import argparse
+import signal
+import threading
+import time
+from datetime import date
+
+import dungeon
+import notifier
+import timings
+import whos_there
+from browser_pool import USER_AGENT, BrowserSession
+from http_pool import KeepAliveClient
+from run_bots import (
+    DEFAULT_SITES,
+    SITES,
+    SharedContext,
+    build_shared_holiday_set,
+    collect_messages,
+    export_timings,
+    print_summary,
+    run_sites,
+    send_messages,
+)
+from slot_store import SlotStore
+
+# 사이트별 기본 폴링 간격(초). 브라우저를 쓰는 사이트는 더 길게 잡는다.
+DEFAULT_INTERVALS = {
+    "whos_there": 60,
+    "dungeon": 60,
+    "earth_star": 180,
+    "page_today": 180,
+}
+
+
+def parse_intervals(values: list[str]) -> dict[str, float]:
+    intervals = dict(DEFAULT_INTERVALS)
+    for value in values:
+        name, _, seconds = value.partition("=")
+        if name not in SITES or not seconds:
+            raise ValueError(f"잘못된 간격 지정: {value} (예: dungeon=30)")
+        intervals[name] = max(5.0, float(seconds))
+    return intervals
+
+
+class Watcher:
+    """브라우저/HTTP 연결을 켜 둔 채로 사이트마다 정해진 간격으로 검사를 반복한다."""
+
+    def __init__(
+        self,
+        names: list[str],
+        intervals: dict[str, float],
+        timings_path: str = timings.JSONL_PATH,
+        prometheus_path: str = timings.PROM_PATH,
+    ) -> None:
+        self.names = names
+        self.intervals = intervals
+        self.timings_path = timings_path
+        self.prometheus_path = prometheus_path
+        self.session = BrowserSession(window_size=dungeon.WINDOW_SIZE)
+        self.client = KeepAliveClient(headers={"User-Agent": USER_AGENT})
+        # 이미 알린 슬롯은 다시 보내지 않도록 상태 저장소를 계속 열어 둔다.
+        self.store = SlotStore()
+        self.stop_event = threading.Event()
+        self._holiday_key: date | None = None
+        self._holiday_set: set[date] = set()
+
+    def _context(self) -> SharedContext:
+        now_kst = whos_there.get_kst_now()
+        # 검사 기간은 run() 이 매번 현재 KST 로 다시 계산하고, 공휴일 집합은 날짜가 바뀔 때만 새로 만든다.
+        if self._holiday_key != now_kst.date():
+            self._holiday_set = build_shared_holiday_set(now_kst)
+            self._holiday_key = now_kst.date()
+        return SharedContext(now_kst=now_kst, holiday_set=self._holiday_set, session=self.session, client=self.client)
+
+    def poll(self, names: list[str]) -> None:
+        started = time.perf_counter()
+        ctx = self._context()
+        results = run_sites(names, ctx)
+        for result in results:
+            if result.error and self.session.launch_count and not self.session.is_alive():
+                # 드라이버가 죽었으면 프로세스는 그대로 두고 다음 폴링에서 새로 띄운다.
+                self.session.restart(f"{result.name} 실행 중 브라우저 종료")
+        collect_messages(results, self.store)
+        send_messages(results, wait=False)
+        print_summary(results, time.perf_counter() - started, ctx)
+        # 회차마다 기록을 비워 내보낸다. textfile 은 마지막 회차 기준이다.
+        export_timings(timings.take(), self.timings_path, self.prometheus_path)
+
+    def run_forever(self, max_runtime: float | None = None) -> None:
+        deadline = time.monotonic() + max_runtime if max_runtime else None
+        next_due = {name: time.monotonic() for name in self.names}
+        print(
+            "👀 감시 시작: "
+            + ", ".join(f"{name}({self.intervals[name]:.0f}s)" for name in self.names)
+        )
+        try:
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    break
+                due = [name for name in self.names if next_due[name] <= now]
+                if due:
+                    self.poll(due)
+                    finished = time.monotonic()
+                    for name in due:
+                        next_due[name] = finished + self.intervals[name]
+                wait = min(next_due.values()) - time.monotonic()
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                if wait > 0:
+                    self.stop_event.wait(wait)
+        finally:
+            self.client.close()
+            self.session.quit()
+            self.store.close()
+            notifier.default_notifier().close()
+            print("👋 감시 종료")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="브라우저/연결을 유지한 채 사이트를 주기적으로 검사한다.")
+    parser.add_argument("sites", nargs="*", metavar="SITE", help=f"감시할 사이트 (기본: {' '.join(DEFAULT_SITES)})")
+    parser.add_argument(
+        "--interval",
+        action="append",
+        default=[],
+        metavar="SITE=SECONDS",
+        help="사이트별 폴링 간격 (여러 번 지정 가능)",
+    )
+    parser.add_argument("--max-runtime", type=float, default=None, help="지정한 초가 지나면 종료")
+    parser.add_argument("--timings", default=timings.JSONL_PATH, metavar="PATH", help="구간별 소요 시간 JSON lines 파일")
+    parser.add_argument(
+        "--prometheus", default=timings.PROM_PATH, metavar="PATH", help="Prometheus textfile (.prom) 출력 경로"
+    )
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.sites if name not in SITES]
+    if unknown:
+        parser.error(f"알 수 없는 사이트: {', '.join(unknown)}")
+    try:
+        intervals = parse_intervals(args.interval)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    watcher = Watcher(list(dict.fromkeys(args.sites or DEFAULT_SITES)), intervals, args.timings, args.prometheus)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: watcher.stop_event.set())
+    watcher.run_forever(args.max_runtime)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field, replace
+from datetime import date
+from typing import Callable, Hashable, Iterable
+
+# 감시 대상 목록(watchlist)과 요청 계획.
+#
+# watchlist.json 예시 (사이트가 목록에 없으면 그 사이트 모듈의 기본 대상을 쓴다)::
+#
+#     {
+#       "targets": [
+#         {"site": "dungeon", "branch": 9, "theme": "향", "holiday": ["11:30-20:30"]},
+#         {"site": "dungeon", "branch": 9, "theme": "다른테마", "holiday": ["-23:59"], "weekday": ["20:30"]},
+#         {"site": "earth_star", "branch": 2, "theme": 25, "weekday": ["18:30-22:30"], "holiday": ["-22:30"]},
+#         {"site": "whos_there", "branch": 23, "theme": "괴록", "theme_num": 70, "theme_info_num": 61,
+#          "weekday": ["18:30-22:30"], "holiday": ["-22:30"], "weekdays": ["금", "토", "일"]}
+#       ]
+#     }
+#
+# - weekday / holiday: 평일·휴일(주말, 공휴일) 각각 알릴 시간 구간. "HH:MM-HH:MM" (양끝 포함), "-HH:MM", "HH:MM-", "HH:MM".
+#   비어 있는 쪽 날짜는 아예 조회하지 않는다.
+# - weekdays: 이 요일만 본다. (선택)
+# - name: 슬롯 저장소/메시지에 쓸 이름. 없으면 사이트가 정한다.
+# - 그 밖의 키(index, theme_num 등)는 사이트별 값으로 params 에 들어간다.
+WATCHLIST_PATH = os.environ.get("WATCHLIST_PATH", "watchlist.json")
+KOR_WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+_TARGET_KEYS = {"site", "theme", "branch", "name", "weekday", "holiday", "weekdays"}
+
+
+def to_minutes(hhmm: str) -> int:
+    hour, minute = hhmm.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+@dataclass(frozen=True)
+class TimeWindow:
+    start: int = 0
+    end: int = 24 * 60 - 1
+
+    @classmethod
+    def parse(cls, text: str) -> TimeWindow:
+        start, sep, end = text.strip().partition("-")
+        if not sep:
+            return cls(to_minutes(start), to_minutes(start))
+        return cls(to_minutes(start) if start else 0, to_minutes(end) if end else 24 * 60 - 1)
+
+    def contains(self, slot_time: str) -> bool:
+        return self.start <= to_minutes(slot_time) <= self.end
+
+
+@dataclass(frozen=True)
+class Target:
+    """감시 대상 하나. 같은 페이지/API 로 확인할 수 있는 대상끼리는 planner 가 요청을 합친다."""
+
+    site: str
+    theme: str
+    branch: str = ""
+    name: str = ""
+    weekday: tuple[TimeWindow, ...] = ()
+    holiday: tuple[TimeWindow, ...] = ()
+    weekdays: tuple[str, ...] = ()
+    params: dict[str, object] = field(default_factory=dict, compare=False, hash=False)
+
+    def windows(self, is_holiday: bool) -> tuple[TimeWindow, ...]:
+        return self.holiday if is_holiday else self.weekday
+
+    def wants(self, target: date, is_holiday: bool) -> bool:
+        if self.weekdays and KOR_WEEKDAYS[target.weekday()] not in self.weekdays:
+            return False
+        return bool(self.windows(is_holiday))
+
+    def allows(self, slot_time: str, is_holiday: bool) -> bool:
+        return any(window.contains(slot_time) for window in self.windows(is_holiday))
+
+    def param(self, name: str, default: object = None) -> object:
+        return self.params.get(name, default)
+
+
+def make_target(data: dict[str, object]) -> Target:
+    """watchlist.json 항목(또는 사이트 기본값)을 Target 으로 바꾼다."""
+    try:
+        site, theme = str(data["site"]), str(data["theme"])
+    except KeyError as exc:
+        raise ValueError(f"watchlist 항목에 {exc.args[0]} 가 없습니다: {data}") from None
+    unknown_days = [day for day in data.get("weekdays") or [] if day not in KOR_WEEKDAYS]
+    if unknown_days:
+        raise ValueError(f"알 수 없는 요일: {unknown_days} (월~일)")
+    try:
+        weekday = tuple(TimeWindow.parse(text) for text in data.get("weekday") or [])
+        holiday = tuple(TimeWindow.parse(text) for text in data.get("holiday") or [])
+    except ValueError:
+        raise ValueError(f"시간 구간 형식 오류 (HH:MM-HH:MM): {data}") from None
+    return Target(
+        site=site,
+        theme=theme,
+        branch=str(data.get("branch") or ""),
+        name=str(data.get("name") or ""),
+        weekday=weekday,
+        holiday=holiday,
+        weekdays=tuple(data.get("weekdays") or ()),
+        params={key: value for key, value in data.items() if key not in _TARGET_KEYS},
+    )
+
+
+def load_watchlist(path: str = WATCHLIST_PATH) -> dict[str, list[Target]]:
+    """사이트별 대상 목록. 파일이 없으면 빈 dict (모든 사이트가 기본 대상을 쓴다)."""
+    try:
+        with open(path, encoding="utf-8") as fp:
+            data = json.load(fp)
+    except FileNotFoundError:
+        return {}
+    targets: dict[str, list[Target]] = {}
+    for item in data.get("targets") or []:
+        target = make_target(item)
+        targets.setdefault(target.site, []).append(target)
+    return targets
+
+
+_LOADED: dict[str, list[Target]] | None = None
+
+
+def targets_for(
+    site: str, defaults: list[dict[str, object]], default_name: Callable[[Target], str]
+) -> list[Target]:
+    """watchlist 에 이 사이트 항목이 있으면 그것을, 없으면 사이트 모듈의 기본 대상을 돌려준다.
+
+    name 이 없는 대상은 default_name 으로 채운다. (슬롯 저장소의 theme 값이므로 바꾸면 새 슬롯으로 본다)
+    """
+    global _LOADED
+    if _LOADED is None:
+        _LOADED = load_watchlist()
+    if site in _LOADED:
+        targets = _LOADED[site]
+    else:
+        targets = [make_target({"site": site, **item}) for item in defaults]
+    return [target if target.name else replace(target, name=default_name(target)) for target in targets]
+
+
+@dataclass
+class Fetch:
+    """한 번의 페이지 로드/API 호출. targets 는 그 응답 하나로 판정하는 감시 대상들."""
+
+    unit: Hashable
+    date: date
+    is_holiday: bool
+    targets: list[Target]
+
+    @property
+    def label(self) -> str:
+        return self.date.strftime("%Y-%m-%d")
+
+    def allows(self, slot_time: str) -> bool:
+        # 페이지에서 읽을 때 쓰는 합집합 필터. 대상별 판정은 split 에서 다시 한다.
+        return any(target.allows(slot_time, self.is_holiday) for target in self.targets)
+
+    def split(self, times: Iterable[str]) -> dict[Target, list[str]]:
+        times = sorted(set(times))
+        return {target: [t for t in times if target.allows(t, self.is_holiday)] for target in self.targets}
+
+
+def group_targets(targets: list[Target], unit: Callable[[Target], Hashable]) -> dict[Hashable, list[Target]]:
+    """같은 요청으로 확인할 수 있는 대상끼리 묶는다. (순서 유지)"""
+    groups: dict[Hashable, list[Target]] = {}
+    for target in targets:
+        groups.setdefault(unit(target), []).append(target)
+    return groups
+
+
+def plan_fetches(
+    targets: list[Target],
+    dates: list[date],
+    is_holiday: Callable[[date], bool],
+    unit: Callable[[Target], Hashable],
+) -> list[Fetch]:
+    """(요청 단위, 날짜) 마다 한 번만 요청하고, 그 날짜를 원하는 대상이 없으면 요청하지 않는다."""
+    fetches = []
+    for key, group in group_targets(targets, unit).items():
+        for target_date in dates:
+            holiday = is_holiday(target_date)
+            wanted = [target for target in group if target.wants(target_date, holiday)]
+            if wanted:
+                fetches.append(Fetch(key, target_date, holiday, wanted))
+    return fetches
+
+
+def describe_plan(site: str, targets: list[Target], fetches: list[Fetch]) -> str:
+    separate = sum(len(fetch.targets) for fetch in fetches)
+    return f"🗂️ [{site}] 감시 대상 {len(targets)}개 -> 요청 {len(fetches)}회 (대상마다 따로면 {separate}회)"
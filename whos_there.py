@@ -3,17 +3,25 @@ from __future__ import annotations
 import json
 import os
 import ssl
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
-from typing import Any
-from urllib import parse, request
-
-try:
-    import holidays
-except ImportError:
-    holidays = None
-
-BASE_SITE = "https://www.keyescape.com"
+from typing import Any, Callable
+from urllib import error, parse
+
+import timings
+import watchlist
+from http_pool import KeepAliveClient
+from kr_calendar import build_holiday_set
+from notifier import flush, send_telegram
+from slot_store import SiteScan, Slot, SlotStore, diff_messages
+from watchlist import Target
+
+SITE_NAME = "whos_there"
+SITE_LABEL = "후즈데어"
+# 녹화한 API 응답으로 재생할 때는 로컬 서버 주소로 바꾼다. (bench_replay.py)
+BASE_SITE = os.environ.get("WHOS_THERE_BASE_SITE", "https://www.keyescape.com").rstrip("/")
 API_URL = f"{BASE_SITE}/controller/run_proc.php"
 OPEN_HOUR_KST = 22
 THEME_RESERVATION_OPEN_HOUR_KST = 11
@@ -23,10 +31,26 @@ WEEKDAY_END = "22:30"
 HOLIDAY_END = "22:30"
 KOR_WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
 
-TELEGRAM_TOKEN = os.environ.get("MY_ALARM_TOKEN")
-TELEGRAM_CHAT_ID = os.environ.get("MY_CHAT_ID")
 DEBUG = os.environ.get("DEBUG_SLOT", "0") == "1"
 AVAILABLE_ENABLE_VALUES = {"Y", "1", "TRUE", "T"}
+# 테마×날짜 조회 동시 실행 수 (keyescape 호스트당 동시 연결 상한도 같은 값). 1이면 순차 실행.
+MAX_CONCURRENCY = max(1, int(os.environ.get("WHOS_THERE_CONCURRENCY", "6")))
+API_TIMEOUT = 15
+API_HEADERS = {
+    "Referer": f"{BASE_SITE}/reservation1.php",
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/121.0.0.0 Safari/537.36"
+    ),
+}
+
+# run_proc.php 호출은 이 풀을 통해 keep-alive 연결과 TLS 세션을 재사용한다.
+_API_CLIENT = KeepAliveClient(headers=API_HEADERS, timeout=API_TIMEOUT, max_per_host=MAX_CONCURRENCY)
+_INSECURE_API_CLIENT: KeepAliveClient | None = None
+_INSECURE_LOCK = threading.Lock()
+# 테마/날짜 위치별로 성공한 endDay 값을 기억해 두는 파일
+END_DAY_CACHE_PATH = os.environ.get("WHOS_THERE_ENDDAY_CACHE", os.path.join(".cache", "whos_there_endday.json"))
 
 
 @dataclass(frozen=True)
@@ -37,12 +61,76 @@ class Theme:
     theme_info_num: int
 
 
-THEMES = [
-    Theme(name="아야코", zizum_num=23, theme_num=71, theme_info_num=63),
-    Theme(name="괴록", zizum_num=23, theme_num=70, theme_info_num=61),
+# 기본 감시 대상 (watchlist.json 에 whos_there 항목이 없을 때). 평일 18:30~22:30, 휴일 22:30 이하.
+DEFAULT_TARGETS: list[dict[str, object]] = [
+    {
+        "branch": 23,
+        "theme": name,
+        "theme_num": theme_num,
+        "theme_info_num": theme_info_num,
+        "weekday": [f"{WEEKDAY_START}-{WEEKDAY_END}"],
+        "holiday": [f"-{HOLIDAY_END}"],
+    }
+    for name, theme_num, theme_info_num in [("아야코", 71, 63), ("괴록", 70, 61)]
 ]
 
 
+class EndDayCache:
+    """테마별로 마지막 오픈일/그 외 날짜에서 통했던 endDay 값을 파일에 기억한다."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._values: dict[str, int] = {}
+        try:
+            with open(path, encoding="utf-8") as fp:
+                loaded = json.load(fp)
+            self._values = {str(k): int(v) for k, v in loaded.items() if int(v) in (0, 1)}
+        except (OSError, ValueError, TypeError, AttributeError):
+            self._values = {}
+
+    @staticmethod
+    def key(theme: Theme, is_last_day: bool) -> str:
+        position = "last" if is_last_day else "other"
+        return f"{theme.zizum_num}-{theme.theme_num}:{position}"
+
+    def order(self, theme: Theme, is_last_day: bool) -> list[int]:
+        with self._lock:
+            first = self._values.get(self.key(theme, is_last_day), 0)
+        return [first, 1 - first]
+
+    def record(self, theme: Theme, is_last_day: bool, end_day: int, first_try: bool) -> None:
+        key = self.key(theme, is_last_day)
+        with self._lock:
+            if first_try:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if self._values.get(key) != end_day:
+                self._values[key] = end_day
+                self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            values = dict(sorted(self._values.items()))
+            self._dirty = False
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump(values, fp, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+END_DAY_CACHE = EndDayCache(END_DAY_CACHE_PATH)
+
+
 def get_kst_now() -> datetime:
     return datetime.utcnow() + timedelta(hours=9)
 
@@ -61,67 +149,49 @@ def get_theme_open_dates(now_kst: datetime, max_days: int) -> list[date]:
     return [(now_kst.date() + timedelta(days=offset)) for offset in range(days)]
 
 
-def build_holiday_set(open_dates: list[date]) -> set[date]:
-    if holidays is None:
-        raise RuntimeError("공휴일 판별을 위해 holidays 패키지가 필요합니다. 설치: pip install holidays")
-    years = sorted({d.year for d in open_dates})
-    kr_holidays = holidays.country_holidays("KR", years=years)
-    return set(kr_holidays.keys())
-
-
-def to_minutes(hhmm: str) -> int:
-    hour, minute = hhmm.split(":")
-    return int(hour) * 60 + int(minute)
-
-
-def is_in_allowed_time_range(slot_time: str, is_holiday: bool) -> bool:
-    value = to_minutes(slot_time)
-    if is_holiday:
-        return value <= to_minutes(HOLIDAY_END)
-    return to_minutes(WEEKDAY_START) <= value <= to_minutes(WEEKDAY_END)
-
+def load_targets() -> list[Target]:
+    return watchlist.targets_for(SITE_NAME, DEFAULT_TARGETS, lambda target: target.theme)
 
-def send_telegram(msg: str) -> None:
-    if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
-        print("⚠️ 텔레그램 설정 없음: MY_ALARM_TOKEN / MY_CHAT_ID")
-        return
-
-    endpoint = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-    payload = json.dumps({"chat_id": TELEGRAM_CHAT_ID, "text": msg}).encode("utf-8")
-    headers = {"Content-Type": "application/json"}
 
+def theme_of(target: Target) -> Theme:
     try:
-        req = request.Request(endpoint, data=payload, headers=headers, method="POST")
-        with request.urlopen(req, timeout=10) as resp:
-            print(f"📡 텔레그램 전송 결과: {resp.status}")
-    except Exception as exc:
-        print(f"⚠️ 텔레그램 전송 실패: {exc}")
+        return Theme(
+            name=target.theme,
+            zizum_num=int(target.branch),
+            theme_num=int(target.param("theme_num")),
+            theme_info_num=int(target.param("theme_info_num")),
+        )
+    except (TypeError, ValueError):
+        raise ValueError(f"whos_there 대상에는 branch, theme_num, theme_info_num 이 필요합니다: {target.theme}") from None
+
+
+def _insecure_api_client() -> KeepAliveClient:
+    global _INSECURE_API_CLIENT
+    with _INSECURE_LOCK:
+        if _INSECURE_API_CLIENT is None:
+            _INSECURE_API_CLIENT = KeepAliveClient(
+                headers=API_HEADERS,
+                timeout=API_TIMEOUT,
+                ssl_context=ssl._create_unverified_context(),
+                max_per_host=MAX_CONCURRENCY,
+            )
+        return _INSECURE_API_CLIENT
 
 
 def post_api(form: dict[str, Any]) -> dict[str, Any]:
-    data = parse.urlencode(form).encode("utf-8")
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-        "Referer": f"{BASE_SITE}/reservation1.php",
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/121.0.0.0 Safari/537.36"
-        ),
-    }
-    req = request.Request(API_URL, data=data, headers=headers, method="POST")
-    try:
-        with request.urlopen(req, timeout=15) as resp:
-            body = resp.read().decode("utf-8", errors="replace")
-    except Exception as exc:
-        if "CERTIFICATE_VERIFY_FAILED" not in str(exc):
-            raise
-        if DEBUG:
-            print("DEBUG: SSL verify failed, retry with unverified SSL context")
-        insecure_ctx = ssl._create_unverified_context()
-        with request.urlopen(req, timeout=15, context=insecure_ctx) as resp:
-            body = resp.read().decode("utf-8", errors="replace")
-    return json.loads(body)
+    # 스레드 풀에서 불리므로 사이트/날짜를 직접 넘긴다.
+    with timings.span(timings.API, SITE_NAME, form.get("date")):
+        try:
+            resp = _API_CLIENT.post_form(API_URL, form)
+        except Exception as exc:
+            if "CERTIFICATE_VERIFY_FAILED" not in str(exc):
+                raise
+            if DEBUG:
+                print("DEBUG: SSL verify failed, retry with unverified SSL context")
+            resp = _insecure_api_client().post_form(API_URL, form)
+    if resp.status >= 400:
+        raise error.HTTPError(API_URL, resp.status, f"HTTP {resp.status}", None, None)
+    return json.loads(resp.body.decode("utf-8", errors="replace"))
 
 
 def fetch_theme_date(theme: Theme) -> dict[str, Any]:
@@ -140,7 +210,7 @@ def fetch_theme_times(theme: Theme, target_date: str, end_day: int) -> dict[str,
     )
 
 
-def parse_open_slots(resp: dict[str, Any], is_holiday: bool) -> list[str]:
+def parse_open_slots(resp: dict[str, Any], allows: Callable[[str], bool]) -> list[str]:
     slots = set()
     skipped_by_enable = 0
     for item in resp.get("data", []) or []:
@@ -159,7 +229,7 @@ def parse_open_slots(resp: dict[str, Any], is_holiday: bool) -> list[str]:
             skipped_by_enable += 1
             continue
 
-        if not is_in_allowed_time_range(slot_time, is_holiday):
+        if not allows(slot_time):
             continue
 
         slots.add(slot_time)
@@ -170,20 +240,25 @@ def parse_open_slots(resp: dict[str, Any], is_holiday: bool) -> list[str]:
     return sorted(slots)
 
 
-def check_theme_date(theme: Theme, target_date: str, is_holiday: bool) -> list[str]:
+def check_theme_date(
+    theme: Theme, target_date: str, allows: Callable[[str], bool], is_last_day: bool = False
+) -> list[str]:
     # 사이트 로직상 endDay 파라미터가 필요한 케이스가 있어 0/1 모두 시도한다.
-    first = fetch_theme_times(theme, target_date, end_day=0)
-    if first.get("status"):
-        return parse_open_slots(first, is_holiday)
-
-    second = fetch_theme_times(theme, target_date, end_day=1)
-    if second.get("status"):
-        return parse_open_slots(second, is_holiday)
+    # 지난번에 통한 값을 먼저 보내고, 실패할 때만 나머지 값으로 다시 묻는다.
+    responses = {}
+    with timings.span(timings.DATE, SITE_NAME, target_date):
+        for attempt, end_day in enumerate(END_DAY_CACHE.order(theme, is_last_day)):
+            resp = fetch_theme_times(theme, target_date, end_day=end_day)
+            responses[end_day] = resp
+            if resp.get("status"):
+                END_DAY_CACHE.record(theme, is_last_day, end_day, first_try=attempt == 0)
+                with timings.span(timings.CLASSIFY, SITE_NAME, target_date):
+                    return parse_open_slots(resp, allows)
 
     if DEBUG:
         print(
             f"DEBUG: no status for {theme.name} {target_date} "
-            f"msg0={first.get('msg')} msg1={second.get('msg')}"
+            f"msg0={responses[0].get('msg')} msg1={responses[1].get('msg')}"
         )
     return []
 
@@ -197,68 +272,128 @@ def reservation_url(theme: Theme) -> str:
     return f"{BASE_SITE}/reservation1.php?{parse.urlencode(params)}"
 
 
-def main() -> None:
-    now_kst = get_kst_now()
+def run(now_kst: datetime, holiday_set: set[date]) -> SiteScan:
+    """모든 테마의 오픈 기간을 확인하고 열린 슬롯과 확인한 범위를 돌려준다."""
     default_open_dates = get_open_dates(now_kst)
-    holiday_set = build_holiday_set(default_open_dates)
-
     date_labels = [d.strftime("%Y-%m-%d") for d in default_open_dates]
     print(
         f"📅 기본 검사 기간: {date_labels[0]} ~ {date_labels[-1]} "
         f"(기준시각 KST {now_kst.strftime('%Y-%m-%d %H:%M')}, 오픈시각 {OPEN_HOUR_KST}:00)"
     )
 
-    findings: list[str] = []
-
-    for theme in THEMES:
-        print(f"🎭 테마 검사 시작: {theme.name}")
-        try:
-            meta = fetch_theme_date(theme)
-            data = meta.get("data", {}) or {}
-            doing = int(data.get("doing", 0) or 0)
-            theme_days = doing if doing > 0 else len(default_open_dates)
-            theme_open_dates = get_theme_open_dates(now_kst, theme_days)
-            if DEBUG:
-                print(
-                    f"DEBUG: theme meta status={meta.get('status')} "
-                    f"name={data.get('name')} doing={doing}"
-                )
-        except Exception as exc:
-            print(f"⚠️ [{theme.name}] 메타 조회 실패: {exc}")
-            continue
-
-        theme_labels = [d.strftime("%Y-%m-%d") for d in theme_open_dates]
-        print(f"🗓️ [{theme.name}] 테마 검사 기간: {theme_labels[0]} ~ {theme_labels[-1]}")
-
-        for target in theme_open_dates:
-            target_date = target.strftime("%Y-%m-%d")
-            is_holiday = target.weekday() >= 5 or target in holiday_set
-            day_name = KOR_WEEKDAYS[target.weekday()]
-            kind = "휴일" if is_holiday else "평일"
-            print(f"🧭 [{theme.name}] {target_date}({day_name}) [{kind}]")
-
+    # get_theme_date 한 번이 테마의 모든 날짜를, get_theme_time 한 번이 그 날짜를 보는 모든 대상을 맡는다.
+    targets = load_targets()
+    themes = watchlist.group_targets(targets, theme_of)
+    scan = SiteScan(SITE_NAME)
+    fetch_count = 0
+
+    def is_holiday(target: date) -> bool:
+        return target.weekday() >= 5 or target in holiday_set
+
+    # 테마 메타 조회가 끝나는 대로 해당 테마의 날짜 조회를 바로 띄우고,
+    # 출력/메시지는 대상 순서 × 날짜 순서대로 모은다.
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as pool:
+        meta_futures = {pool.submit(fetch_theme_date, theme): theme for theme in themes}
+        plans: dict[Theme, list[tuple[watchlist.Fetch, Future]] | Exception] = {}
+        for meta_future in as_completed(meta_futures):
+            theme = meta_futures[meta_future]
             try:
-                slots = check_theme_date(theme, target_date, is_holiday)
+                meta = meta_future.result()
+                data = meta.get("data", {}) or {}
+                doing = int(data.get("doing", 0) or 0)
+                theme_days = doing if doing > 0 else len(default_open_dates)
+                theme_open_dates = get_theme_open_dates(now_kst, theme_days)
+                if DEBUG:
+                    print(
+                        f"DEBUG: theme meta status={meta.get('status')} "
+                        f"name={data.get('name')} doing={doing}"
+                    )
             except Exception as exc:
-                print(f"⚠️ [{theme.name}] {target_date} 조회 실패: {exc}")
+                plans[theme] = exc
                 continue
 
-            if not slots:
+            fetches = watchlist.plan_fetches(themes[theme], theme_open_dates, is_holiday, unit=theme_of)
+            fetch_count += len(fetches)
+            plans[theme] = [
+                (
+                    fetch,
+                    pool.submit(
+                        check_theme_date, theme, fetch.label, fetch.allows, fetch.date == theme_open_dates[-1]
+                    ),
+                )
+                for fetch in fetches
+            ]
+
+        for theme in themes:
+            print(f"🎭 테마 검사 시작: {theme.name}")
+            plan = plans[theme]
+            if isinstance(plan, Exception):
+                print(f"⚠️ [{theme.name}] 메타 조회 실패: {plan}")
+                continue
+            if not plan:
                 continue
 
-            joined = ", ".join(slots)
-            print(f"✅ [{theme.name}] {target_date}({day_name}) [{kind}] -> {joined}")
-            findings.append(
-                f"- {theme.name} {target_date}({day_name}) [{kind}] {joined} "
-                f"({reservation_url(theme)})"
-            )
+            print(f"🗓️ [{theme.name}] 테마 검사 기간: {plan[0][0].label} ~ {plan[-1][0].label}")
+            for fetch, date_future in plan:
+                target_date = fetch.label
+                day_name = KOR_WEEKDAYS[fetch.date.weekday()]
+                kind = "휴일" if fetch.is_holiday else "평일"
+                print(f"🧭 [{theme.name}] {target_date}({day_name}) [{kind}]")
+
+                try:
+                    slots = date_future.result()
+                except Exception as exc:
+                    print(f"⚠️ [{theme.name}] {target_date} 조회 실패: {exc}")
+                    continue
+
+                for target, target_slots in fetch.split(slots).items():
+                    scan.add(target.name, target_date, target_slots, kind)
+                    if target_slots:
+                        print(f"✅ [{target.name}] {target_date}({day_name}) [{kind}] -> {', '.join(target_slots)}")
+
+    print(f"🗂️ [{SITE_NAME}] 감시 대상 {len(targets)}개 -> 테마 조회 {len(themes)}회 + 날짜 조회 {fetch_count}회")
+    try:
+        END_DAY_CACHE.save()
+    except OSError as exc:
+        print(f"⚠️ endDay 캐시 저장 실패: {exc}")
+    if DEBUG:
+        print(f"DEBUG: api {_API_CLIENT.stats()}")
+        print(f"DEBUG: endDay cache hit={END_DAY_CACHE.hits} miss={END_DAY_CACHE.misses}")
 
-    if not findings:
+    if not scan.slots:
         print("❌ 검사 기간 내 빈자리 없음")
-        return
+    return scan
+
+
+def build_messages(slots: list[Slot]) -> list[str]:
+    grouped: dict[tuple[str, str], list[Slot]] = {}
+    for slot in slots:
+        grouped.setdefault((slot.theme, slot.date), []).append(slot)
 
-    msg = "🔥 [후즈데어 빈자리 발견]\n" + "\n".join(findings)
-    send_telegram(msg)
+    targets = load_targets()
+    target_order = {target.name: index for index, target in enumerate(targets)}
+    targets_by_name = {target.name: target for target in targets}
+    findings = []
+    for (theme_name, target_date), group in sorted(
+        grouped.items(), key=lambda item: (target_order.get(item[0][0], len(targets)), item[0][1])
+    ):
+        joined = ", ".join(sorted(slot.time for slot in group))
+        target = targets_by_name.get(theme_name)
+        link = f" ({reservation_url(theme_of(target))})" if target else ""
+        findings.append(f"- {theme_name} {target_date}({group[0].day_name}) [{group[0].kind}] {joined}{link}")
+
+    return ["🔥 [후즈데어 빈자리 발견]\n" + "\n".join(findings)]
+
+
+def main() -> None:
+    now_kst = get_kst_now()
+    holiday_set = build_holiday_set(get_open_dates(now_kst))
+    scan = run(now_kst, holiday_set)
+    with SlotStore() as store:
+        messages = diff_messages(store, scan, build_messages, SITE_LABEL)
+    for msg in messages:
+        send_telegram(msg)
+    flush()
 
 
 if __name__ == "__main__":